@@ -0,0 +1,81 @@
+"""
+Микробенчмарк TextChunker.split_text против прежней реализации с посимвольным поиском
+на трех видах текста. Проверяет, что обе реализации дают одинаковые чанки.
+
+Запуск:
+    make bench-chunker
+    python -m benchmarks.bench_chunker --sizes 100000 1000000 5000000
+"""
+import argparse
+import time
+from pathlib import Path
+
+from src.documents.chunker import TextChunker
+from src.documents.tests.test_chunker import legacy_split_text
+
+
+def make_text(size: int, corpus: str = "prose") -> str:
+    """
+    Собирает текст нужного размера из документов docs/.
+
+    Args:
+        size: Размер текста в символах
+        corpus: prose — текст как есть; nospace — без пробелов (как CJK или base64);
+            lines — короткие строки (как таблицы или логи)
+    """
+    sample = "\n\n".join(path.read_text(encoding="utf-8") for path in sorted(Path("docs").glob("*.txt")))
+
+    if corpus == "nospace":
+        sample = "".join(sample.split())
+    elif corpus == "lines":
+        words = sample.split()
+        sample = "\n".join(" ".join(words[idx:idx + 3]) for idx in range(0, len(words), 3))
+
+    repeats = size // len(sample) + 1
+    return (sample * repeats)[:size]
+
+
+def timeit(func, repeat: int) -> float:
+    """Лучшее время из repeat запусков."""
+    best = float("inf")
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started_at)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--corpora", nargs="+", default=["prose", "nospace", "lines"])
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--chunk-overlap", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    chunker = TextChunker(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+
+    print(f"{'корпус':>8} {'символов':>10} {'чанков':>8} {'прежний, с':>11} {'новый, с':>10} {'ускорение':>10}")
+    for corpus in args.corpora:
+        for size in args.sizes:
+            text = make_text(size, corpus)
+
+            expected = legacy_split_text(text, chunker.chunk_size, chunker.chunk_overlap, chunker.separators)
+            actual = chunker.split_text(text)
+            assert actual == expected, f"Чанки отличаются от прежней реализации (корпус {corpus}, {size} символов)"
+
+            legacy_time = timeit(
+                lambda: legacy_split_text(text, chunker.chunk_size, chunker.chunk_overlap, chunker.separators),
+                args.repeat,
+            )
+            new_time = timeit(lambda: chunker.split_text(text), args.repeat)
+
+            print(
+                f"{corpus:>8} {size:>10} {len(actual):>8} "
+                f"{legacy_time:>11.4f} {new_time:>10.4f} {legacy_time / new_time:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
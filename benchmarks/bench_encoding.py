@@ -0,0 +1,58 @@
+"""
+Сравнение кодирования фиксированными батчами по BATCH_SIZE текстов и батчами
+по бюджету токенов (тексты сгруппированы по длине) на чанках документов.
+Проверяет, что оба режима дают одинаковые эмбеддинги.
+
+Запуск:
+    make bench-encoding
+    python -m benchmarks.bench_encoding --docs docs --tokens-per-batch 8192 16384 32768
+"""
+import argparse
+
+import numpy as np
+
+from src.config import config
+from src.documents import DirectoryLoader, TextChunker
+from src.setup import Setup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=str(config.DOCS_DIR))
+    parser.add_argument("--tokens-per-batch", type=int, nargs="+", default=[8192, 16384, 32768])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    service = Setup.get_embedding_service()
+    chunker = TextChunker(chunk_size=config.CHUNK_SIZE, chunk_overlap=config.CHUNK_OVERLAP)
+    texts = [
+        text
+        for document in DirectoryLoader().iter_from_directory(args.docs)
+        for text in chunker.split_text(document.content)
+    ]
+
+    def run(tokens_per_batch):
+        service.TOKENS_PER_BATCH = tokens_per_batch
+        best = 0.0
+        for _ in range(args.repeat):
+            embeddings = service._encode(texts)
+            best = max(best, service.texts_per_second)
+        return embeddings, best
+
+    # Прогрев модели
+    service._encode(texts[:32])
+
+    expected, fixed_speed = run(None)
+
+    print(f"Текстов: {len(texts)}, модель: {service.model_name}")
+    print(f"{'режим':>24} {'текстов/с':>10} {'ускорение':>10} {'макс. разница':>14}")
+    print(f"{f'BATCH_SIZE={service.BATCH_SIZE}':>24} {fixed_speed:>10.1f} {1.0:>9.1f}x {0.0:>14.2e}")
+
+    for tokens_per_batch in args.tokens_per_batch:
+        embeddings, speed = run(tokens_per_batch)
+        diff = float(np.abs(embeddings - expected).max())
+        print(f"{f'TOKENS_PER_BATCH={tokens_per_batch}':>24} {speed:>10.1f} {speed / fixed_speed:>9.1f}x {diff:>14.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Массовая запись в ChromaDB: последовательное кодирование и запись против конвейера
+(запись пачки идет параллельно с кодированием следующей). Кодирование имитируется
+задержкой --embed-ms на пачку, векторы случайные. База создается во временной директории.
+
+Запуск:
+    make bench-ingest
+    python -m benchmarks.bench_ingest --rows 20000 --batch-size 1000 --embed-ms 200
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from src.db import ChromaDB
+from src.documents import ChunkBatch
+
+
+def make_batches(rows: int, batch_size: int, dimension: int, embed_ms: float, prefix: str):
+    """Пачки чанков; эмбеддинги «кодируются» при получении очередной пачки."""
+    rng = np.random.default_rng(0)
+    for start in range(0, rows, batch_size):
+        size = min(batch_size, rows - start)
+        time.sleep(embed_ms / 1000)
+        yield ChunkBatch(
+            ids=[f"{prefix}-{start + idx}" for idx in range(size)],
+            texts=[f"Текст чанка номер {start + idx}" for idx in range(size)],
+            metadatas=[{"source": f"doc_{(start + idx) // 10}.txt", "chunk_index": (start + idx) % 10} for idx in range(size)],
+            embeddings=rng.normal(size=(size, dimension)).astype(np.float32),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--embed-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = ChromaDB(collection_name="bench", persist_directory=tmp_dir)
+        print(f"Записей: {args.rows}, пачка: {args.batch_size}, max_batch_size клиента: {db.max_batch_size}")
+        print(f"{'режим':>16} {'с':>7} {'записей/с':>10} {'запросов':>9} {'задержка ср., мс':>17} {'макс., мс':>10}")
+
+        def report(name: str, stats: dict):
+            print(
+                f"{name:>16} {stats['seconds']:>7.2f} {stats['rows_per_second']:>10.0f} {stats['requests']:>9} "
+                f"{stats['mean_latency_ms']:>17.1f} {stats['max_latency_ms']:>10.1f}"
+            )
+
+        # Последовательно: каждая пачка записывается до кодирования следующей
+        started_at = time.perf_counter()
+        sequential = {"rows": 0, "requests": 0, "latencies": []}
+        for batch in make_batches(args.rows, args.batch_size, args.dimension, args.embed_ms, "seq"):
+            stats = db.add_batch(batch)
+            sequential["rows"] += stats["rows"]
+            sequential["requests"] += stats["requests"]
+            sequential["latencies"].append(stats["mean_latency_ms"])
+        elapsed = time.perf_counter() - started_at
+        report("последовательно", {
+            "seconds": elapsed,
+            "rows_per_second": sequential["rows"] / elapsed,
+            "requests": sequential["requests"],
+            "mean_latency_ms": float(np.mean(sequential["latencies"])),
+            "max_latency_ms": float(np.max(sequential["latencies"])),
+        })
+
+        report("конвейер", db.bulk_upsert(make_batches(args.rows, args.batch_size, args.dimension, args.embed_ms, "bulk")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Сравнение PyTorch и ONNX Runtime (fp32 и int8) для модели эмбеддингов на чанках документов:
+скорость кодирования и совпадение векторов с PyTorch (косинусная близость).
+
+Запуск:
+    make bench-onnx
+    python -m benchmarks.bench_onnx --docs docs --threads 4
+"""
+import argparse
+
+import numpy as np
+
+from src.config import config
+from src.documents import DirectoryLoader, TextChunker
+from src.embeddings import AllMiniLMOnnxService, AllMiniLMService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=str(config.DOCS_DIR))
+    parser.add_argument("--threads", type=int, default=config.ONNX_THREADS)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    chunker = TextChunker(chunk_size=config.CHUNK_SIZE, chunk_overlap=config.CHUNK_OVERLAP)
+    texts = [
+        text
+        for document in DirectoryLoader().iter_from_directory(args.docs)
+        for text in chunker.split_text(document.content)
+    ]
+
+    def run(service):
+        # Прогрев модели
+        service._encode(texts[:32])
+        best = 0.0
+        for _ in range(args.repeat):
+            embeddings = service._encode(texts)
+            best = max(best, service.texts_per_second)
+        return embeddings, best
+
+    services = {
+        "torch": AllMiniLMService(),
+        "onnx": AllMiniLMOnnxService(num_threads=args.threads),
+        "onnx int8": AllMiniLMOnnxService(quantize=True, num_threads=args.threads),
+    }
+
+    print(f"Текстов: {len(texts)}, модель: {AllMiniLMService.MODEL_NAME}")
+    print(f"{'движок':>10} {'текстов/с':>10} {'ускорение':>10} {'косинус ср.':>12} {'косинус мин.':>13}")
+
+    expected, torch_speed = None, None
+    for name, service in services.items():
+        embeddings, speed = run(service)
+        if expected is None:
+            expected, torch_speed = embeddings, speed
+        # Эмбеддинги нормализованы, скалярное произведение — косинус
+        cosine = (embeddings * expected).sum(axis=1)
+        print(
+            f"{name:>10} {speed:>10.1f} {speed / torch_speed:>9.1f}x "
+            f"{float(np.mean(cosine)):>12.6f} {float(np.min(cosine)):>13.6f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
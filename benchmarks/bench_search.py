@@ -0,0 +1,94 @@
+"""
+Задержка поиска в ChromaDB: без фильтра, с фильтрами по метаданным (where) и тексту (where_document)
+и с разными наборами полей (include). Коллекция со случайными векторами и метаданными как у
+TextChunker.create_chunks создается во временной директории. Для каждого режима — средняя и p95
+задержка одного запроса и время пакетного поиска (search_many) всех запросов.
+
+Запуск:
+    make bench-search
+    python -m benchmarks.bench_search --rows 20000 --queries 200 --n-results 10
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from src.db import ChromaDB
+from src.documents import ChunkBatch
+
+# Расширения файлов корпуса по кругу
+EXTENSIONS = (".pdf", ".txt", ".docx")
+# Чанков в одном документе
+CHUNKS_PER_DOCUMENT = 50
+
+
+def make_batches(rows: int, batch_size: int, dimension: int):
+    """Пачки чанков с метаданными загрузчика и разбиения; каждый десятый чанк содержит слово «Толстой»."""
+    rng = np.random.default_rng(0)
+    for start in range(0, rows, batch_size):
+        size = min(batch_size, rows - start)
+        indexes = range(start, start + size)
+        yield ChunkBatch(
+            ids=[f"chunk-{idx}" for idx in indexes],
+            texts=[f"Текст чанка номер {idx}" + (" про Толстой" if idx % 10 == 0 else "") for idx in indexes],
+            metadatas=[
+                {
+                    "source": f"docs/doc_{idx // CHUNKS_PER_DOCUMENT}{EXTENSIONS[idx // CHUNKS_PER_DOCUMENT % 3]}",
+                    "extension": EXTENSIONS[idx // CHUNKS_PER_DOCUMENT % 3],
+                    "chunk_index": idx % CHUNKS_PER_DOCUMENT,
+                    "original_document_id": f"doc-{idx // CHUNKS_PER_DOCUMENT}",
+                }
+                for idx in indexes
+            ],
+            embeddings=rng.normal(size=(size, dimension)).astype(np.float32),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--n-results", type=int, default=10)
+    parser.add_argument("--dimension", type=int, default=384)
+    args = parser.parse_args()
+
+    queries = np.random.default_rng(1).normal(size=(args.queries, args.dimension)).astype(np.float32)
+    modes = {
+        "без фильтра": {},
+        "только id": {"include": ["distances"]},
+        "+ метаданные": {"include": ["documents", "distances", "metadatas"]},
+        "where документ": {"where": {"original_document_id": "doc-7"}},
+        "where pdf": {"where": {"extension": ".pdf"}},
+        "where $and": {"where": {"$and": [{"extension": ".pdf"}, {"chunk_index": {"$lt": 5}}]}},
+        "where_document": {"where_document": {"$contains": "Толстой"}},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = ChromaDB(collection_name="bench", persist_directory=tmp_dir)
+        started_at = time.perf_counter()
+        db.bulk_upsert(make_batches(args.rows, db.max_batch_size, args.dimension))
+        print(f"Записей: {args.rows}, запросов: {args.queries}, n_results: {args.n_results} "
+              f"(запись {time.perf_counter() - started_at:.1f} с)")
+        print(f"{'режим':>16} {'ср., мс':>8} {'p95, мс':>8} {'пакетом, мс/запрос':>19} {'найдено':>8}")
+
+        for name, params in modes.items():
+            latencies = []
+            found = 0
+            for query in queries:
+                query_started_at = time.perf_counter()
+                found += len(db.search(query, n_results=args.n_results, **params))
+                latencies.append((time.perf_counter() - query_started_at) * 1000)
+
+            batch_started_at = time.perf_counter()
+            db.search_many(queries, n_results=args.n_results, **params)
+            batch_ms = (time.perf_counter() - batch_started_at) * 1000 / len(queries)
+
+            print(
+                f"{name:>16} {np.mean(latencies):>8.2f} {np.percentile(latencies, 95):>8.2f} "
+                f"{batch_ms:>19.2f} {found / len(queries):>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
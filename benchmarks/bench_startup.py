@@ -0,0 +1,64 @@
+"""
+Время запуска: каждый этап выполняется в отдельном процессе интерпретатора несколько раз,
+выводится медиана и список тяжелых зависимостей, загруженных к концу этапа.
+
+Запуск:
+    make bench-startup
+    python -m benchmarks.bench_startup --repeat 5 --with-query
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Зависимости, которые не должны загружаться без необходимости
+HEAVY_MODULES = ["torch", "sentence_transformers", "transformers", "onnxruntime", "chromadb", "PyPDF2", "docx"]
+
+STAGES = {
+    "import src": "import src",
+    "import src.setup": "import src.setup",
+    "create_pipeline": "from src.setup import Setup; pipeline = Setup().create_pipeline()",
+}
+
+QUERY_STAGE = (
+    "from src.setup import Setup; db, embedding_service, _, _ = Setup().create_pipeline(); "
+    "db.search(embedding_service.encode_array(['Война и мир'])[0])"
+)
+
+# Код, выполняемый в дочернем процессе: время этапа и загруженные тяжелые модули
+RUNNER = """
+import json, sys, time
+started_at = time.perf_counter()
+exec({code!r})
+elapsed = time.perf_counter() - started_at
+print(json.dumps({{"elapsed": elapsed, "modules": [name for name in {modules!r} if name in sys.modules]}}))
+"""
+
+
+def run_stage(code: str) -> dict:
+    runner = RUNNER.format(code=code, modules=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, "-c", runner], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--with-query", action="store_true", help="Добавить этап с первым поисковым запросом (загружает модель)")
+    args = parser.parse_args()
+
+    stages = dict(STAGES)
+    if args.with_query:
+        stages["первый запрос"] = QUERY_STAGE
+
+    print(f"{'этап':>18} {'медиана, с':>11} {'мин, с':>8}  загруженные зависимости")
+    for name, code in stages.items():
+        runs = [run_stage(code) for _ in range(args.repeat)]
+        times = [run["elapsed"] for run in runs]
+        modules = ", ".join(runs[-1]["modules"]) or "—"
+        print(f"{name:>18} {statistics.median(times):>11.2f} {min(times):>8.2f}  {modules}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Отчет о качестве поиска при понижении размерности эмбеддингов PCA-проекцией:
+recall@k сокращенных векторов относительно точного поиска по полным и экономия памяти.
+Проекция обучается на чанках корпуса, запросами служат отложенные чанки, которых нет в обучающей выборке.
+
+Запуск:
+    make report-recall
+    python -m benchmarks.report_recall --docs docs --dimensions 64 128 192 --k 10
+    python -m benchmarks.report_recall --save 128  # сохранить проекцию в EMBEDDING_REDUCER_PATH
+"""
+import argparse
+
+import numpy as np
+
+from src.config import config
+from src.documents import DirectoryLoader, TextChunker
+from src.embeddings import PCAReducer, recall_at_k
+from src.setup import Setup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=str(config.DOCS_DIR))
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[32, 64, 96, 128, 192, 256])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=float, default=0.1, help="Доля чанков, отложенных под запросы")
+    parser.add_argument("--save", type=int, default=None, help="Обучить на всем корпусе и сохранить проекцию этой размерности")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    service = Setup.get_embedding_service()
+    chunker = TextChunker(chunk_size=config.CHUNK_SIZE, chunk_overlap=config.CHUNK_OVERLAP)
+    texts = [
+        text
+        for document in DirectoryLoader().iter_from_directory(args.docs)
+        for text in chunker.split_text(document.content)
+    ]
+    embeddings = service.encode_array(texts)
+
+    order = np.random.default_rng(args.seed).permutation(len(texts))
+    n_queries = max(1, int(len(texts) * args.queries))
+    queries, corpus = embeddings[order[:n_queries]], embeddings[order[n_queries:]]
+
+    print(f"Чанков: {len(corpus)}, запросов: {len(queries)}, модель: {service.model_name}, размерность: {service.dimension}")
+    print(f"{'размерность':>12} {f'recall@{args.k}':>10} {'дисперсия':>10} {'память':>8}")
+
+    for dimension in args.dimensions:
+        if dimension > min(corpus.shape):
+            print(f"{dimension:>12} {'—':>10} {'—':>10} {'—':>8}  (больше числа чанков или исходной размерности)")
+            continue
+
+        reducer = PCAReducer.fit(corpus, dimension)
+        recall = recall_at_k(corpus, queries, reducer.transform(corpus), reducer.transform(queries), k=args.k)
+        variance = float(reducer.explained_variance_ratio.sum())
+        print(f"{dimension:>12} {recall:>10.3f} {variance:>10.3f} {dimension / service.dimension:>7.0%}")
+
+    if args.save:
+        reducer = PCAReducer.fit(embeddings, args.save)
+        reducer.save(config.EMBEDDING_REDUCER_PATH)
+        print(
+            f"Проекция {service.dimension} → {args.save} сохранена в {config.EMBEDDING_REDUCER_PATH}. "
+            f"Включите EMBEDDING_REDUCED_DIMENSION = {args.save} — "
+            f"коллекция будет переиндексирована при следующем запуске"
+        )
+
+
+if __name__ == "__main__":
+    main()
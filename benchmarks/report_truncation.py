@@ -0,0 +1,46 @@
+"""
+Отчет о чанках символьного TextChunker, которые длиннее окна модели эмбеддингов
+и обрезаются при создании эмбеддинга, в сравнении с разбиением TokenTextChunker.
+
+Запуск:
+    make report-truncation
+    python -m benchmarks.report_truncation --docs docs --chunk-size 500 --chunk-overlap 50
+"""
+import argparse
+
+from src.config import config
+from src.documents import DirectoryLoader, TextChunker, TokenTextChunker
+from src.setup import Setup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default=str(config.DOCS_DIR))
+    parser.add_argument("--chunk-size", type=int, default=config.CHUNK_SIZE)
+    parser.add_argument("--chunk-overlap", type=int, default=config.CHUNK_OVERLAP)
+    args = parser.parse_args()
+
+    embedding_service = Setup.get_embedding_service()
+    if embedding_service.tokenizer is None:
+        raise SystemExit(f"Модель {config.EMBEDDING_MODEL.value} не предоставляет токенизатор")
+
+    texts = [document.content for document in DirectoryLoader().iter_from_directory(args.docs)]
+
+    token_chunker = TokenTextChunker(
+        embedding_service.tokenizer,
+        chunk_size=embedding_service.max_tokens,
+        chunk_overlap=config.CHUNK_OVERLAP_TOKENS,
+    )
+    char_chunker = TextChunker(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+
+    before = token_chunker.truncation_report(texts, char_chunker)
+    after = token_chunker.truncation_report(texts, token_chunker)
+
+    print(f"Документов: {len(texts)}, окно модели: {embedding_service.max_tokens} токенов")
+    print(f"{'чанкер':>28} {'чанков':>8} {'обрезано':>9} {'потеряно токенов':>17}")
+    for name, report in ((f"TextChunker({args.chunk_size} симв.)", before), ("TokenTextChunker", after)):
+        print(f"{name:>28} {report['chunks']:>8} {report['truncated']:>9} {report['lost_tokens']:>17}")
+
+
+if __name__ == "__main__":
+    main()
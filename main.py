@@ -1,10 +1,19 @@
+import sys
+
+from src.config import config
 from src.db import ChromaDB
 from src.logger import logger
-from src.documents import DirectoryLoader, TextChunker
+from src.documents import DirectoryLoader, TextChunker, IngestionManifest
+from src.indexer import Indexer
 from src.setup import Setup
-from src.utils import save_embeddings_results, save_text_chunker_results, save_search_results
+from src.utils import save_search_results
+from src.watcher import DirectoryWatcher
 
 _DEBUG_ = True
+# Полная переиндексация: очистка коллекции и манифеста перед запуском
+_REINDEX_ = False
+# Режим наблюдения: после индексации следим за docs/ и переиндексируем измененные файлы
+_WATCH_ = "--watch" in sys.argv
 
 query_list = [
     "How does Tolstoy's *War and Peace* intertwine personal destinies with the Napoleonic Wars, and what philosophical questions about history and individual agency does it raise?",
@@ -17,46 +26,47 @@ if __name__ == "__main__":
 
     db, embedding_service, dir_loader, text_chunker = Setup().create_pipeline()
 
-    # Очищаем базу данных в режиме отладки
-    if _DEBUG_: db.clear_collection()
-
-    # Создаем DirectoryLoader
-    # dir_loader = DirectoryLoader()
-
-    # Загружаем документы
-    documents = dir_loader.load_from_directory(
-        'docs',
-        glob_pattern='*.*'
-    )
-
-    # Создаем чанкер
-    # text_chunker = TextChunker(
-    #     chunk_size=500,
-    #     chunk_overlap=50
-    # )
-
-    # Создаем чанки для каждого документа
-    for document in documents:
-        chunks = text_chunker.create_chunks(document)
-        
-        # Сохраняем результаты TextChunker
-        if _DEBUG_: save_text_chunker_results(
-            chunks, 
-            f".results/TextChunker_results_{document.metadata.get('filename', 'unknown')}.txt"
-        )
+    try:
+        # Манифест хранит размер, mtime и хеш проиндексированных файлов
+        manifest = IngestionManifest()
 
-        embeddings = embedding_service.create_embeddings([chunk.content for chunk in chunks])
+        # Очищаем базу данных и манифест при полной переиндексации
+        if _REINDEX_:
+            db.reset_collection()
+            manifest.clear()
 
-        # Сохраняем результаты AllMiniLMService
-        if _DEBUG_:save_embeddings_results(
-            chunks,
-            embeddings,
-            output_file=f".results/AllMiniLMService_results_{document.metadata.get('filename', 'unknown')}.txt"
+        indexer = Indexer(
+            db,
+            embedding_service,
+            dir_loader,
+            text_chunker,
+            manifest,
+            # Сохраняем результаты TextChunker и эмбеддингов в режиме отладки
+            results_dir=".results" if _DEBUG_ else None,
+            batch_size=config.EMBED_BATCH_SIZE,
+            flush_timeout=config.EMBED_FLUSH_TIMEOUT,
         )
 
-        db.add_documents(chunks, embeddings)
+        # Смена разбиения, модели эмбеддингов или PCA-проекции требует полной переиндексации
+        indexer.check_pipeline()
+
+        # Обрабатываем только новые и измененные файлы, чанки удаленных файлов удаляются из базы
+        indexer.sync('docs', glob_pattern='*.*')
+        # Построение индексов после массовой записи (для LanceDB — IVF-PQ и уплотнение таблицы)
+        db.optimize()
+
+        # Выполняем поиск по запросам и сохраняем результаты
+        logger.info("Начинаем поиск по запросам...")
+        save_search_results(query_list, db, embedding_service)
+        logger.info("Поиск завершен!")
 
-    # Выполняем поиск по запросам и сохраняем результаты
-    logger.info("Начинаем поиск по запросам...")
-    save_search_results(query_list, db, embedding_service)
-    logger.info("Поиск завершен!")
+        if _WATCH_:
+            DirectoryWatcher(
+                indexer,
+                'docs',
+                glob_pattern='*.*',
+                debounce_ms=config.WATCH_DEBOUNCE_MS,
+            ).run()
+    finally:
+        # Останавливаем процессы пула эмбеддингов (если он включен)
+        embedding_service.close()
@@ -1,5 +1,6 @@
 from enum import Enum
 from pathlib import Path
+from typing import Optional
 from dotenv import load_dotenv
 import os
 
@@ -16,6 +17,12 @@ class EmbeddingModelsType(Enum):
     QWEN3_EMBEDDING_4B = "Qwen3-Embedding-4B"
     ALL_MINI_LM_L6_V2 = "all-MiniLM-L6-v2"
 
+class EmbeddingBackendType(Enum):
+    """Движок инференса модели эмбеддингов."""
+    TORCH = "torch"
+    ONNX = "onnx"
+    ONNX_INT8 = "onnx_int8"
+
 class LLMModelsType(Enum):
     """LLM модели."""
     QWEN3_8B_INSTRUCT = "Qwen3-8B-Instruct"
@@ -35,7 +42,29 @@ class BaseConfig:
     # Общие настройки по умолчанию
     CHUNK_SIZE: int = 500
     CHUNK_OVERLAP: int = 50
+    CHUNK_BY_TOKENS: bool = False  # Размер чанка в токенах модели эмбеддингов вместо символов
+    CHUNK_SIZE_TOKENS: Optional[int] = None  # Размер чанка в токенах (None — окно модели)
+    CHUNK_OVERLAP_TOKENS: int = 32
+    COMPACT_CHUNKS: bool = False  # create_chunks возвращает ChunkView со смещениями вместо копий текста (create_batch не затрагивает)
+    LOADER_WORKERS: int = 1  # Количество процессов для разбора документов (1 — последовательно)
+    PDF_PAGES_PER_DOCUMENT: Optional[int] = None  # Постраничная загрузка PDF диапазонами страниц (None — целиком)
+    TEXT_CACHE_DIR: Optional[Path] = Path(".cache/extracted_text")  # Кэш текста из PDF/DOCX (None — отключен)
+    TEXT_CACHE_MAX_BYTES: int = 1024 ** 3  # Лимит размера кэша текста (1 GB)
+    EMBEDDING_BACKEND: EmbeddingBackendType = EmbeddingBackendType.TORCH  # PyTorch или ONNX Runtime (CPU)
+    ONNX_THREADS: Optional[int] = None  # Потоки ONNX Runtime (None — по числу ядер)
+    EMBED_BATCH_SIZE: int = 512  # Сколько чанков разных файлов копить перед кодированием и записью
+    EMBED_FLUSH_TIMEOUT: Optional[float] = 5.0  # Сколько секунд чанки могут ждать в очереди (None — без ограничения)
+    EMBEDDING_WORKERS: int = 1  # Процессов для кодирования эмбеддингов (1 — в основном процессе)
+    EMBEDDING_THREADS_PER_WORKER: Optional[int] = None  # Потоков torch на процесс (None — ядра поровну)
+    EMBEDDING_REDUCED_DIMENSION: Optional[int] = None  # Размерность после PCA-проекции (None — без сокращения)
+    EMBEDDING_REDUCER_PATH: Path = Path(".db/embedding_pca.npz")  # Проекция, обученная make report-recall
+    EMBEDDING_CACHE_DIR: Optional[Path] = Path(".cache/embeddings")  # Кэш эмбеддингов (None — отключен)
+    EMBEDDING_CACHE_MEMORY_ITEMS: int = 100_000  # Размер LRU-кэша эмбеддингов в памяти (векторов)
+    LANCE_INDEX_MIN_ROWS: Optional[int] = 100_000  # С какого числа чанков LanceDB строит индекс IVF-PQ (None — без индекса)
+    LANCE_NPROBES: int = 20  # Разделов IVF, просматриваемых при поиске по индексу LanceDB
+    LANCE_REFINE_FACTOR: Optional[int] = None  # Уточнение кандидатов индекса LanceDB по полным векторам (None — без уточнения)
     DOCS_DIR: Path = Path("docs")
+    WATCH_DEBOUNCE_MS: int = 1600  # Окно накопления событий в режиме наблюдения
     RESULTS_DIR: Path = Path(".results")
 
 class SimpleConfig(BaseConfig):
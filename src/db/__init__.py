@@ -1,5 +1,9 @@
+from .base import BaseVectorDB
 from .chromadb import ChromaDB
+from .lancedb import LanceDB
 
 __all__ = [
-    "ChromaDB"
+    "BaseVectorDB",
+    "ChromaDB",
+    "LanceDB"
 ]
\ No newline at end of file
@@ -0,0 +1,281 @@
+import time
+from abc import (
+    ABC, # ABC - для создания абстрактных классов
+    abstractmethod # abstractmethod - для абстрактных методов
+)
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+from ..documents.batch import ChunkBatch
+from ..documents.models import Chunk
+from ..logger import LoggerService
+
+# Поля результатов поиска по умолчанию: текст чанка и расстояние
+DEFAULT_INCLUDE = ("documents", "distances")
+
+
+class BaseVectorDB(ABC, LoggerService):
+    """
+    Базовый абстрактный класс векторных хранилищ.
+    Общая часть: запись пачек в отдельном потоке, поиск по одному запросу через search_many,
+    удаление чанков файла или документа через delete_where.
+    """
+
+    # Поля результата поиска (аргумент include) и соответствующие ключи результатов
+    SEARCH_FIELDS = {
+        "documents": "content",
+        "distances": "distance",
+        "metadatas": "metadata",
+        "embeddings": "embedding",
+    }
+
+    @property
+    @abstractmethod
+    def max_batch_size(self) -> int:
+        """Максимальное количество записей в одном запросе записи."""
+        pass
+
+    @abstractmethod
+    def reset_collection(self):
+        """Удаляет все чанки коллекции."""
+        pass
+
+    @abstractmethod
+    def delete_where(self, where: dict, page_size: Optional[int] = None) -> int:
+        """
+        Удаляет чанки, подходящие под фильтр метаданных.
+
+        Args:
+            where: Фильтр метаданных, например {"source": "docs/a.txt"}
+            page_size: Размер страницы удаления (если хранилище удаляет страницами)
+
+        Returns:
+            Количество удаленных чанков
+        """
+        pass
+
+    @abstractmethod
+    def search_many(
+        self,
+        query_embeddings: np.ndarray | Sequence[Sequence[float]],
+        n_results: int = 3,
+        where: Optional[dict] = None,
+        where_document: Optional[dict] = None,
+        include: Sequence[str] = DEFAULT_INCLUDE,
+        **kwargs
+    ) -> list[list[dict]]:
+        """
+        Поиск похожих документов для нескольких запросов.
+
+        Args:
+            query_embeddings: матрица эмбеддингов запросов (число запросов x размерность)
+            n_results: количество результатов на запрос
+            where: фильтр по метаданным чанков
+            where_document: фильтр по тексту чанков
+            include: поля результата из SEARCH_FIELDS (ID возвращаются всегда)
+            **kwargs: дополнительные параметры поиска
+
+        Returns:
+            Списки найденных документов для каждого запроса в исходном порядке
+        """
+        pass
+
+    @abstractmethod
+    def get_collection_stats(self) -> dict:
+        """Получение статистики о коллекции"""
+        pass
+
+    @abstractmethod
+    def get_pipeline(self) -> Optional[dict]:
+        """
+        Параметры пайплайна, которым проиндексирована коллекция (см. set_pipeline).
+
+        Returns:
+            Параметры или None, если коллекция создана без них
+        """
+        pass
+
+    @abstractmethod
+    def set_pipeline(self, pipeline: dict):
+        """
+        Сохраняет вместе с коллекцией параметры пайплайна, которым она индексируется:
+        разбиение на чанки, модель эмбеддингов (с проекцией) и размерность векторов.
+
+        Args:
+            pipeline: Параметры пайплайна (JSON-сериализуемый словарь)
+        """
+        pass
+
+    @abstractmethod
+    def _upsert(self, batch: ChunkBatch) -> list[float]:
+        """Записывает пачку запросами не больше max_batch_size записей и возвращает задержку каждого запроса."""
+        pass
+
+    def optimize(self):
+        """
+        Обслуживание хранилища после массовой записи (построение индексов, уплотнение файлов).
+        По умолчанию ничего не делает: хранилище поддерживает индекс при записи.
+        """
+        pass
+
+    def clear_collection(self):
+        """
+        Очищает все данные из коллекции (см. reset_collection).
+        """
+        self.reset_collection()
+
+    def delete_by_source(self, source: str) -> int:
+        """
+        Удаляет все чанки, полученные из указанного файла.
+
+        Args:
+            source: Путь к исходному файлу (значение метаданных "source")
+
+        Returns:
+            Количество удаленных чанков
+        """
+        deleted = self.delete_where({"source": source})
+        self._logger_info(f"Удалены чанки файла {source}: {deleted}")
+        return deleted
+
+    def delete_by_doc_id(self, doc_id: str) -> int:
+        """
+        Удаляет все чанки документа.
+
+        Args:
+            doc_id: ID документа (значение метаданных "original_document_id")
+
+        Returns:
+            Количество удаленных чанков
+        """
+        deleted = self.delete_where({"original_document_id": doc_id})
+        self._logger_info(f"Удалены чанки документа {doc_id}: {deleted}")
+        return deleted
+
+    def add_documents(
+        self,
+        chunks: Sequence[Chunk],
+        embeddings: np.ndarray | list[list[float]],
+    ):
+        """
+        Добавление документов в хранилище (upsert: чанки с существующими ID перезаписываются).
+
+        Args:
+            chunks: список чанков документов (DocumentChunk или компактные ChunkView)
+            embeddings: матрица float32 (передается в хранилище без преобразования в списки)
+                или список векторных представлений
+        """
+        if not len(chunks):
+            return
+        # Метаданные ChunkView материализуются в dict в ChunkBatch.from_chunks
+        self.add_batch(ChunkBatch.from_chunks(chunks).with_embeddings(np.asarray(embeddings, dtype=np.float32)))
+
+    def add_batch(self, batch: ChunkBatch) -> dict[str, float]:
+        """
+        Добавление колоночной пачки чанков в хранилище (upsert) запросами не больше max_batch_size записей.
+        Матрица эмбеддингов передается в хранилище как есть, без преобразования в списки.
+
+        Args:
+            batch: пачка чанков с эмбеддингами
+
+        Returns:
+            Статистика записи (см. bulk_upsert)
+        """
+        return self.bulk_upsert([batch])
+
+    def bulk_upsert(self, batches: Iterable[ChunkBatch]) -> dict[str, float]:
+        """
+        Массовая запись пачек чанков (upsert). Пачки делятся на запросы не больше max_batch_size записей.
+        Запись идет в отдельном потоке: пока пишется одна пачка, следующая готовится вызывающим —
+        например, если batches — генератор, который создает эмбеддинги, кодирование и запись
+        выполняются параллельно.
+
+        Args:
+            batches: пачки чанков с эмбеддингами (список или ленивый итератор)
+
+        Returns:
+            Статистика: записей, запросов, секунд, записей в секунду, средняя и максимальная задержка запроса (мс)
+        """
+        started_at = time.perf_counter()
+        latencies: list[float] = []
+        rows = 0
+        pending: Optional[Future] = None
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{type(self).__name__.lower()}-upsert") as executor:
+            try:
+                for batch in batches:
+                    if batch.embeddings is None:
+                        raise ValueError("Для записи в хранилище у пачки должны быть эмбеддинги")
+                    if not len(batch):
+                        continue
+
+                    # Не больше одной пачки в очереди записи: эмбеддинги не копятся в памяти
+                    if pending is not None:
+                        latencies.extend(pending.result())
+                    pending = executor.submit(self._upsert, batch)
+                    rows += len(batch)
+
+                if pending is not None:
+                    latencies.extend(pending.result())
+            except Exception as e:
+                self._logger_error(f"Ошибка добавления чанков: {e}")
+                raise
+
+        elapsed = time.perf_counter() - started_at
+        stats = {
+            "rows": rows,
+            "requests": len(latencies),
+            "seconds": elapsed,
+            "rows_per_second": rows / elapsed if elapsed > 0 else 0.0,
+            "mean_latency_ms": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+            "max_latency_ms": 1000 * max(latencies, default=0.0),
+        }
+        if rows:
+            self._logger_info(
+                f"Записано чанков: {rows} за {elapsed:.2f} с ({stats['rows_per_second']:.0f} в секунду), "
+                f"запросов {stats['requests']}, задержка запроса: средняя {stats['mean_latency_ms']:.1f} мс, "
+                f"максимальная {stats['max_latency_ms']:.1f} мс"
+            )
+        return stats
+
+    def search(
+        self,
+        query_embedding: np.ndarray | list[float],
+        n_results: int = 3,
+        where: Optional[dict] = None,
+        where_document: Optional[dict] = None,
+        include: Sequence[str] = DEFAULT_INCLUDE,
+        **kwargs
+    ):
+        """
+        Поиск похожих документов.
+
+        Args:
+            query_embedding: векторное представление поискового запроса (np.ndarray или список)
+            n_results: количество результатов
+            where: фильтр по метаданным чанков, например {"source": "docs/a.pdf"}
+            where_document: фильтр по тексту чанков, например {"$contains": "Толстой"}
+            include: какие поля читать из базы (см. search_many)
+            **kwargs: дополнительные параметры поиска
+
+        Returns:
+            Список найденных документов с метаданными
+        """
+        return self.search_many(
+            np.asarray(query_embedding)[None, :],
+            n_results=n_results,
+            where=where,
+            where_document=where_document,
+            include=include,
+            **kwargs
+        )[0]
+
+    def _check_include(self, include: Sequence[str]):
+        """Проверяет, что все поля include известны."""
+        unknown = set(include) - self.SEARCH_FIELDS.keys()
+        if unknown:
+            raise ValueError(
+                f"Неизвестные поля {sorted(unknown)}. Доступные поля: {', '.join(self.SEARCH_FIELDS)}"
+            )
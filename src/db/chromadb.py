@@ -1,17 +1,29 @@
-import chromadb
-from chromadb.config import Settings
-from typing import Optional, Sequence
+import json
+import time
+import numpy as np
+from typing import TYPE_CHECKING, Optional, Sequence
 from pathlib import Path
 
-from ..documents.models import DocumentChunk, Metadata, ChunkID, Content
-from ..logger import LoggerService
+from ..documents.batch import ChunkBatch
+from .base import DEFAULT_INCLUDE, BaseVectorDB
 
+if TYPE_CHECKING:
+    import chromadb
 
-class ChromaDB(LoggerService):
-    """Хранилище векторных представлений на основе ChromaDB."""
 
-    client: chromadb.ClientAPI
-    collection: chromadb.Collection
+class ChromaDB(BaseVectorDB):
+    """
+    Хранилище векторных представлений на основе ChromaDB.
+    Клиент и коллекция открываются при первом обращении: импорт chromadb и открытие базы
+    не задерживают запуск, если хранилище не понадобилось.
+    """
+
+    _client: Optional["chromadb.ClientAPI"] = None
+    _collection: Optional["chromadb.Collection"] = None
+    _max_batch_size: Optional[int] = None
+
+    # Ключ метаданных коллекции с параметрами пайплайна
+    PIPELINE_METADATA_KEY = "pipeline"
 
     def __init__(
         self,
@@ -25,15 +37,33 @@ class ChromaDB(LoggerService):
         """
         super().__init__()
 
-        persist_directory_path = str(Path('./.db', persist_directory) if persist_directory else Path('./.db'))
+        self.collection_name = collection_name
+        self.persist_directory_path = str(Path('./.db', persist_directory) if persist_directory else Path('./.db'))
+
+    @property
+    def client(self) -> "chromadb.ClientAPI":
+        if self._client is None:
+            self._connect()
+        return self._client
+
+    @property
+    def collection(self) -> "chromadb.Collection":
+        if self._collection is None:
+            self._connect()
+        return self._collection
+
+    def _connect(self):
+        """Открывает клиент ChromaDB и коллекцию."""
+        import chromadb
+        from chromadb.config import Settings
 
         self._logger_info("Инициализация ChromaDB...")
 
         try:
             # Инициализируем клиент ChromaDB с постоянным хранилищем (встроенная SQLite)
             # Клиент chromadb.Client() хранит данные в памяти, не использует постоянные хранилища
-            self.client = chromadb.PersistentClient(
-                path=persist_directory_path,
+            self._client = chromadb.PersistentClient(
+                path=self.persist_directory_path,
                 settings=Settings(
                     anonymized_telemetry=False,   # Отключаем отправку телеметрии
                     # is_persistent=True            # Используем постоянные хранилища
@@ -45,8 +75,8 @@ class ChromaDB(LoggerService):
 
         try:
             # Получаем существующую коллекцию или создаем новую
-            self.collection = self.client.get_or_create_collection(
-                name=collection_name,
+            self._collection = self._client.get_or_create_collection(
+                name=self.collection_name,
                 configuration={
                     "hnsw": {
                         "space": "cosine",
@@ -55,140 +85,170 @@ class ChromaDB(LoggerService):
                 },
             )
         except Exception as e:
-            self._logger_error(f"Ошибка коллекции {collection_name}: {e}")
+            self._logger_error(f"Ошибка коллекции {self.collection_name}: {e}")
             raise
 
         self._logger_info("Инициализация завершена!")
 
-    def clear_collection(self):
+    def reset_collection(self):
         """
-        Очищает все данные из коллекции.
+        Удаляет коллекцию и создает ее заново с той же конфигурацией (HNSW) и метаданными.
+        В отличие от удаления по списку ID, не читает записи коллекции: время и память не зависят от ее размера.
         """
         try:
             self._logger_info("Очистка коллекции...")
-            
-            # Получаем все ID документов в коллекции
-            all_data = self.collection.get()
-            
-            if all_data['ids']:
-                # Удаляем все документы по их ID
-                self.collection.delete(ids=all_data['ids'])
-                self._logger_info(f"Удалено {len(all_data['ids'])} документов из коллекции")
-            else:
-                self._logger_info("Коллекция уже пуста")
-                
+
+            collection = self.collection
+            configuration, metadata = collection.configuration, collection.metadata
+            self.client.delete_collection(self.collection_name)
+            self._collection = self.client.create_collection(
+                name=self.collection_name,
+                configuration=configuration,
+                metadata=metadata,
+            )
+
+            self._logger_info(f"Коллекция {self.collection_name} пересоздана")
         except Exception as e:
             self._logger_error(f"Ошибка очистки коллекции: {e}")
             raise
 
-    def add_documents(
-        self,
-        chunks: list[DocumentChunk],
-        embeddings: list[list[float]],
-    ):
-        """
-        Добавление документов в хранилище.
-        
-        Args:
-            chunks: список чанков документов
-            embeddings: список векторных представлений
+    def delete_where(self, where: dict, page_size: Optional[int] = None) -> int:
         """
-        try:
-            self._logger_info(f"Добавление документов в хранилище...")
-            # Подготавливаем данные для ChromaDB
-            ids: list[ChunkID] = []
-            documents: list[Content] = []
-            metadatas: list[Metadata] = []
-
-            for chunk in chunks:
-                ids.append(chunk.chunk_id)
-                documents.append(chunk.content)
-                metadatas.append(chunk.metadata)
-
-            # embeddings_seq: list[Sequence[float]] = [tuple(vec) for vec in embeddings]
-
-            import time
-
-            # Заснуть на 2 секунды
-            time.sleep(2)
+        Удаляет чанки, подходящие под фильтр метаданных, страницами: за раз читаются только ID
+        (без текстов, метаданных и эмбеддингов) не больше page_size записей.
 
-            self.collection.add(
-                ids=ids,  # ID каждого чанка
-                documents=documents,   # Содержимое каждого чанка
-                metadatas=metadatas,   # Метаданные каждого чанка
-                embeddings=embeddings, # type: ignore # Векторные представления, приведённые к float
-            )
+        Args:
+            where: Фильтр метаданных ChromaDB, например {"source": "docs/a.txt"}
+            page_size: Размер страницы (None — max_batch_size клиента)
 
-            # time.sleep(2)
-            self._logger_info(f"Добавление документов в хранилище завершено!")
+        Returns:
+            Количество удаленных чанков
+        """
+        page_size = page_size or self.max_batch_size
+        deleted = 0
 
+        try:
+            while True:
+                ids = self.collection.get(where=where, limit=page_size, include=[])["ids"]
+                if not ids:
+                    break
+                self.collection.delete(ids=ids)
+                deleted += len(ids)
         except Exception as e:
-            # print(e)
-            # self._logger_error(f"Ошибка добавления документов!")
-            # self._logger_error(f"Ошибка в test_vector_store: {e.__traceback__}")
-            # self._logger_error(f"e.__class__.__name__: {e.__class__.__name__}")
-            
+            self._logger_error(f"Ошибка удаления чанков по фильтру {where}: {e}")
             raise
 
-    def search(
+        return deleted
+
+    @property
+    def max_batch_size(self) -> int:
+        """Максимальное количество записей в одном запросе к ChromaDB (ограничение клиента)."""
+        if self._max_batch_size is None:
+            self._max_batch_size = self.client.get_max_batch_size()
+        return self._max_batch_size
+
+    def _upsert(self, batch: ChunkBatch) -> list[float]:
+        """Записывает пачку запросами не больше max_batch_size записей и возвращает задержку каждого запроса."""
+        latencies: list[float] = []
+        for part in batch.split(self.max_batch_size):
+            started_at = time.perf_counter()
+            self.collection.upsert(
+                ids=part.ids,
+                documents=part.texts,
+                metadatas=part.metadatas,  # type: ignore
+                embeddings=part.embeddings,
+            )
+            latencies.append(time.perf_counter() - started_at)
+        return latencies
+
+    def search_many(
         self,
-        query_embedding: list[float],
+        query_embeddings: np.ndarray | Sequence[Sequence[float]],
         n_results: int = 3,
+        where: Optional[dict] = None,
+        where_document: Optional[dict] = None,
+        include: Sequence[str] = DEFAULT_INCLUDE,
         **kwargs
-    ):
+    ) -> list[list[dict]]:
         """
-        Поиск похожих документов.
-        
+        Поиск похожих документов для нескольких запросов: матрица эмбеддингов запросов
+        передается в ChromaDB одним вызовом query (частями не больше max_batch_size запросов).
+        Фильтры применяются в ChromaDB до ранжирования, а из базы читаются только поля из include.
+
         Args:
-            query_embedding: векторное представление поискового запроса
-            n_results: количество результатов
+            query_embeddings: матрица эмбеддингов запросов (число запросов x размерность)
+            n_results: количество результатов на запрос
+            where: фильтр по метаданным чанков (source, extension, original_document_id и т.д.),
+                синтаксис ChromaDB: {"extension": ".pdf"}, {"$and": [...]}, {"chunk_index": {"$lt": 3}}
+            where_document: фильтр по тексту чанков: {"$contains": "..."}, {"$not_contains": "..."}
+            include: поля результата из SEARCH_FIELDS. ID возвращаются всегда.
+                documents → content, distances → distance, metadatas → metadata, embeddings → embedding
             **kwargs: дополнительные параметры поиска
-            
+
         Returns:
-            Список найденных документов с метаданными
+            Списки найденных документов для каждого запроса в исходном порядке
         """
+        self._check_include(include)
+
+        query_embeddings = np.asarray(query_embeddings, dtype=np.float32)
+        if not len(query_embeddings):
+            return []
 
         try:
-            self._logger_info(f"Поиск похожих документов...")
-            # Выполняем поиск в ChromaDB
-            results = self.collection.query(
-                query_embeddings=query_embedding,
-                n_results=n_results,
-                **kwargs
-            )
+            self._logger_info(f"Поиск похожих документов для запросов: {len(query_embeddings)}...")
+
+            formatted_results = []
+            for start in range(0, len(query_embeddings), self.max_batch_size):
+                part = query_embeddings[start:start + self.max_batch_size]
+                # Выполняем поиск в ChromaDB
+                results = self.collection.query(
+                    query_embeddings=part,
+                    n_results=n_results,
+                    where=where,
+                    where_document=where_document,
+                    include=list(include),
+                    **kwargs
+                )
+                formatted_results.extend(self._format_results(results, len(part), include))
 
-            # Проверяем наличие результатов
-            if not results['ids'] or not results['documents'] or not results['distances']:
-                self._logger_info("Нет результатов поиска")
-                return []
-
-            # Берем первый список, так как query_embeddings был один
-            ids = results['ids'][0]  # List[str]
-            documents = results['documents'][0]  # List[str]
-            distances = results['distances'][0]  # List[float]
-            # metadatas может быть None, поэтому используем get
-            # metadatas = results.get('metadatas')[0]  # List[Dict]
-
-            # Форматируем результаты
-            formatted_results = [
-                {
-                    'id': id_,
-                    'content': doc,
-                    'distance': dist
-                }
-                for id_, doc, dist in zip(ids, documents, distances)
-            ]
-            
             return formatted_results
 
         except Exception as e:
             self._logger_error(f"Ошибка поиска: {e}")
             raise
 
+    def _format_results(self, results: dict, count: int, include: Sequence[str]) -> list[list[dict]]:
+        """Разбирает ответ query на списки результатов для count запросов."""
+        # Проверяем наличие результатов
+        if not results['ids']:
+            self._logger_info("Нет результатов поиска")
+            return [[] for _ in range(count)]
+
+        # Колонки ответа: ID и запрошенные поля, по одному списку на каждый эмбеддинг запроса
+        names = ['id', *(self.SEARCH_FIELDS[field] for field in include)]
+        columns = [results['ids'], *(results[field] for field in include)]
+
+        # Форматируем результаты
+        return [
+            [dict(zip(names, values)) for values in zip(*rows)]
+            for rows in zip(*columns)
+        ]
+
     def get_collection_stats(self):
         """Получение статистики о коллекции"""
         count = self.collection.count()  # Количество документов
         return {
             "total_documents": count,
             "collection_name": self.collection.name
-        }
\ No newline at end of file
+        }
+
+    def get_pipeline(self) -> Optional[dict]:
+        """Параметры пайплайна из метаданных коллекции (None — коллекция создана без них)."""
+        raw = (self.collection.metadata or {}).get(self.PIPELINE_METADATA_KEY)
+        return json.loads(raw) if raw else None
+
+    def set_pipeline(self, pipeline: dict):
+        """Сохраняет параметры пайплайна в метаданных коллекции (JSON-строкой)."""
+        metadata = dict(self.collection.metadata or {})
+        metadata[self.PIPELINE_METADATA_KEY] = json.dumps(pipeline, sort_keys=True)
+        self.collection.modify(metadata=metadata)
@@ -0,0 +1,451 @@
+import json
+import os
+import time
+import numpy as np
+from typing import TYPE_CHECKING, Optional, Sequence
+from pathlib import Path
+
+from ..documents.batch import ChunkBatch
+from .base import DEFAULT_INCLUDE, BaseVectorDB
+
+if TYPE_CHECKING:
+    import lancedb
+    import pyarrow as pa
+
+# Метаданные чанков, которые хранятся отдельными колонками: по ним работают фильтры where
+# (значения: тип колонки Arrow). Полные метаданные хранятся в колонке metadata в JSON
+FILTER_COLUMNS = {
+    "source": "string",
+    "filename": "string",
+    "extension": "string",
+    "original_document_id": "string",
+    "chunk_index": "int64",
+    "total_chunks": "int64",
+}
+
+# Операторы сравнения фильтра where (синтаксис ChromaDB) и их SQL-аналоги
+_WHERE_OPERATORS = {
+    "$eq": "=",
+    "$ne": "!=",
+    "$gt": ">",
+    "$gte": ">=",
+    "$lt": "<",
+    "$lte": "<=",
+}
+
+
+def _sql_literal(value) -> str:
+    """SQL-литерал значения фильтра."""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    raise ValueError(f"Неподдерживаемое значение фильтра: {value!r}")
+
+
+def _where_sql(where: dict | str) -> str:
+    """
+    Переводит фильтр метаданных в синтаксисе ChromaDB в SQL-условие LanceDB.
+    Поддерживаются равенство, $eq, $ne, $gt, $gte, $lt, $lte, $in, $nin, $and и $or
+    по колонкам FILTER_COLUMNS. Строка считается готовым SQL-условием.
+
+    Args:
+        where: Фильтр, например {"extension": ".pdf", "chunk_index": {"$lt": 3}}
+
+    Returns:
+        SQL-условие, например "extension = '.pdf' AND chunk_index < 3"
+    """
+    if isinstance(where, str):
+        return where
+    if not where:
+        raise ValueError("Пустой фильтр where")
+
+    clauses = []
+    for key, condition in where.items():
+        if key in ("$and", "$or"):
+            operator = " AND " if key == "$and" else " OR "
+            clauses.append("(" + operator.join(f"({_where_sql(item)})" for item in condition) + ")")
+            continue
+
+        if key not in FILTER_COLUMNS:
+            raise ValueError(
+                f"Фильтр по полю {key} не поддерживается. Доступные поля: {', '.join(FILTER_COLUMNS)}"
+            )
+
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for operator, value in condition.items():
+            if operator in _WHERE_OPERATORS:
+                clauses.append(f"{key} {_WHERE_OPERATORS[operator]} {_sql_literal(value)}")
+            elif operator in ("$in", "$nin"):
+                values = ", ".join(_sql_literal(item) for item in value)
+                clauses.append(f"{key} {'IN' if operator == '$in' else 'NOT IN'} ({values})")
+            else:
+                raise ValueError(f"Неподдерживаемый оператор фильтра: {operator}")
+
+    return " AND ".join(clauses)
+
+
+def _where_document_sql(where_document: dict) -> str:
+    """
+    Переводит фильтр по тексту чанков ($contains, $not_contains, $and, $or) в SQL-условие LIKE.
+
+    Args:
+        where_document: Фильтр, например {"$contains": "Толстой"}
+
+    Returns:
+        SQL-условие по колонке text
+    """
+    clauses = []
+    for operator, value in where_document.items():
+        if operator in ("$and", "$or"):
+            joiner = " AND " if operator == "$and" else " OR "
+            clauses.append("(" + joiner.join(f"({_where_document_sql(item)})" for item in value) + ")")
+        elif operator in ("$contains", "$not_contains"):
+            # Символы шаблона LIKE в искомой строке экранируются
+            pattern = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            negation = "NOT " if operator == "$not_contains" else ""
+            clauses.append(f"text {negation}LIKE {_sql_literal(f'%{pattern}%')}")
+        else:
+            raise ValueError(f"Неподдерживаемый оператор фильтра по тексту: {operator}")
+
+    return " AND ".join(clauses)
+
+
+class LanceDB(BaseVectorDB):
+    """
+    Хранилище векторных представлений на основе LanceDB: встроенная база в локальной директории,
+    таблица хранится в колоночном формате Lance. Запись пачки — одна операция над Arrow-таблицей,
+    матрица эмбеддингов передается без копирования. Результаты поиска читаются в Arrow,
+    из таблицы читаются только колонки из include.
+    Без индекса поиск точный (полный перебор). optimize() строит индекс IVF-PQ, когда в таблице
+    не меньше index_min_rows чанков, и добавляет в него новые записи.
+    Подключение и таблица открываются при первом обращении; таблица создается при первой записи,
+    когда известна размерность эмбеддингов.
+    """
+
+    _connection: Optional["lancedb.DBConnection"] = None
+    _table: Optional["lancedb.table.Table"] = None
+
+    # Максимальное количество записей в одной операции записи
+    MAX_BATCH_SIZE = 8192
+
+    # Колонки таблицы для полей include (расстояние LanceDB возвращает в колонке _distance)
+    _COLUMNS = {
+        "documents": "text",
+        "distances": "_distance",
+        "metadatas": "metadata",
+        "embeddings": "vector",
+    }
+
+    def __init__(
+        self,
+        collection_name: str = 'default',
+        persist_directory: Optional[str] = None,
+        index_min_rows: Optional[int] = 100_000,
+        nprobes: int = 20,
+        refine_factor: Optional[int] = None,
+    ):
+        """
+        Args:
+            collection_name: название таблицы, откуда читать/писать данные
+            persist_directory: директория для хранения базы (внутри .db/lancedb)
+            index_min_rows: с какого количества чанков optimize() строит индекс IVF-PQ (None — без индекса)
+            nprobes: сколько разделов IVF просматривается при поиске по индексу
+            refine_factor: уточнение расстояний по полным векторам для refine_factor x n_results
+                кандидатов индекса (None — без уточнения)
+        """
+        super().__init__()
+
+        self.collection_name = collection_name
+        self.persist_directory_path = str(
+            Path('./.db/lancedb', persist_directory) if persist_directory else Path('./.db/lancedb')
+        )
+        self.index_min_rows = index_min_rows
+        self.nprobes = nprobes
+        self.refine_factor = refine_factor
+
+    @property
+    def connection(self) -> "lancedb.DBConnection":
+        if self._connection is None:
+            self._connect()
+        return self._connection
+
+    @property
+    def table(self) -> Optional["lancedb.table.Table"]:
+        """Таблица чанков (None — еще не создана)."""
+        if self._connection is None:
+            self._connect()
+        return self._table
+
+    def _connect(self):
+        """Открывает базу LanceDB и таблицу, если она уже создана."""
+        import lancedb
+
+        self._logger_info("Инициализация LanceDB...")
+
+        try:
+            self._connection = lancedb.connect(self.persist_directory_path)
+            if self.collection_name in self._connection.table_names():
+                self._table = self._connection.open_table(self.collection_name)
+        except Exception as e:
+            self._logger_error(f"Ошибка инициализации: {e}")
+            raise
+
+        self._logger_info("Инициализация завершена!")
+
+    def _create_table(self, dimension: int) -> "lancedb.table.Table":
+        """Создает пустую таблицу чанков для эмбеддингов размерности dimension."""
+        self._table = self.connection.create_table(
+            self.collection_name,
+            schema=self._schema(dimension),
+            exist_ok=True,
+        )
+        self._logger_info(f"Таблица {self.collection_name} создана, размерность эмбеддингов: {dimension}")
+        return self._table
+
+    @staticmethod
+    def _schema(dimension: int) -> "pa.Schema":
+        """Схема таблицы: ID, вектор, текст, колонки фильтров и полные метаданные в JSON."""
+        import pyarrow as pa
+
+        return pa.schema([
+            pa.field("id", pa.string(), nullable=False),
+            pa.field("vector", pa.list_(pa.float32(), dimension)),
+            pa.field("text", pa.string()),
+            *(pa.field(name, pa.type_for_alias(type_)) for name, type_ in FILTER_COLUMNS.items()),
+            pa.field("metadata", pa.string()),
+        ])
+
+    def reset_collection(self):
+        """
+        Удаляет таблицу. Новая таблица создается при следующей записи.
+        """
+        try:
+            self._logger_info("Очистка коллекции...")
+
+            if self.table is not None:
+                self.connection.drop_table(self.collection_name)
+                self._table = None
+
+            self._logger_info(f"Таблица {self.collection_name} удалена")
+        except Exception as e:
+            self._logger_error(f"Ошибка очистки коллекции: {e}")
+            raise
+
+    def delete_where(self, where: dict | str, page_size: Optional[int] = None) -> int:
+        """
+        Удаляет чанки, подходящие под фильтр метаданных, одной операцией (записи не читаются).
+
+        Args:
+            where: Фильтр метаданных в синтаксисе ChromaDB (см. _where_sql) или SQL-условие
+            page_size: Не используется: LanceDB удаляет по условию без чтения ID
+
+        Returns:
+            Количество удаленных чанков
+        """
+        if self.table is None:
+            return 0
+
+        try:
+            condition = _where_sql(where)
+            deleted = self.table.count_rows(condition)
+            if deleted:
+                self.table.delete(condition)
+        except Exception as e:
+            self._logger_error(f"Ошибка удаления чанков по фильтру {where}: {e}")
+            raise
+
+        return deleted
+
+    @property
+    def max_batch_size(self) -> int:
+        """Максимальное количество записей в одной операции записи."""
+        return self.MAX_BATCH_SIZE
+
+    def _upsert(self, batch: ChunkBatch) -> list[float]:
+        """Записывает пачку операциями не больше max_batch_size записей и возвращает задержку каждой."""
+        latencies: list[float] = []
+        table = self.table or self._create_table(batch.embeddings.shape[1])
+
+        for part in batch.split(self.max_batch_size):
+            started_at = time.perf_counter()
+            data = self._to_arrow(part)
+            if table.count_rows():
+                # upsert по ID: существующие чанки перезаписываются
+                table.merge_insert("id").when_matched_update_all().when_not_matched_insert_all().execute(data)
+            else:
+                # В пустую таблицу — простое добавление, без поиска совпадающих ID
+                table.add(data)
+            latencies.append(time.perf_counter() - started_at)
+        return latencies
+
+    def _to_arrow(self, batch: ChunkBatch) -> "pa.Table":
+        """Колоночная пачка в Arrow-таблицу; матрица эмбеддингов оборачивается без копирования."""
+        import pyarrow as pa
+
+        dimension = batch.embeddings.shape[1]
+        vectors = pa.FixedSizeListArray.from_arrays(pa.array(batch.embeddings.reshape(-1)), dimension)
+        return pa.table(
+            {
+                "id": batch.ids,
+                "vector": vectors,
+                "text": batch.texts,
+                **{name: [metadata.get(name) for metadata in batch.metadatas] for name in FILTER_COLUMNS},
+                "metadata": [json.dumps(metadata, ensure_ascii=False) for metadata in batch.metadatas],
+            },
+            schema=self._schema(dimension),
+        )
+
+    def optimize(self):
+        """
+        Строит индекс IVF-PQ (косинусное расстояние) и скалярные индексы колонок source и
+        original_document_id, когда в таблице не меньше index_min_rows чанков. Затем уплотняет
+        файлы после множества мелких записей и добавляет новые записи в существующие индексы.
+        """
+        if self.table is None:
+            return
+
+        try:
+            rows = self.table.count_rows()
+            indexed = {column for index in self.table.list_indices() for column in index.columns}
+
+            if self.index_min_rows is not None and rows >= self.index_min_rows and "vector" not in indexed:
+                started_at = time.perf_counter()
+                self.table.create_index(metric="cosine", vector_column_name="vector", index_type="IVF_PQ")
+                for column in ("source", "original_document_id"):
+                    if column not in indexed:
+                        self.table.create_scalar_index(column)
+                self._logger_info(
+                    f"Индекс IVF-PQ построен по {rows} чанкам за {time.perf_counter() - started_at:.2f} с"
+                )
+
+            self.table.optimize()
+        except Exception as e:
+            self._logger_error(f"Ошибка оптимизации таблицы {self.collection_name}: {e}")
+            raise
+
+    def search_many(
+        self,
+        query_embeddings: np.ndarray | Sequence[Sequence[float]],
+        n_results: int = 3,
+        where: Optional[dict | str] = None,
+        where_document: Optional[dict] = None,
+        include: Sequence[str] = DEFAULT_INCLUDE,
+        **kwargs
+    ) -> list[list[dict]]:
+        """
+        Поиск похожих документов для нескольких запросов одним запросом к таблице.
+        Фильтры применяются до ранжирования (prefilter), из таблицы читаются только колонки из include.
+
+        Args:
+            query_embeddings: матрица эмбеддингов запросов (число запросов x размерность)
+            n_results: количество результатов на запрос
+            where: фильтр по метаданным чанков (FILTER_COLUMNS) в синтаксисе ChromaDB или SQL-условие
+            where_document: фильтр по тексту чанков: {"$contains": "..."}, {"$not_contains": "..."}
+            include: поля результата из SEARCH_FIELDS. ID возвращаются всегда.
+                documents → content, distances → distance, metadatas → metadata, embeddings → embedding
+            **kwargs: не используются (совместимость с ChromaDB.search_many)
+
+        Returns:
+            Списки найденных документов для каждого запроса в исходном порядке
+        """
+        self._check_include(include)
+
+        query_embeddings = np.asarray(query_embeddings, dtype=np.float32)
+        if not len(query_embeddings):
+            return []
+        if self.table is None:
+            self._logger_info("Нет результатов поиска")
+            return [[] for _ in range(len(query_embeddings))]
+
+        conditions = []
+        if where:
+            conditions.append(f"({_where_sql(where)})")
+        if where_document:
+            conditions.append(f"({_where_document_sql(where_document)})")
+
+        try:
+            self._logger_info(f"Поиск похожих документов для запросов: {len(query_embeddings)}...")
+
+            query = (
+                self.table.search(list(query_embeddings), vector_column_name="vector")
+                .distance_type("cosine")
+                .limit(n_results)
+                .nprobes(self.nprobes)
+                # _distance выбирается явно: по нему сортируются результаты каждого запроса
+                .select(["id", "_distance", *(self._COLUMNS[field] for field in include if field != "distances")])
+            )
+            if self.refine_factor:
+                query = query.refine_factor(self.refine_factor)
+            if conditions:
+                query = query.where(" AND ".join(conditions), prefilter=True)
+
+            return self._format_results(query.to_arrow(), len(query_embeddings), include)
+
+        except Exception as e:
+            self._logger_error(f"Ошибка поиска: {e}")
+            raise
+
+    def _format_results(self, results: "pa.Table", count: int, include: Sequence[str]) -> list[list[dict]]:
+        """Разбирает Arrow-таблицу результатов на списки результатов для count запросов."""
+        formatted_results = [[] for _ in range(count)]
+        if not results.num_rows:
+            self._logger_info("Нет результатов поиска")
+            return formatted_results
+
+        # При нескольких векторах запроса LanceDB добавляет номер запроса в колонку query_index
+        if "query_index" in results.column_names:
+            results = results.sort_by([("query_index", "ascending"), ("_distance", "ascending")])
+            query_indexes = results.column("query_index").to_pylist()
+        else:
+            results = results.sort_by("_distance")
+            query_indexes = [0] * results.num_rows
+
+        names = ['id', *(self.SEARCH_FIELDS[field] for field in include)]
+        columns = [results.column("id").to_pylist()]
+        for field in include:
+            column = results.column(self._COLUMNS[field])
+            if field == "metadatas":
+                columns.append([json.loads(metadata) for metadata in column.to_pylist()])
+            elif field == "embeddings":
+                # Векторы читаются из Arrow одной матрицей, без построчных списков
+                vectors = column.combine_chunks()
+                matrix = vectors.flatten().to_numpy(zero_copy_only=False).reshape(len(vectors), -1)
+                columns.append(list(matrix))
+            else:
+                columns.append(column.to_pylist())
+
+        # Форматируем результаты
+        for query_index, values in zip(query_indexes, zip(*columns)):
+            formatted_results[query_index].append(dict(zip(names, values)))
+        return formatted_results
+
+    def get_collection_stats(self):
+        """Получение статистики о коллекции"""
+        return {
+            "total_documents": self.table.count_rows() if self.table is not None else 0,
+            "collection_name": self.collection_name
+        }
+
+    def get_pipeline(self) -> Optional[dict]:
+        """Параметры пайплайна из файла рядом с таблицей (None — таблица создана без них)."""
+        path = self._pipeline_path()
+        if not path.exists():
+            return None
+        with path.open(encoding="utf-8") as file:
+            return json.load(file)
+
+    def set_pipeline(self, pipeline: dict):
+        """Сохраняет параметры пайплайна в JSON-файл рядом с таблицей (таблица создается только при первой записи)."""
+        path = self._pipeline_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as file:
+            json.dump(pipeline, file, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def _pipeline_path(self) -> Path:
+        return Path(self.persist_directory_path, f"{self.collection_name}.pipeline.json")
@@ -0,0 +1,198 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.db import ChromaDB
+from src.documents import ChunkBatch, Document, TextChunker
+
+
+def make_batch(size: int, text: str = "чанк", offset: int = 0) -> ChunkBatch:
+    rng = np.random.default_rng(offset)
+    return ChunkBatch(
+        ids=[f"id-{offset + idx}" for idx in range(size)],
+        texts=[f"{text} {offset + idx}" for idx in range(size)],
+        metadatas=[{"source": "a.txt", "chunk_index": offset + idx} for idx in range(size)],
+        embeddings=rng.normal(size=(size, 8)).astype(np.float32),
+    )
+
+
+class TestChromaDBBulkUpsert(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db = ChromaDB(collection_name="test", persist_directory=self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_lazy_connection(self):
+        """Тест: база открывается при первом обращении к коллекции."""
+        db = ChromaDB(collection_name="lazy", persist_directory=self.tmp_dir.name)
+
+        self.assertIsNone(db._collection)
+        self.assertEqual(db.collection.count(), 0)
+
+    def test_batches_split_by_max_batch_size(self):
+        """Тест: пачки делятся на запросы не больше max_batch_size записей."""
+        self.db._max_batch_size = 7
+
+        stats = self.db.bulk_upsert(make_batch(10, offset=idx * 10) for idx in range(3))
+
+        self.assertEqual(stats["rows"], 30)
+        # Каждая пачка из 10 чанков — два запроса: 7 + 3
+        self.assertEqual(stats["requests"], 6)
+        self.assertGreater(stats["rows_per_second"], 0)
+        self.assertEqual(self.db.collection.count(), 30)
+
+    def test_upsert_overwrites_existing_ids(self):
+        """Тест: повторная запись чанков с теми же ID перезаписывает их."""
+        self.db.add_batch(make_batch(5))
+        self.db.add_batch(make_batch(5, text="новый"))
+
+        stored = self.db.collection.get(ids=["id-3"])
+        self.assertEqual(self.db.collection.count(), 5)
+        self.assertEqual(stored["documents"], ["новый 3"])
+
+    def test_add_documents_accepts_chunk_views(self):
+        """Тест: add_documents принимает компактные чанки и матрицу эмбеддингов."""
+        document = Document(content="Первое предложение. Второе предложение. " * 20, metadata={"source": "b.txt"})
+        chunks = TextChunker(chunk_size=100, chunk_overlap=10, compact=True).create_chunks(document)
+        embeddings = np.ones((len(chunks), 8), dtype=np.float32)
+
+        self.db.add_documents(chunks, embeddings)
+
+        self.assertEqual(self.db.collection.count(), len(chunks))
+        stored = self.db.collection.get(ids=[chunks[0].chunk_id])
+        self.assertEqual(stored["metadatas"][0]["source"], "b.txt")
+
+    def test_missing_embeddings(self):
+        """Тест: пачка без эмбеддингов не записывается."""
+        batch = make_batch(3)
+        batch.embeddings = None
+
+        with self.assertRaises(ValueError):
+            self.db.add_batch(batch)
+
+
+
+class TestChromaDBCleanup(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db = ChromaDB(collection_name="test", persist_directory=self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_reset_keeps_configuration(self):
+        """Тест: пересозданная коллекция пуста и сохраняет конфигурацию HNSW."""
+        self.db.add_batch(make_batch(10))
+        configuration = self.db.collection.configuration["hnsw"]
+
+        self.db.reset_collection()
+
+        self.assertEqual(self.db.collection.count(), 0)
+        self.assertEqual(self.db.collection.configuration["hnsw"], configuration)
+        self.assertEqual(configuration["space"], "cosine")
+
+        # Коллекция снова доступна для записи
+        self.db.add_batch(make_batch(3))
+        self.assertEqual(self.db.collection.count(), 3)
+
+    def test_pipeline_metadata(self):
+        """Тест: параметры пайплайна хранятся в метаданных коллекции и доступны после переподключения."""
+        pipeline = {"embedding_model": "model-pca-abc", "dimension": 8}
+        self.assertIsNone(self.db.get_pipeline())
+
+        self.db.set_pipeline(pipeline)
+        reopened = ChromaDB(collection_name="test", persist_directory=self.tmp_dir.name)
+
+        self.assertEqual(reopened.get_pipeline(), pipeline)
+
+    def test_paged_delete(self):
+        """Тест: удаление по фильтру страницами удаляет только подходящие чанки."""
+        first = make_batch(25)
+        second = make_batch(5, offset=100)
+        second.metadatas = [{"source": "b.txt", "original_document_id": "doc-b"} for _ in range(5)]
+        self.db.add_batch(ChunkBatch.concat([first, second]))
+
+        self.assertEqual(self.db.delete_where({"source": "a.txt"}, page_size=4), 25)
+        self.assertEqual(self.db.collection.count(), 5)
+        self.assertEqual(self.db.delete_by_doc_id("doc-b"), 5)
+        self.assertEqual(self.db.delete_by_source("missing.txt"), 0)
+        self.assertEqual(self.db.collection.count(), 0)
+
+
+class TestChromaDBSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db = ChromaDB(collection_name="test", persist_directory=self.tmp_dir.name)
+        self.batch = make_batch(20)
+        self.db.add_batch(self.batch)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_search_many_matches_single_search(self):
+        """Тест: пакетный поиск возвращает по списку на запрос, как поиск по одному."""
+        queries = self.batch.embeddings[[3, 7, 11]]
+
+        results = self.db.search_many(queries, n_results=2)
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual([result[0]["id"] for result in results], ["id-3", "id-7", "id-11"])
+        for query, result in zip(queries, results):
+            self.assertEqual(result, self.db.search(query, n_results=2))
+
+    def test_search_many_splits_by_max_batch_size(self):
+        """Тест: запросы делятся на вызовы не больше max_batch_size, порядок сохраняется."""
+        self.db._max_batch_size = 4
+
+        results = self.db.search_many(self.batch.embeddings, n_results=1)
+
+        self.assertEqual([result[0]["id"] for result in results], self.batch.ids)
+
+    def test_where_filters(self):
+        """Тест: фильтры по метаданным и тексту применяются до выбора n_results ближайших."""
+        other = make_batch(5, text="другой", offset=100)
+        other.metadatas = [{"source": "b.txt", "chunk_index": idx} for idx in range(5)]
+        self.db.add_batch(other)
+        query = self.batch.embeddings[0]
+
+        by_source = self.db.search(query, n_results=3, where={"source": "b.txt"})
+        all_by_source = self.db.search(query, n_results=10, where={"source": "b.txt"})
+        by_text = self.db.search(query, n_results=10, where_document={"$contains": "другой"})
+        combined = self.db.search(
+            query,
+            n_results=10,
+            where={"$and": [{"source": "b.txt"}, {"chunk_index": {"$lt": 2}}]},
+        )
+
+        self.assertEqual(len(by_source), 3)
+        self.assertLessEqual({result["id"] for result in by_source}, set(other.ids))
+        self.assertEqual({result["id"] for result in all_by_source}, {f"id-{idx}" for idx in range(100, 105)})
+        self.assertEqual(sorted(result["id"] for result in by_text), other.ids)
+        self.assertEqual(sorted(result["id"] for result in combined), ["id-100", "id-101"])
+
+    def test_include_projection(self):
+        """Тест: в результатах только запрошенные поля."""
+        query = self.batch.embeddings[5]
+
+        ids_only = self.db.search(query, n_results=2, include=[])
+        with_metadata = self.db.search(query, n_results=1, include=["metadatas", "distances"])
+
+        self.assertEqual(ids_only[0], {"id": "id-5"})
+        self.assertEqual(set(with_metadata[0]), {"id", "metadata", "distance"})
+        self.assertEqual(with_metadata[0]["metadata"], {"source": "a.txt", "chunk_index": 5})
+        with self.assertRaises(ValueError):
+            self.db.search(query, include=["uris"])
+
+    def test_search_many_empty(self):
+        """Тест: пустой список запросов не обращается к базе."""
+        self.assertEqual(self.db.search_many(np.empty((0, 8), dtype=np.float32)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import importlib.util
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.db import LanceDB
+from src.db.lancedb import _where_document_sql, _where_sql
+from src.documents import ChunkBatch
+
+
+def make_lance_batch(size: int, text: str = "чанк", offset: int = 0, source: str = "a.txt") -> ChunkBatch:
+    rng = np.random.default_rng(offset)
+    return ChunkBatch(
+        ids=[f"id-{offset + idx}" for idx in range(size)],
+        texts=[f"{text} {offset + idx}" for idx in range(size)],
+        metadatas=[
+            {"source": source, "chunk_index": offset + idx, "original_document_id": f"doc-{source}"}
+            for idx in range(size)
+        ],
+        embeddings=rng.normal(size=(size, 8)).astype(np.float32),
+    )
+
+
+class TestLanceDBFilters(unittest.TestCase):
+
+    def test_where_sql(self):
+        """Тест: фильтр метаданных в синтаксисе ChromaDB переводится в SQL-условие."""
+        self.assertEqual(_where_sql({"source": "docs/a'b.txt"}), "source = 'docs/a''b.txt'")
+        self.assertEqual(
+            _where_sql({"extension": ".pdf", "chunk_index": {"$gte": 2, "$lt": 5}}),
+            "extension = '.pdf' AND chunk_index >= 2 AND chunk_index < 5",
+        )
+        self.assertEqual(
+            _where_sql({"$or": [{"extension": {"$in": [".pdf", ".docx"]}}, {"total_chunks": 1}]}),
+            "((extension IN ('.pdf', '.docx')) OR (total_chunks = 1))",
+        )
+        self.assertEqual(_where_sql("chunk_index < 3"), "chunk_index < 3")
+
+    def test_where_sql_unsupported(self):
+        """Тест: фильтр по полю без колонки и неизвестный оператор отклоняются."""
+        with self.assertRaises(ValueError):
+            _where_sql({"size_bytes": 10})
+        with self.assertRaises(ValueError):
+            _where_sql({"source": {"$like": "a"}})
+
+    def test_where_document_sql(self):
+        """Тест: фильтр по тексту переводится в LIKE с экранированием символов шаблона."""
+        self.assertEqual(_where_document_sql({"$contains": "100%"}), "text LIKE '%100\\%%'")
+        self.assertEqual(
+            _where_document_sql({"$and": [{"$contains": "Толстой"}, {"$not_contains": "мир"}]}),
+            "((text LIKE '%Толстой%') AND (text NOT LIKE '%мир%'))",
+        )
+
+
+@unittest.skipUnless(importlib.util.find_spec("lancedb"), "lancedb не установлен")
+class TestLanceDB(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db = LanceDB(collection_name="test", persist_directory=self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_write_and_search(self):
+        """Тест: запись пачек, upsert по ID и пакетный поиск."""
+        batch = make_lance_batch(20)
+        self.db.add_batch(batch)
+        self.db.add_batch(make_lance_batch(5, text="новый"))
+
+        self.assertEqual(self.db.get_collection_stats()["total_documents"], 20)
+
+        results = self.db.search_many(batch.embeddings[[3, 7]], n_results=2)
+        self.assertEqual([result[0]["id"] for result in results], ["id-3", "id-7"])
+        self.assertEqual(results[0][0]["content"], "новый 3")
+        self.assertAlmostEqual(results[1][0]["distance"], 0.0, places=5)
+        self.assertEqual(self.db.search(batch.embeddings[7], n_results=2), results[1])
+
+    def test_filters_and_projection(self):
+        """Тест: фильтры применяются до выбора ближайших, в результатах только запрошенные поля."""
+        first = make_lance_batch(10)
+        self.db.add_batch(ChunkBatch.concat([first, make_lance_batch(5, text="другой", offset=100, source="b.txt")]))
+        query = first.embeddings[0]
+
+        by_source = self.db.search(query, n_results=3, where={"source": "b.txt"}, include=["metadatas"])
+        by_text = self.db.search(query, n_results=10, where_document={"$contains": "другой"}, include=[])
+
+        self.assertEqual(len(by_source), 3)
+        self.assertEqual(set(by_source[0]), {"id", "metadata"})
+        self.assertEqual(by_source[0]["metadata"]["source"], "b.txt")
+        self.assertEqual(sorted(result["id"] for result in by_text), [f"id-{idx}" for idx in range(100, 105)])
+
+    def test_delete_and_reset(self):
+        """Тест: удаление по файлу и документу, пересоздание таблицы."""
+        self.db.add_batch(ChunkBatch.concat([make_lance_batch(10), make_lance_batch(5, offset=100, source="b.txt")]))
+
+        self.assertEqual(self.db.delete_by_source("a.txt"), 10)
+        self.assertEqual(self.db.delete_by_doc_id("doc-b.txt"), 5)
+        self.assertEqual(self.db.delete_by_source("missing.txt"), 0)
+
+        self.db.add_batch(make_lance_batch(3))
+        self.db.reset_collection()
+        self.assertEqual(self.db.get_collection_stats()["total_documents"], 0)
+        self.assertEqual(self.db.search(np.ones(8, dtype=np.float32)), [])
+
+    def test_pipeline_metadata(self):
+        """Тест: параметры пайплайна хранятся рядом с таблицей, в том числе до ее создания."""
+        pipeline = {"embedding_model": "model-pca-abc", "dimension": 8}
+        self.assertIsNone(self.db.get_pipeline())
+
+        self.db.set_pipeline(pipeline)
+        reopened = LanceDB(collection_name="test", persist_directory=self.tmp_dir.name)
+
+        self.assertEqual(reopened.get_pipeline(), pipeline)
+
+    def test_optimize_builds_index(self):
+        """Тест: optimize() строит индексы только с index_min_rows чанков, поиск работает по индексу."""
+        self.db.index_min_rows = 300
+        self.db.add_batch(make_lance_batch(299))
+        self.db.optimize()
+        self.assertEqual(list(self.db.table.list_indices()), [])
+
+        self.db.add_batch(make_lance_batch(50, offset=299))
+        self.db.optimize()
+        indexed = {index.columns[0]: index.index_type for index in self.db.table.list_indices()}
+        self.assertEqual(indexed["vector"], "IvfPq")
+        self.assertIn("source", indexed)
+        self.assertIn("original_document_id", indexed)
+
+        # Повторный вызов добавляет новые записи в существующие индексы
+        self.db.add_batch(make_lance_batch(10, offset=1000))
+        self.db.optimize()
+        self.assertEqual(self.db.get_collection_stats()["total_documents"], 359)
+
+        self.db.refine_factor = 10
+        query = make_lance_batch(10, offset=1000).embeddings[4]
+        self.assertEqual(self.db.search(query, n_results=1, include=[]), [{"id": "id-1004"}])
+
+
+if __name__ == '__main__':
+    unittest.main()
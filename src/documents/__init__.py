@@ -1,14 +1,27 @@
-from .models import Document, DocumentChunk, Content, Metadata, DocID, ChunkID, ChunkIndex, CreatedAt
+from .models import Document, DocumentChunk, ChunkView, ChunkParent, ChunkMetadata, Chunk, Content, Metadata, DocID, ChunkID, ChunkIndex, CreatedAt
 from .loader import BaseDocumentLoader, TextFileLoader, DirectoryLoader
-from .chunker import TextChunker
+from .batch import ChunkBatch
+from .chunker import TextChunker, TokenTextChunker
+from .manifest import IngestionManifest, ManifestEntry
+from .cache import ExtractedTextCache, CachedText
 
 __all__ = [
     "Document",
     "DocumentChunk",
+    "ChunkView",
+    "ChunkParent",
+    "ChunkMetadata",
+    "Chunk",
+    "ChunkBatch",
     "BaseDocumentLoader",
     "TextFileLoader",
     "DirectoryLoader",
     "TextChunker",
+    "TokenTextChunker",
+    "IngestionManifest",
+    "ManifestEntry",
+    "ExtractedTextCache",
+    "CachedText",
     "Content",
     "Metadata",
     "DocID",
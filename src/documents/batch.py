@@ -0,0 +1,124 @@
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from .models import Chunk, ChunkID, Content, DocumentChunk
+
+
+@dataclass(slots=True)
+class ChunkBatch:
+    """
+    Колоночная пачка чанков: параллельные списки ID, текстов и метаданных
+    и непрерывная матрица эмбеддингов float32 (n_chunks x dimension).
+    Передается от чанкера к сервису эмбеддингов и в хранилище без построчных объектов.
+    """
+    # ID чанков
+    ids: list[ChunkID] = field(default_factory=list)
+    # Тексты чанков
+    texts: list[Content] = field(default_factory=list)
+    # Метаданные чанков (dict — формат, который принимает хранилище)
+    metadatas: list[dict] = field(default_factory=list)
+    # Эмбеддинги чанков, None — еще не посчитаны
+    embeddings: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[Chunk]) -> "ChunkBatch":
+        """
+        Собирает пачку из чанков (DocumentChunk или ChunkView).
+
+        Args:
+            chunks: Чанки
+
+        Returns:
+            Пачка без эмбеддингов
+        """
+        batch = cls()
+        for chunk in chunks:
+            metadata = chunk.metadata
+            batch.ids.append(chunk.chunk_id)
+            batch.texts.append(chunk.content)
+            batch.metadatas.append(metadata if isinstance(metadata, dict) else dict(metadata))
+        return batch
+
+    @classmethod
+    def concat(cls, batches: Iterable["ChunkBatch"]) -> "ChunkBatch":
+        """
+        Склеивает пачки в одну. Эмбеддинги склеиваются, только если они есть у всех пачек.
+
+        Args:
+            batches: Пачки
+
+        Returns:
+            Общая пачка
+        """
+        batches = [batch for batch in batches if len(batch)]
+        result = cls()
+        for batch in batches:
+            result.ids.extend(batch.ids)
+            result.texts.extend(batch.texts)
+            result.metadatas.extend(batch.metadatas)
+
+        if batches and all(batch.embeddings is not None for batch in batches):
+            result.embeddings = np.concatenate([batch.embeddings for batch in batches])
+        return result
+
+    def with_embeddings(self, embeddings: np.ndarray) -> "ChunkBatch":
+        """
+        Возвращает пачку с эмбеддингами (списки ID, текстов и метаданных общие с исходной).
+
+        Args:
+            embeddings: Матрица эмбеддингов n_chunks x dimension
+
+        Returns:
+            Пачка с эмбеддингами float32
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or embeddings.shape[0] != len(self):
+            raise ValueError(
+                f"Ожидалась матрица эмбеддингов ({len(self)}, dimension), получено {embeddings.shape}"
+            )
+        return ChunkBatch(self.ids, self.texts, self.metadatas, embeddings)
+
+    def slice(self, start: int, end: int) -> "ChunkBatch":
+        """
+        Возвращает часть пачки [start, end). Эмбеддинги — представление общей матрицы, без копии.
+
+        Args:
+            start: Индекс первого чанка
+            end: Индекс после последнего чанка
+
+        Returns:
+            Часть пачки
+        """
+        embeddings = self.embeddings[start:end] if self.embeddings is not None else None
+        return ChunkBatch(self.ids[start:end], self.texts[start:end], self.metadatas[start:end], embeddings)
+
+    def split(self, size: int) -> Iterator["ChunkBatch"]:
+        """
+        Делит пачку на части не больше size чанков (представления, без копии эмбеддингов).
+
+        Args:
+            size: Максимальный размер части
+
+        Yields:
+            Части пачки по порядку
+        """
+        for start in range(0, len(self), size):
+            yield self.slice(start, start + size)
+
+    def to_chunks(self) -> list[DocumentChunk]:
+        """Материализует пачку в список DocumentChunk (для отладочных результатов)."""
+        return [
+            DocumentChunk(
+                content=text,
+                metadata=metadata,
+                doc_id=metadata.get("original_document_id"),
+                chunk_id=chunk_id,
+                chunk_index=metadata.get("chunk_index", idx),
+            )
+            for idx, (chunk_id, text, metadata) in enumerate(zip(self.ids, self.texts, self.metadatas))
+        ]
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from ..logger import LoggerService
+
+
+@dataclass
+class CachedText:
+    """Извлеченный из файла текст и метаданные, полученные при разборе."""
+    # Извлеченный текст
+    text: str
+    # Метаданные, которые иначе пришлось бы получать разбором файла (например, num_pages)
+    metadata: dict = field(default_factory=dict)
+
+
+class ExtractedTextCache(LoggerService):
+    """
+    Дисковый кэш текста, извлеченного из PDF/DOCX.
+    Ключ — хеш содержимого файла и версия парсера, поэтому переименование файла не сбрасывает кэш,
+    а обновление PyPDF2/python-docx — сбрасывает.
+    Размер ограничен max_size_bytes, при переполнении вытесняются давно не использованные записи.
+    """
+
+    # Расширение файлов записей кэша
+    SUFFIX = ".json"
+
+    def __init__(self, cache_dir: str = ".cache/extracted_text", max_size_bytes: int = 1024 ** 3):
+        """
+        Args:
+            cache_dir: Директория кэша
+            max_size_bytes: Максимальный суммарный размер записей в байтах
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size_bytes = sum(entry.stat().st_size for entry in self._entries())
+
+    @staticmethod
+    def make_key(file_hash: str, parser: str, *extra: str) -> str:
+        """
+        Формирует ключ записи.
+
+        Args:
+            file_hash: Хеш содержимого файла
+            parser: Название и версия парсера (например, "PyPDF2==3.0.1")
+            *extra: Дополнительные части ключа (например, диапазон страниц)
+
+        Returns:
+            Ключ записи
+        """
+        return hashlib.sha256("\0".join((file_hash, parser, *extra)).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedText]:
+        """
+        Возвращает запись по ключу и отмечает ее как недавно использованную.
+
+        Args:
+            key: Ключ записи
+
+        Returns:
+            CachedText или None, если записи нет
+        """
+        path = self._path(key)
+
+        try:
+            with path.open(encoding="utf-8") as file:
+                raw = json.load(file)
+            # mtime записи — время последнего обращения, по нему работает LRU-вытеснение
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            self._logger_warning(f"Поврежденная запись кэша {str(path)}: {e}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return CachedText(text=raw["text"], metadata=raw.get("metadata", {}))
+
+    def put(self, key: str, value: CachedText):
+        """
+        Сохраняет запись и при переполнении вытесняет старые.
+
+        Args:
+            key: Ключ записи
+            value: Извлеченный текст и метаданные
+        """
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+
+        try:
+            with tmp_path.open("w", encoding="utf-8") as file:
+                json.dump({"text": value.text, "metadata": value.metadata}, file, ensure_ascii=False)
+            # При перезаписи ключа размер старой записи не должен учитываться дважды
+            try:
+                replaced_size = path.stat().st_size
+            except FileNotFoundError:
+                replaced_size = 0
+            # Атомарная замена: параллельные процессы не увидят недописанную запись
+            os.replace(tmp_path, path)
+            self._size_bytes += path.stat().st_size - replaced_size
+        except OSError as e:
+            self._logger_warning(f"Не удалось сохранить запись кэша {str(path)}: {e}")
+            return
+
+        if self._size_bytes > self.max_size_bytes:
+            self._evict()
+
+    def log_stats(self):
+        """Логирует статистику попаданий и промахов."""
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0.0
+        self._logger_info(
+            f"Кэш извлеченного текста: попаданий {self.hits}, промахов {self.misses} "
+            f"({hit_rate:.1f}% попаданий), вытеснено {self.evictions}"
+        )
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.SUFFIX}"
+
+    def _entries(self) -> list[Path]:
+        return list(self.cache_dir.glob(f"*{self.SUFFIX}"))
+
+    def _evict(self):
+        """
+        Удаляет давно не использованные записи, пока размер не опустится до 90% лимита.
+        Размер пересчитывается по директории, так как в нее могут писать другие процессы.
+        """
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue  # Запись уже удалил другой процесс
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+        size_bytes = sum(size for _, size, _ in entries)
+        target = self.max_size_bytes * 0.9
+
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if size_bytes <= target:
+                break
+            try:
+                entry.unlink()
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            size_bytes -= size
+
+        self._size_bytes = size_bytes
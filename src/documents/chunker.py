@@ -1,9 +1,20 @@
+import re
 import uuid  # Для генерации уникальных идентификаторов
+from bisect import bisect_left
+from typing import Callable, Iterable, Iterator, Optional
 
-from .models import Document, DocumentChunk
+from .batch import ChunkBatch
+from .models import Chunk, ChunkParent, ChunkView, Document, DocumentChunk
 
 from ..logger import LoggerService
 
+# Первый пробельный символ в диапазоне (\s в Unicode-режиме совпадает с str.isspace)
+_FIRST_WHITESPACE = re.compile(r"\s")
+# Жадный .* откатывается с конца диапазона до последнего пробельного символа
+_LAST_WHITESPACE = re.compile(r".*\s", re.DOTALL)
+# Начало чанка без пробелов (то же, что str.lstrip, но без создания строки)
+_FIRST_NON_WHITESPACE = re.compile(r"\S")
+
 class BaseChunker(LoggerService):
     """Базовый класс для разбиения документов на чанки."""
 
@@ -31,6 +42,31 @@ class BaseChunker(LoggerService):
         """
         raise NotImplementedError("create_chunks ожидает реализации.")
 
+    def create_batch(self, documents: Iterable[Document]) -> ChunkBatch:
+        """
+        Разбивает документы в колоночную пачку чанков.
+
+        Args:
+            documents: Исходные документы
+
+        Returns:
+            Пачка чанков без эмбеддингов
+        """
+        raise NotImplementedError("create_batch ожидает реализации.")
+
+    def iter_chunks(self, blocks: Iterable[str], document: Document) -> Iterator[DocumentChunk]:
+        """
+        Потоково создает чанки из текста, поступающего блоками.
+
+        Args:
+            blocks: Блоки текста документа (части файла, страницы PDF, сегменты лога)
+            document: Документ, метаданные и ID которого получат чанки
+
+        Yields:
+            Чанки с метаданными
+        """
+        raise NotImplementedError("iter_chunks ожидает реализации.")
+
 class TextChunker(BaseChunker):
     """Чанкер для разбиения текста на части по размеру."""
 
@@ -39,16 +75,29 @@ class TextChunker(BaseChunker):
         chunk_size: int = 500,
         chunk_overlap: int = 50,
         separators: list[str] = ["\n\n", "\n", ". ", "! ", "? "],
+        compact: bool = False,
     ):
         """
         Args:
             chunk_size: Максимальный размер чанка в символах
             chunk_overlap: Количество символов перекрытия между чанками
             separators: Символы или строки для разделения текста
+            compact: create_chunks создает компактные чанки (ChunkView) со смещениями в тексте документа
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.separators = separators
+        self.compact = compact
+
+    @property
+    def params(self) -> dict:
+        """Параметры, от которых зависят границы чанков: при их смене коллекцию нужно переиндексировать."""
+        return {
+            "chunker": type(self).__name__,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "separators": list(self.separators),
+        }
 
     def split_text(self, text: str) -> list[str]:
         """
@@ -60,93 +109,218 @@ class TextChunker(BaseChunker):
         Returns:
             Список чанков текста
         """
+        return [text[start:end] for start, end in self._split_spans(text)]
+
+    def iter_split_text(self, blocks: Iterable[str]) -> Iterator[str]:
+        """
+        Потоково разбивает текст, поступающий блоками. Чанки совпадают с split_text
+        для склеенного текста, перекрытие сохраняется на границах блоков.
+        В памяти держится только хвост текста, по которому еще не принято решение о разрыве,
+        поэтому потребление памяти не зависит от размера документа.
+
+        Args:
+            blocks: Блоки текста (части файла, страницы PDF, сегменты лога)
+
+        Yields:
+            Чанки текста
+        """
+        lookahead = self._stream_lookahead()
+        pending: list[str] = []
+        pending_len = 0
+        buffer = ""
 
+        for block in blocks:
+            pending.append(block)
+            pending_len += len(block)
+
+            # Проходим по буферу, когда в нем накопилось два запаса: каждый проход
+            # отдает не меньше запаса текста, и мелкие блоки не вызывают повторных проходов
+            if len(buffer) + pending_len < 2 * lookahead:
+                continue
+
+            buffer += "".join(pending)
+            pending.clear()
+            pending_len = 0
+
+            spans, rest = self._split_buffer(buffer, final=False)
+            for start, end in self._finalize_spans(buffer, spans):
+                yield buffer[start:end]
+            buffer = buffer[rest:]
+
+        buffer += "".join(pending)
+        if buffer:
+            spans, _ = self._split_buffer(buffer, final=True)
+            for start, end in self._finalize_spans(buffer, spans):
+                yield buffer[start:end]
+
+    def _split_spans(self, text: str) -> list[tuple[int, int]]:
+        """
+        Разбивает текст целиком.
+
+        Args:
+            text: Исходный текст
+
+        Returns:
+            Границы чанков [start, end) без пробелов по краям
+        """
         if not text:
             self._logger_warning("Текст пустой")
             return []
 
-        chunks: list[str] = []
+        spans, _ = self._split_buffer(text, final=True)
+        return self._finalize_spans(text, spans)
+
+    def _split_buffer(self, buffer: str, final: bool) -> tuple[list[tuple[int, int]], int]:
+        """
+        Разбивает буфер на чанки.
+
+        Args:
+            buffer: Текст
+            final: Буфер содержит конец текста. Иначе окна, для решения о которых
+                может понадобиться еще не прочитанный текст, остаются в хвосте
+
+        Returns:
+            Границы чанков без пробелов по краям и позиция хвоста буфера,
+            с которой нужно продолжить разбиение
+        """
+        spans: list[tuple[int, int]] = []
+        rest = buffer_len = len(buffer)
+        lookahead = self._stream_lookahead()
+        first_non_whitespace = _FIRST_NON_WHITESPACE.search
+
+        for start, end in self._iter_windows(buffer):
+            # Разбиение инвариантно к сдвигу, поэтому хвост с позиции start
+            # разбивается так же, как если бы текст был прочитан целиком
+            if not final and (end >= buffer_len or start + lookahead >= buffer_len):
+                rest = start
+                break
+
+            left = first_non_whitespace(buffer, start, end)
+            if left:
+                left = left.start()
+                # Окно обычно заканчивается одним-двумя пробельными символами после разделителя
+                while buffer[end - 1].isspace():
+                    end -= 1
+                spans.append((left, end))
+
+        return spans, rest
+
+    def _stream_lookahead(self) -> int:
+        """Сколько символов после начала окна нужно прочитать, чтобы принять решение о разрыве."""
+        return self.chunk_size
+
+    def _finalize_spans(self, text: str, spans: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        """Постобработка границ чанков после разбиения (в символьном режиме не нужна)."""
+        return spans
+
+    def _iter_windows(self, text: str) -> Iterator[tuple[int, int]]:
+        """
+        Отдает границы окон [start, end) до удаления пробелов по краям.
+        Размер окна и перекрытие измеряются в символах.
+
+        Args:
+            text: Исходный текст
+
+        Yields:
+            Пары (начало, конец) очередного чанка
+        """
+        chunk_size = self.chunk_size
+        chunk_overlap = self.chunk_overlap
+
+        return self._scan_windows(
+            text,
+            window_end=lambda start: start + chunk_size,
+            overlap_start=lambda best_split: best_split - chunk_overlap,
+            # Ширина поиска пробела для перекрытия (до половины размера чанка)
+            search_range=min(chunk_size // 2, chunk_overlap + 50),
+        )
+
+    def _scan_windows(
+        self,
+        text: str,
+        window_end: Callable[[int], int],
+        overlap_start: Callable[[int], int],
+        search_range: int,
+    ) -> Iterator[tuple[int, int]]:
+        """
+        Общий проход по тексту для символьного и токенного режимов.
+        Каждое решение о разрыве принимается одним поиском на уровне C (str.rfind, re)
+        в пределах окна, без посимвольных циклов Python.
+
+        Args:
+            text: Исходный текст
+            window_end: Позиция конца окна по позиции его начала
+            overlap_start: Позиция начала перекрытия по позиции разрыва
+            search_range: Ширина поиска пробела для перекрытия в символах
+
+        Yields:
+            Пары (начало, конец) очередного чанка
+        """
+        # Атрибуты и методы в локальных переменных: цикл выполняется на каждый чанк
+        chunk_overlap = self.chunk_overlap
+        separators = self.separators
+        rfind = text.rfind
+        first_whitespace = _FIRST_WHITESPACE.search
+        last_whitespace = _LAST_WHITESPACE.match
+
         start = 0
         text_len = len(text)
-        
+
         while start < text_len:
             # Определяем конец текущего чанка
-            end = min(start + self.chunk_size, text_len)
-            
+            end = window_end(start)
+
             # Если это последний чанк
             if end >= text_len:
-                chunk = text[start:].strip()
-                if chunk:
-                    chunks.append(chunk)
+                yield start, text_len
                 break
-            
+
             # Ищем лучшее место для разрыва
             best_split = end
-            
-            # Проверяем разделители в порядке приоритета
-            for separator in self.separators:
-                # Ищем разделитель в последних 100 символах чанка
-                search_start = max(start, end - 100)
-                pos = text.find(separator, search_start, end)
-                
-                # Ищем последнее вхождение в этом диапазоне
-                last_pos = pos
-                while pos != -1 and pos < end:
-                    last_pos = pos
-                    pos = text.find(separator, pos + 1, end)
-                
-                if last_pos != -1 and last_pos > start:
+
+            # Проверяем разделители в порядке приоритета.
+            # Ищем последнее вхождение разделителя, целиком лежащее в последних 100 символах чанка
+            search_start = end - 100 if end - 100 > start else start
+            for separator in separators:
+                last_pos = rfind(separator, search_start, end)
+
+                if last_pos > start:
                     best_split = last_pos + len(separator)
                     break
-            
-            # Создаем чанк
-            chunk = text[start:best_split].strip()
-            if chunk:
-                chunks.append(chunk)
-            
-            # Вычисляем следующую позицию с перекрытием
-            if self.chunk_overlap > 0 and best_split < text_len:
+
+            yield start, best_split
+
+            # Вычисляем следующую позицию с перекрытием (best_split < text_len, так как end < text_len)
+            if chunk_overlap > 0:
                 # Простое перекрытие с поиском пробела
-                overlap_pos = max(start + 1, best_split - self.chunk_overlap)
-                
-                # Ищем пробел в расширенном диапазоне (до половины размера чанка)
-                search_range = min(self.chunk_size // 2, self.chunk_overlap + 50)
-                search_end = min(overlap_pos + search_range, best_split)
-                
-                # Ищем пробел, начиная с желаемой позиции и двигаясь в обе стороны
-                found_space = False
-                
+                overlap_pos = overlap_start(best_split)
+                if overlap_pos <= start:
+                    overlap_pos = start + 1
+
+                search_end = overlap_pos + search_range
+                if search_end > best_split:
+                    search_end = best_split
+
                 # Сначала ищем вперед (предпочтительно)
-                for i in range(overlap_pos, search_end):
-                    if i < text_len and text[i].isspace():
-                        start = i + 1
-                        found_space = True
-                        break
-                
-                # Если не нашли вперед, ищем назад
-                if not found_space:
-                    search_start = max(start + 1, overlap_pos - 30)
-                    for i in range(overlap_pos - 1, search_start - 1, -1):
-                        if i > start and i < text_len and text[i].isspace():
-                            start = i + 1
-                            found_space = True
-                            break
-                
-                # Если совсем не нашли пробел, используем исходную позицию
-                if not found_space:
-                    start = overlap_pos
+                space = first_whitespace(text, overlap_pos, search_end)
+                if space:
+                    start = space.start() + 1
+                else:
+                    # Если не нашли вперед, ищем назад (не дальше 30 символов)
+                    space = last_whitespace(text, max(start + 1, overlap_pos - 30), overlap_pos)
+                    # Если совсем не нашли пробел, используем исходную позицию
+                    start = space.end() if space else overlap_pos
             else:
                 start = best_split
-            
+
             # Защита от зацикливания
             if start >= best_split:
                 start = best_split
 
-        return chunks
-
-    def create_chunks(self, document: Document) -> list[DocumentChunk]:
+    def create_chunks(self, document: Document) -> list[Chunk]:
         """
         Создает чанки из документа по предложениям.
+        В компактном режиме чанки — ChunkView со смещениями в тексте документа.
         
         Args:
             document: Исходный документ
@@ -154,21 +328,270 @@ class TextChunker(BaseChunker):
         Returns:
             Список чанков с метаданными
         """
-        text_chunks = self.split_text(document.content)
-        
+        text = document.content
+        spans = self._split_spans(text)
+
+        if self.compact:
+            # Один случайный префикс на документ вместо uuid4 на каждый чанк
+            parent = ChunkParent(document, total_chunks=len(spans), id_prefix=uuid.uuid4().hex)
+            return [ChunkView(parent, start, end, idx) for idx, (start, end) in enumerate(spans)]
+
         return [
-            DocumentChunk(
-                content=chunk,
-                metadata={
+            self._make_chunk(document, idx, text[start:end], total_chunks=len(spans))
+            for idx, (start, end) in enumerate(spans)
+        ]
+
+    def create_batch(self, documents: Iterable[Document]) -> ChunkBatch:
+        """
+        Разбивает документы в колоночную пачку чанков, минуя объекты чанков.
+        Метаданные те же, что у create_chunks, ID чанка — общий префикс документа и номер чанка.
+
+        Args:
+            documents: Исходные документы
+
+        Returns:
+            Пачка чанков без эмбеддингов
+        """
+        batch = ChunkBatch()
+        ids, texts, metadatas = batch.ids, batch.texts, batch.metadatas
+
+        for document in documents:
+            text = document.content
+            spans = self._split_spans(text)
+            id_prefix = uuid.uuid4().hex
+            total_chunks = len(spans)
+
+            for idx, (start, end) in enumerate(spans):
+                ids.append(f"{id_prefix}-{idx}")
+                texts.append(text[start:end])
+                metadatas.append({
                     **document.metadata,
                     "chunk_index": idx,
-                    "total_chunks": len(text_chunks),
-                    "chunk_size": len(chunk),
-                    "original_document_id": document.doc_id
-                },
-                chunk_id=str(uuid.uuid4()),
-                doc_id=document.doc_id,
-                chunk_index=idx
-            )
-            for idx, chunk in enumerate(text_chunks)
-        ]
\ No newline at end of file
+                    "total_chunks": total_chunks,
+                    "chunk_size": end - start,
+                    "original_document_id": document.doc_id,
+                })
+
+        return batch
+
+    def iter_chunks(self, blocks: Iterable[str], document: Document) -> Iterator[DocumentChunk]:
+        """
+        Потоково создает чанки из текста, поступающего блоками.
+        Общее число чанков заранее неизвестно, поэтому total_chunks в метаданных не заполняется.
+
+        Args:
+            blocks: Блоки текста документа (части файла, страницы PDF, сегменты лога)
+            document: Документ, метаданные и ID которого получат чанки
+
+        Yields:
+            Чанки с метаданными
+        """
+        for idx, chunk in enumerate(self.iter_split_text(blocks)):
+            yield self._make_chunk(document, idx, chunk)
+
+    def _make_chunk(
+        self,
+        document: Document,
+        idx: int,
+        chunk: str,
+        total_chunks: Optional[int] = None,
+    ) -> DocumentChunk:
+        """Создает чанк документа с метаданными."""
+        metadata = {**document.metadata, "chunk_index": idx}
+        if total_chunks is not None:
+            metadata["total_chunks"] = total_chunks
+        metadata["chunk_size"] = len(chunk)
+        metadata["original_document_id"] = document.doc_id
+
+        return DocumentChunk(
+            content=chunk,
+            metadata=metadata,
+            chunk_id=str(uuid.uuid4()),
+            doc_id=document.doc_id,
+            chunk_index=idx
+        )
+
+class TokenTextChunker(TextChunker):
+    """
+    Чанкер, измеряющий размер чанка в токенах модели эмбеддингов.
+    Текст токенизируется быстрым токенизатором модели один раз целиком, границы окон
+    выбираются по смещениям токенов, поэтому каждый чанк помещается в окно модели
+    и не обрезается при создании эмбеддинга.
+    """
+
+    # Запас символов на токен для потокового разбиения: окно из chunk_size токенов
+    # почти никогда не бывает длиннее chunk_size * STREAM_CHARS_PER_TOKEN символов
+    STREAM_CHARS_PER_TOKEN = 16
+    # Сколько раз повторно разбивать чанки, которые после токенизации оказались длиннее бюджета
+    MAX_REFIT_ROUNDS = 3
+
+    def __init__(
+        self,
+        tokenizer=None,
+        chunk_size: int = 256,
+        chunk_overlap: int = 32,
+        separators: list[str] = ["\n\n", "\n", ". ", "! ", "? "],
+        compact: bool = False,
+        load_tokenizer: Optional[Callable[[], object]] = None,
+        load_chunk_size: Optional[Callable[[], int]] = None,
+    ):
+        """
+        Args:
+            tokenizer: Быстрый токенизатор Hugging Face (PreTrainedTokenizerFast)
+            chunk_size: Максимальный размер чанка в токенах (без служебных токенов модели)
+            chunk_overlap: Количество токенов перекрытия между чанками
+            separators: Символы или строки для разделения текста
+            compact: create_chunks создает компактные чанки (ChunkView) со смещениями в тексте документа
+            load_tokenizer: Функция, возвращающая токенизатор при первом обращении (вместо tokenizer):
+                загрузка модели, которой принадлежит токенизатор, откладывается до первого разбиения
+            load_chunk_size: Функция, возвращающая размер чанка при первом обращении (вместо chunk_size)
+        """
+        if (tokenizer is None) == (load_tokenizer is None):
+            raise ValueError("Нужно передать либо tokenizer, либо load_tokenizer")
+
+        super().__init__(chunk_size=chunk_size, chunk_overlap=chunk_overlap, separators=separators, compact=compact)
+        self._tokenizer = None if tokenizer is None else self._check_tokenizer(tokenizer)
+        self._load_tokenizer = load_tokenizer
+        self._load_chunk_size = load_chunk_size
+        if load_chunk_size is not None:
+            self._chunk_size = None
+
+    @property
+    def tokenizer(self):
+        """Токенизатор (при отложенной загрузке загружается при первом обращении)."""
+        if self._tokenizer is None:
+            self._tokenizer = self._check_tokenizer(self._load_tokenizer())
+        return self._tokenizer
+
+    @property
+    def chunk_size(self) -> int:
+        """Размер чанка в токенах (при отложенной загрузке вычисляется при первом обращении)."""
+        if self._chunk_size is None:
+            self._chunk_size = self._load_chunk_size()
+        return self._chunk_size
+
+    @chunk_size.setter
+    def chunk_size(self, chunk_size: int):
+        self._chunk_size = chunk_size
+
+    @staticmethod
+    def _check_tokenizer(tokenizer):
+        if not getattr(tokenizer, "is_fast", True):
+            raise ValueError("Для разбиения по токенам нужен быстрый токенизатор (return_offsets_mapping)")
+        return tokenizer
+
+    def count_tokens(self, texts: list[str]) -> list[int]:
+        """
+        Считает токены текстов одним пакетным вызовом токенизатора (без служебных токенов).
+
+        Args:
+            texts: Список текстов
+
+        Returns:
+            Количество токенов каждого текста
+        """
+        if not texts:
+            return []
+
+        encoded = self.tokenizer(texts, add_special_tokens=False, truncation=False, verbose=False)
+        return [len(ids) for ids in encoded["input_ids"]]
+
+    def truncation_report(self, texts: list[str], chunker: TextChunker) -> dict[str, int]:
+        """
+        Считает, сколько чанков другого чанкера (например, символьного) не помещаются
+        в бюджет токенов и были бы обрезаны моделью.
+
+        Args:
+            texts: Тексты документов
+            chunker: Чанкер, разбиение которого проверяется
+
+        Returns:
+            Статистика: всего чанков, обрезанных чанков и потерянных токенов
+        """
+        chunks = [chunk for text in texts for chunk in chunker.split_text(text)]
+        over_budget = [count - self.chunk_size for count in self.count_tokens(chunks) if count > self.chunk_size]
+
+        return {
+            "chunks": len(chunks),
+            "truncated": len(over_budget),
+            "lost_tokens": sum(over_budget),
+        }
+
+    def _iter_windows(self, text: str) -> Iterator[tuple[int, int]]:
+        """
+        Отдает границы окон [start, end), размер окна и перекрытие измеряются в токенах.
+
+        Args:
+            text: Исходный текст
+
+        Yields:
+            Пары (начало, конец) очередного чанка
+        """
+        encoded = self.tokenizer(
+            text,
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            truncation=False,
+            verbose=False,
+        )
+        # Позиции начала токенов в тексте, по ним окна переводятся из токенов в символы
+        token_starts = [token_start for token_start, _ in encoded["offset_mapping"]]
+        num_tokens = len(token_starts)
+        text_len = len(text)
+        chunk_size = self.chunk_size
+        chunk_overlap = self.chunk_overlap
+
+        def window_end(start: int) -> int:
+            # Конец окна — начало токена, следующего за chunk_size токенами от start
+            last = bisect_left(token_starts, start) + chunk_size
+            return token_starts[last] if last < num_tokens else text_len
+
+        def overlap_start(best_split: int) -> int:
+            first = bisect_left(token_starts, best_split) - chunk_overlap
+            return token_starts[first] if first > 0 else 0
+
+        return self._scan_windows(text, window_end, overlap_start, search_range=50)
+
+    def _stream_lookahead(self) -> int:
+        return self.chunk_size * self.STREAM_CHARS_PER_TOKEN
+
+    def _finalize_spans(self, text: str, spans: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        return self._fit_budget(text, spans) if spans else spans
+
+    def _fit_budget(self, text: str, spans: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        """
+        Проверяет размер чанков одним пакетным вызовом токенизатора и заново разбивает те,
+        что длиннее бюджета (токенизация фрагмента может отличаться от токенизации
+        всего текста на границе окна).
+
+        Args:
+            text: Исходный текст
+            spans: Границы чанков после разбиения
+
+        Returns:
+            Границы чанков не длиннее chunk_size токенов
+        """
+        for _ in range(self.MAX_REFIT_ROUNDS):
+            counts = self.count_tokens([text[start:end] for start, end in spans])
+            if all(count <= self.chunk_size for count in counts):
+                return spans
+
+            fitted: list[tuple[int, int]] = []
+            for (start, end), count in zip(spans, counts):
+                if count <= self.chunk_size:
+                    fitted.append((start, end))
+                    continue
+
+                # Уменьшаем окно на величину превышения и разбиваем чанк без перекрытия
+                refit = TokenTextChunker(
+                    self.tokenizer,
+                    chunk_size=max(1, 2 * self.chunk_size - count),
+                    chunk_overlap=0,
+                    separators=self.separators,
+                )
+                refit_spans, _ = refit._split_buffer(text[start:end], final=True)
+                fitted.extend((start + left, start + right) for left, right in refit_spans)
+            spans = fitted
+
+        self._logger_warning(f"Не все чанки удалось уложить в {self.chunk_size} токенов")
+        return spans
@@ -1,21 +1,45 @@
+import os
+import time
 import uuid  # Для генерации уникальных идентификаторов
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future  # Пул процессов для параллельного разбора файлов
+from fnmatch import fnmatch  # Сопоставление путей с шаблонами include/exclude
+from importlib.metadata import version as package_version  # Версии парсеров для ключа кэша
 from abc import (
     ABC, # ABC - для создания абстрактных классов
     abstractmethod # abstractmethod - для абстрактных методов
 )
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 from pathlib import Path  # Path - для удобной работы с путями файловой системы
-from PyPDF2 import PdfReader # Для работы с PDF
-from docx import Document as DocxDocument # Для работы с DOCX
 
 from ..logger import LoggerService
 
+from .cache import CachedText, ExtractedTextCache
+from .manifest import file_sha256
 from .models import Document
 
+# Название и версия парсеров входят в ключ кэша извлеченного текста
+PDF_PARSER = f"PyPDF2=={package_version('PyPDF2')}"
+DOCX_PARSER = f"python-docx=={package_version('python-docx')}"
+
+def _pdf_reader(file):
+    """Открывает PDF. PyPDF2 импортируется при первом PDF-файле, а не при импорте модуля."""
+    from PyPDF2 import PdfReader
+    return PdfReader(file)
+
+def _docx_document(source: str):
+    """Открывает DOCX. python-docx импортируется при первом DOCX-файле, а не при импорте модуля."""
+    from docx import Document as DocxDocument
+    return DocxDocument(source)
+
 class BaseDocumentLoader(ABC, LoggerService):
     """Абстрактный базовый класс для загрузчиков документов."""
 
     logger_name: str
+    # Кэш извлеченного текста (None — без кэша)
+    text_cache: Optional[ExtractedTextCache] = None
+    # Название и версия парсера для ключа кэша
+    parser: str = ""
 
     @abstractmethod
     def load(self, source: str) -> Optional[Document]:
@@ -29,6 +53,25 @@ class BaseDocumentLoader(ABC, LoggerService):
         raise NotImplementedError("Метод load должен быть реализован в подклассе.")
         # pass  # Абстрактный метод, реализация будет в дочерних классах
 
+    @property
+    def streams_parts(self) -> bool:
+        """Отдает ли загрузчик файл несколькими документами-частями через iter_documents."""
+        return False
+
+    def iter_documents(self, source: str) -> Iterator[Document]:
+        """
+        Загружает документ из источника по частям.
+        По умолчанию отдает весь документ целиком одной частью.
+
+        Args:
+            source: Путь к файлу
+
+        Yields:
+            Документы-части в порядке следования в файле
+        """
+        if doc := self.load(source):
+            yield doc
+
     def _io_error(self, path: Path, error: str):
         """
         Логирует сообщение об ошибке I/O с указанием имени класса и пути файла.
@@ -71,6 +114,36 @@ class BaseDocumentLoader(ABC, LoggerService):
             
         return True
 
+    def _cache_key(self, path: Path, *extra: str, file_hash: Optional[str] = None) -> Optional[str]:
+        """
+        Формирует ключ кэша извлеченного текста по содержимому файла и версии парсера.
+
+        Args:
+            path: Путь к файлу
+            *extra: Дополнительные части ключа
+            file_hash: Уже посчитанный хеш файла
+
+        Returns:
+            Ключ или None, если кэш не используется
+        """
+        if self.text_cache is None:
+            return None
+        return self.text_cache.make_key(file_hash or file_sha256(path), self.parser, *extra)
+
+    def _generate_doc_id(self, path: Path) -> str:
+        """
+        Генерирует стабильный ID документа по пути к файлу.
+        Один и тот же файл получает один и тот же ID между запусками,
+        что позволяет находить и удалять его старые чанки при переиндексации.
+
+        Args:
+            path: Путь к файлу
+
+        Returns:
+            ID документа
+        """
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, path.resolve().as_uri()))
+
     def _generate_metadata(self, path: Path) -> dict:
         """
         Генерирует базовые метаданные для документа.
@@ -117,7 +190,7 @@ class TextFileLoader(BaseDocumentLoader):
             return Document(
                 content=content,
                 metadata=self._generate_metadata(path),
-                doc_id=str(uuid.uuid4())
+                doc_id=self._generate_doc_id(path)
             )
 
         except OSError as e:
@@ -132,9 +205,57 @@ class TextFileLoader(BaseDocumentLoader):
             self._general_error(path, str(e))
             return None
 
+    def iter_blocks(self, source: str, block_size: int = 1024 * 1024) -> Iterator[str]:
+        """
+        Отдает текст файла блоками, не читая файл целиком (для потокового разбиения на чанки).
+
+        Args:
+            source: Путь к файлу
+            block_size: Размер блока в символах
+
+        Yields:
+            Очередной блок текста
+        """
+        with Path(source).open(encoding=self.encoding) as file:
+            while block := file.read(block_size):
+                yield block
+
+def _extract_pdf_pages(source: str, page_start: int, page_end: int) -> str:
+    """
+    Извлекает текст диапазона страниц PDF [page_start, page_end).
+    Функция уровня модуля, чтобы ее можно было выполнять в пуле процессов.
+    """
+    with open(source, mode="rb") as file:
+        pdf = _pdf_reader(file)
+        return "".join(pdf.pages[idx].extract_text() + "\n" for idx in range(page_start, page_end))
+
+
 class PDFLoader(BaseDocumentLoader):
     """Загрузчик PDF файлов."""
-    
+
+    parser = PDF_PARSER
+
+    def __init__(
+        self,
+        pages_per_document: Optional[int] = None,
+        max_workers: int = 1,
+        text_cache: Optional[ExtractedTextCache] = None,
+    ):
+        """
+        Args:
+            pages_per_document: Размер диапазона страниц для постраничного режима
+                (None — файл загружается одним документом)
+            max_workers: Количество процессов для параллельного извлечения диапазонов страниц
+            text_cache: Кэш извлеченного текста
+        """
+        self.pages_per_document = pages_per_document
+        self.max_workers = max(1, max_workers)
+        self.text_cache = text_cache
+
+    @property
+    def streams_parts(self) -> bool:
+        return bool(self.pages_per_document)
+
     def load(self, source: str) -> Optional[Document]:
         try:
             path = Path(source)  # Преобразуем строку пути в объект Path
@@ -143,30 +264,38 @@ class PDFLoader(BaseDocumentLoader):
             if not self._path_check(path):
                 return None
 
-            # Читаем содержимое файла
-            self._logger_info(f"Читаем содержимое PDF файла {source}")
+            cache_key = self._cache_key(path)
 
-            with path.open(mode="rb") as file:
-                pdf = PdfReader(file)
-                number_of_pages = len(pdf.pages)
-                content = ""
-                # Извлекаем текст из всех страниц
-                for page in pdf.pages:
-                    content += page.extract_text() + "\n"
+            if cache_key and (cached := self.text_cache.get(cache_key)):
+                # Попадание в кэш — PDF не разбираем
+                content = cached.text
+                number_of_pages = cached.metadata["num_pages"]
+            else:
+                # Читаем содержимое файла
+                self._logger_info(f"Читаем содержимое PDF файла {source}")
 
-            self._logger_info(f"Чтение {source} завершено")
+                with path.open(mode="rb") as file:
+                    pdf = _pdf_reader(file)
+                    number_of_pages = len(pdf.pages)
+                    # Извлекаем текст из всех страниц одним join, без квадратичного роста строки
+                    content = "".join(page.extract_text() + "\n" for page in pdf.pages)
+
+                if cache_key:
+                    self.text_cache.put(cache_key, CachedText(content, {"num_pages": number_of_pages}))
+
+                self._logger_info(f"Чтение {source} завершено")
 
             # Добавляем специфичные для PDF метаданные
             metadata = self._generate_metadata(path)
             metadata.update({
-                "num_pages": len(pdf.pages),
+                "num_pages": number_of_pages,
                 "type": "pdf"
             })
 
             return Document(
                 content=content,
                 metadata=metadata,
-                doc_id=str(uuid.uuid4())
+                doc_id=self._generate_doc_id(path)
             )
 
         except OSError as e:
@@ -181,9 +310,164 @@ class PDFLoader(BaseDocumentLoader):
             self._general_error(path, str(e))
             return None
 
+    def iter_pages(self, source: str) -> Iterator[str]:
+        """
+        Отдает текст PDF постранично, не собирая весь документ в одну строку.
+
+        Args:
+            source: Путь к файлу
+
+        Yields:
+            Текст очередной страницы (с завершающим переводом строки)
+        """
+        with open(source, mode="rb") as file:
+            pdf = _pdf_reader(file)
+            for page in pdf.pages:
+                yield page.extract_text() + "\n"
+
+    def iter_documents(self, source: str) -> Iterator[Document]:
+        """
+        В постраничном режиме отдает документы по диапазонам из pages_per_document страниц
+        с метаданными page_start/page_end (нумерация с 1). Все части имеют doc_id файла.
+        При max_workers > 1 диапазоны извлекаются параллельно, порядок частей сохраняется.
+        Ошибка до первой части только логируется, после нее — пробрасывается: файл загружен не целиком.
+        """
+        if not self.pages_per_document:
+            yield from super().iter_documents(source)
+            return
+
+        path = Path(source)
+        yielded = False
+
+        try:
+            if not self._path_check(path):
+                return
+
+            # Хеш файла считаем один раз для всех диапазонов
+            file_hash = file_sha256(path) if self.text_cache is not None else None
+            number_of_pages = self._count_pages(path, file_hash)
+
+            page_ranges = [
+                (page_start, min(page_start + self.pages_per_document, number_of_pages))
+                for page_start in range(0, number_of_pages, self.pages_per_document)
+            ]
+
+            self._logger_info(
+                f"Читаем PDF файл {source} по {self.pages_per_document} страниц: "
+                f"{len(page_ranges)} частей, процессов: {self.max_workers}"
+            )
+
+            metadata = self._generate_metadata(path)
+            metadata.update({
+                "num_pages": number_of_pages,
+                "type": "pdf"
+            })
+            doc_id = self._generate_doc_id(path)
+
+            for (page_start, page_end), content in zip(page_ranges, self._extract_ranges(source, page_ranges, file_hash)):
+                yield Document(
+                    content=content,
+                    metadata={
+                        **metadata,
+                        "page_start": page_start + 1,
+                        "page_end": page_end,
+                    },
+                    doc_id=doc_id
+                )
+                yielded = True
+
+            self._logger_info(f"Чтение {source} завершено")
+
+        except OSError as e:
+            self._io_error(path, str(e))
+            if yielded:
+                raise
+
+        except Exception as e:
+            self._general_error(path, str(e))
+            if yielded:
+                raise
+
+    def _count_pages(self, path: Path, file_hash: Optional[str]) -> int:
+        """Возвращает количество страниц PDF, по возможности из кэша."""
+        cache_key = self._cache_key(path, "num_pages", file_hash=file_hash)
+
+        if cache_key and (cached := self.text_cache.get(cache_key)):
+            return cached.metadata["num_pages"]
+
+        with path.open(mode="rb") as file:
+            number_of_pages = len(_pdf_reader(file).pages)
+
+        if cache_key:
+            self.text_cache.put(cache_key, CachedText("", {"num_pages": number_of_pages}))
+
+        return number_of_pages
+
+    def _extract_ranges(
+        self,
+        source: str,
+        page_ranges: list[tuple[int, int]],
+        file_hash: Optional[str] = None,
+    ) -> Iterator[str]:
+        """
+        Извлекает текст диапазонов страниц по порядку.
+        Диапазоны, найденные в кэше, не разбираются.
+        В пуле процессов одновременно обрабатывается не больше 2 * max_workers диапазонов.
+        """
+        path = Path(source)
+        cache_keys = [
+            self._cache_key(path, f"pages={page_start}-{page_end}", file_hash=file_hash)
+            for page_start, page_end in page_ranges
+        ]
+
+        def store(cache_key: Optional[str], content: str) -> str:
+            if cache_key:
+                self.text_cache.put(cache_key, CachedText(content))
+            return content
+
+        if self.max_workers == 1 or len(page_ranges) < 2:
+            for (page_start, page_end), cache_key in zip(page_ranges, cache_keys):
+                if cache_key and (cached := self.text_cache.get(cache_key)):
+                    yield cached.text
+                else:
+                    yield store(cache_key, _extract_pdf_pages(source, page_start, page_end))
+            return
+
+        window = self.max_workers * 2
+        # Элементы очереди — готовый текст из кэша или задача в пуле
+        pending: deque[tuple[Optional[str], str | Future]] = deque()
+
+        def pop() -> str:
+            cache_key, item = pending.popleft()
+            if isinstance(item, str):
+                return item
+            return store(cache_key, item.result())
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            for (page_start, page_end), cache_key in zip(page_ranges, cache_keys):
+                if cache_key and (cached := self.text_cache.get(cache_key)):
+                    pending.append((cache_key, cached.text))
+                else:
+                    pending.append((cache_key, executor.submit(_extract_pdf_pages, source, page_start, page_end)))
+
+                if len(pending) >= window:
+                    yield pop()
+
+            while pending:
+                yield pop()
+
 class DocxLoader(BaseDocumentLoader):
     """Загрузчик DOCX файлов."""
-    
+
+    parser = DOCX_PARSER
+
+    def __init__(self, text_cache: Optional[ExtractedTextCache] = None):
+        """
+        Args:
+            text_cache: Кэш извлеченного текста
+        """
+        self.text_cache = text_cache
+
     def load(self, source: str) -> Optional[Document]:
         try:
             path = Path(source)  # Преобразуем строку пути в объект Path
@@ -192,10 +476,19 @@ class DocxLoader(BaseDocumentLoader):
             if not self._path_check(path):
                 return None
 
-            self._logger_info(f"Читаем содержимое DOCX файла {source}")
+            cache_key = self._cache_key(path)
+
+            if cache_key and (cached := self.text_cache.get(cache_key)):
+                # Попадание в кэш — DOCX не разбираем
+                content = cached.text
+            else:
+                self._logger_info(f"Читаем содержимое DOCX файла {source}")
 
-            doc = DocxDocument(source) # Открываем DOCX файл
-            content = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+                doc = _docx_document(source) # Открываем DOCX файл
+                content = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+
+                if cache_key:
+                    self.text_cache.put(cache_key, CachedText(content))
 
             # Добавляем специфичные для DOCX метаданные
             metadata = self._generate_metadata(path)
@@ -208,7 +501,7 @@ class DocxLoader(BaseDocumentLoader):
             return Document(
                 content=content,
                 metadata=metadata,
-                doc_id=str(uuid.uuid4())
+                doc_id=self._generate_doc_id(path)
             )
 
         except OSError as e:
@@ -227,16 +520,30 @@ class DocxLoader(BaseDocumentLoader):
 class DirectoryLoader(LoggerService):
     """Загрузчик для всех поддерживаемых файлов из директории."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: int = 1,
+        pdf_pages_per_document: Optional[int] = None,
+        text_cache: Optional[ExtractedTextCache] = None,
+    ):
         """
         Args:
-            loader: Загрузчик документов определенного типа
+            max_workers: Количество процессов для параллельного разбора файлов (1 — последовательная загрузка)
+            pdf_pages_per_document: Размер диапазона страниц для постраничной загрузки PDF в iter_from_directory
+                (None — PDF загружается одним документом)
+            text_cache: Кэш текста, извлеченного из PDF/DOCX (None — без кэша)
         """
+        self.max_workers = max(1, max_workers)
+        self.text_cache = text_cache
         # Сохраняем загрузчики, которые будем использовать для каждого файла
         self.loaders = {
             '.txt': TextFileLoader(),
-            '.pdf': PDFLoader(),
-            '.docx': DocxLoader(),
+            '.pdf': PDFLoader(
+                pages_per_document=pdf_pages_per_document,
+                max_workers=self.max_workers,
+                text_cache=text_cache,
+            ),
+            '.docx': DocxLoader(text_cache=text_cache),
         }
 
     def _path_check(self, path: Path) -> bool:
@@ -309,13 +616,276 @@ class DirectoryLoader(LoggerService):
             self._logger_error(f"Директория не найдена: {directory}")
             return documents
 
-        # Перебираем все файлы в директории, соответствующие паттерну
-        file_path_list = path.glob(glob_pattern)
+        # Перебираем все файлы в директории, соответствующие паттерну.
+        # Сортируем пути, чтобы порядок документов не зависел от файловой системы и числа процессов
+        sources = sorted(str(file_path) for file_path in path.glob(glob_pattern))
+        failed: list[str] = [] # Файлы, которые не удалось загрузить
 
-        for file_path in file_path_list:
-            # Пытаемся загрузить каждый файл
-            if doc := self._load(str(file_path)):
+        started_at = time.perf_counter()
+
+        for source, doc in zip(sources, self._load_many(sources)):
+            if doc:
                 documents.append(doc)
+            else:
+                failed.append(source)
+
+        elapsed = time.perf_counter() - started_at
+        files_per_second = len(sources) / elapsed if elapsed > 0 else 0.0
+
+        self._logger_info(
+            f"Загружено {len(documents)} документов из {directory} "
+            f"за {elapsed:.2f} с ({files_per_second:.1f} файлов/с, процессов: {self.max_workers})"
+        )
+        if failed:
+            self._logger_warning(f"Не удалось загрузить {len(failed)} файлов: {', '.join(failed)}")
+        if self.text_cache is not None:
+            self.text_cache.log_stats()
 
-        self._logger_info(f"Загружено {len(documents)} документов из {directory}")
         return documents
+
+    def _load_many(self, sources: list[str]) -> list[Optional[Document]]:
+        """
+        Загружает файлы последовательно или в пуле процессов.
+        Порядок результатов совпадает с порядком sources.
+
+        Args:
+            sources: Пути к файлам
+
+        Returns:
+            Список документов (None для файлов, которые не удалось загрузить)
+        """
+        # Разбор PDF и DOCX упирается в CPU, поэтому распараллеливаем процессами, а не потоками
+        if self.max_workers == 1 or len(sources) < 2:
+            return [self._load(source) for source in sources]
+
+        # Отдаем файлы пачками, чтобы не платить за IPC на каждом мелком файле
+        chunksize = max(1, len(sources) // (self.max_workers * 4))
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            # executor.map сохраняет порядок входных данных
+            return [
+                self._merge_cache_stats(result)
+                for result in executor.map(self._load_in_worker, sources, chunksize=chunksize)
+            ]
+
+    def iter_from_directory(
+        self,
+        directory: str,
+        glob_pattern: str = "*.*",
+        recursive: bool = True,
+        include: Optional[list[str]] = None,
+        exclude: Optional[list[str]] = None,
+        max_file_size: Optional[int] = None,
+    ) -> Iterator[Document]:
+        """
+        Лениво загружает поддерживаемые файлы из директории, отдавая документы по одному.
+        В памяти одновременно находятся только документы, которые еще не забрал потребитель
+        (при max_workers > 1 — не больше 2 * max_workers документов в обработке).
+
+        Args:
+            directory: Путь к директории
+            glob_pattern: Паттерн для имени файла
+            recursive: Обходить ли вложенные директории
+            include: Шаблоны путей (относительно directory), хотя бы одному из которых должен соответствовать файл
+            exclude: Шаблоны путей (относительно directory), файлы по которым пропускаются
+            max_file_size: Максимальный размер файла в байтах, файлы больше пропускаются
+
+        Yields:
+            Загруженные документы в детерминированном порядке обхода
+        """
+        path = Path(directory)
+
+        if not path.is_dir() or not path.exists():
+            self._logger_error(f"Директория не найдена: {directory}")
+            return
+
+        sources = self.iter_paths(directory, glob_pattern, recursive, include, exclude, max_file_size)
+
+        loaded = 0
+        failed: list[str] = [] # Файлы, которые не удалось загрузить
+        started_at = time.perf_counter()
+
+        for source, doc in self.iter_load(sources):
+            if doc:
+                loaded += 1
+                yield doc
+            else:
+                failed.append(source)
+
+        elapsed = time.perf_counter() - started_at
+        total = loaded + len(failed)
+        files_per_second = total / elapsed if elapsed > 0 else 0.0
+
+        self._logger_info(
+            f"Загружено {loaded} документов из {directory} "
+            f"за {elapsed:.2f} с ({files_per_second:.1f} файлов/с, процессов: {self.max_workers})"
+        )
+        if failed:
+            self._logger_warning(f"Не удалось загрузить {len(failed)} файлов: {', '.join(failed)}")
+        if self.text_cache is not None:
+            self.text_cache.log_stats()
+
+    def iter_paths(
+        self,
+        directory: str,
+        glob_pattern: str = "*.*",
+        recursive: bool = True,
+        include: Optional[list[str]] = None,
+        exclude: Optional[list[str]] = None,
+        max_file_size: Optional[int] = None,
+    ) -> Iterator[str]:
+        """
+        Обходит директорию и отдает пути файлов, прошедших фильтры, не загружая их.
+        Директории и файлы внутри каждой директории обходятся в отсортированном порядке.
+        Параметры совпадают с iter_from_directory.
+        """
+        path = Path(directory)
+
+        for root, dir_names, file_names in os.walk(path):
+            if recursive:
+                # os.walk обходит директории в порядке dir_names — сортируем на месте
+                dir_names.sort()
+            else:
+                dir_names.clear()
+
+            for file_name in sorted(file_names):
+                file_path = Path(root, file_name)
+
+                if self.accepts(path, file_path, glob_pattern, include, exclude, max_file_size):
+                    yield str(file_path)
+
+    def accepts(
+        self,
+        directory: str | Path,
+        file_path: str | Path,
+        glob_pattern: str = "*.*",
+        include: Optional[list[str]] = None,
+        exclude: Optional[list[str]] = None,
+        max_file_size: Optional[int] = None,
+    ) -> bool:
+        """
+        Проверяет, проходит ли файл фильтры обхода директории.
+        Параметры совпадают с iter_from_directory.
+
+        Args:
+            directory: Корневая директория, относительно которой проверяются include/exclude
+            file_path: Путь к файлу внутри directory
+
+        Returns:
+            True, если файл нужно загружать
+        """
+        file_path = Path(file_path)
+
+        if not fnmatch(file_path.name, glob_pattern):
+            return False
+
+        relative = file_path.relative_to(directory).as_posix()
+
+        if include and not any(fnmatch(relative, pattern) for pattern in include):
+            return False
+        if exclude and any(fnmatch(relative, pattern) for pattern in exclude):
+            return False
+
+        if max_file_size is not None:
+            try:
+                size = file_path.stat().st_size
+            except OSError as e:
+                self._logger_error(f"Не удалось получить размер файла {str(file_path)}: {e}")
+                return False
+            if size > max_file_size:
+                self._logger_warning(
+                    f"Файл {str(file_path)} пропущен: размер {size} байт больше {max_file_size}"
+                )
+                return False
+
+        return True
+
+    def iter_load(self, sources: Iterable[str]) -> Iterator[tuple[str, Optional[Document]]]:
+        """
+        Загружает файлы по мере обхода, сохраняя порядок sources.
+        При max_workers > 1 держит в пуле ограниченное окно задач, чтобы не загружать весь корпус заранее.
+        Файлы, которые загрузчик отдает по частям (постраничный PDF), дают несколько пар подряд;
+        если загрузка упала после части документов, за ними следует пара (путь, None).
+
+        Yields:
+            Пары (путь, документ или None)
+        """
+        if self.max_workers == 1:
+            for source in sources:
+                if self._streams_parts(source):
+                    yield from self._iter_parts(source)
+                else:
+                    yield source, self._load(source)
+            return
+
+        window = self.max_workers * 2 # Сколько файлов может обрабатываться одновременно
+        pending: deque[tuple[str, Future]] = deque()
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            for source in sources:
+                if self._streams_parts(source):
+                    # Сохраняем порядок: сначала отдаем уже запущенные файлы.
+                    # Части извлекаются в основном процессе, загрузчик сам распараллеливает диапазоны
+                    while pending:
+                        done_source, future = pending.popleft()
+                        yield done_source, self._merge_cache_stats(future.result())
+                    yield from self._iter_parts(source)
+                    continue
+
+                pending.append((source, executor.submit(self._load_in_worker, source)))
+
+                if len(pending) >= window:
+                    done_source, future = pending.popleft()
+                    yield done_source, self._merge_cache_stats(future.result())
+
+            while pending:
+                done_source, future = pending.popleft()
+                yield done_source, self._merge_cache_stats(future.result())
+
+    def _load_in_worker(self, source: str) -> tuple[Optional[Document], tuple[int, int, int]]:
+        """
+        Загружает документ в процессе пула и возвращает вместе с ним приращение счетчиков кэша,
+        так как счетчики копии кэша в процессе пула не видны основному процессу.
+        """
+        if self.text_cache is None:
+            return self._load(source), (0, 0, 0)
+
+        cache = self.text_cache
+        before = (cache.hits, cache.misses, cache.evictions)
+        doc = self._load(source)
+        return doc, (cache.hits - before[0], cache.misses - before[1], cache.evictions - before[2])
+
+    def _merge_cache_stats(self, result: tuple[Optional[Document], tuple[int, int, int]]) -> Optional[Document]:
+        """Добавляет счетчики кэша из процесса пула к счетчикам основного процесса."""
+        doc, (hits, misses, evictions) = result
+
+        if self.text_cache is not None:
+            self.text_cache.hits += hits
+            self.text_cache.misses += misses
+            self.text_cache.evictions += evictions
+
+        return doc
+
+    def _streams_parts(self, source: str) -> bool:
+        """Проверяет, загружается ли файл по частям."""
+        loader = self.loaders.get(Path(source).suffix.lower(), None)
+        return loader is not None and loader.streams_parts
+
+    def _iter_parts(self, source: str) -> Iterator[tuple[str, Optional[Document]]]:
+        """
+        Отдает части файла. Если не удалось получить ни одной части или загрузка упала
+        после части документов, последней отдает пару (путь, None): файл загружен не целиком.
+        """
+        loader = self.loaders[Path(source).suffix.lower()]
+        loaded = False
+
+        try:
+            for doc in loader.iter_documents(source):
+                loaded = True
+                yield source, doc
+        except Exception:
+            # Ошибка уже записана в лог загрузчиком
+            loaded = False
+
+        if not loaded:
+            yield source, None
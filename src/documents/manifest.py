@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional
+
+from ..logger import LoggerService
+
+# Размер блока для потокового хеширования файлов
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: Path) -> str:
+    """
+    Считает SHA-256 содержимого файла, читая его блоками.
+
+    Args:
+        path: Путь к файлу
+
+    Returns:
+        Хеш содержимого в виде hex-строки
+    """
+    digest = hashlib.sha256()
+    with path.open(mode="rb") as file:
+        while block := file.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    """Состояние проиндексированного файла."""
+    # Размер файла в байтах на момент индексации
+    size: int
+    # Время последней модификации файла (st_mtime)
+    mtime: float
+    # SHA-256 содержимого файла
+    sha256: str
+    # ID документа, под которым файл записан в хранилище
+    doc_id: Optional[str] = None
+
+
+class IngestionManifest(LoggerService):
+    """
+    Персистентный манифест индексации: путь к файлу -> размер, mtime и хеш содержимого.
+    Позволяет при повторном запуске обрабатывать только новые и измененные файлы.
+    Хранит и параметры пайплайна, которым проиндексированы файлы (разбиение, модель эмбеддингов):
+    записи манифеста верны, только пока эти параметры не изменились.
+    """
+
+    def __init__(self, manifest_path: str = ".db/manifest.json"):
+        """
+        Args:
+            manifest_path: Путь к JSON-файлу манифеста
+        """
+        self.manifest_path = Path(manifest_path)
+        self.entries: dict[str, ManifestEntry] = {}
+        # Параметры пайплайна (None — неизвестны, например манифест прежнего формата)
+        self.pipeline: Optional[dict] = None
+        # Состояние измененных файлов на момент проверки в changed(): в манифест записывается
+        # именно оно, а не состояние после индексации — правка во время индексации не потеряется
+        self._pending: dict[str, ManifestEntry] = {}
+
+        if self.manifest_path.exists():
+            try:
+                with self.manifest_path.open(encoding="utf-8") as file:
+                    raw = json.load(file)
+                # Манифест прежнего формата содержит только записи файлов, без параметров пайплайна
+                if "files" in raw:
+                    self.pipeline = raw.get("pipeline")
+                    raw = raw["files"]
+                self.entries = {source: ManifestEntry(**entry) for source, entry in raw.items()}
+                self._logger_info(f"Манифест загружен: {len(self.entries)} файлов")
+            except (OSError, ValueError, TypeError) as e:
+                # Поврежденный манифест равносилен пустому — файлы будут переиндексированы
+                self._logger_error(f"Ошибка чтения манифеста {str(self.manifest_path)}: {e}")
+                self.entries = {}
+                self.pipeline = None
+
+    def changed(self, source: str) -> bool:
+        """
+        Проверяет, нужно ли (пере)индексировать файл.
+        Сначала сравнивает размер и mtime, хеш содержимого считается только если они изменились.
+        Состояние нового или измененного файла запоминается до загрузки и записывается в commit().
+
+        Args:
+            source: Путь к файлу
+
+        Returns:
+            True, если файл новый или его содержимое изменилось
+
+        Raises:
+            FileNotFoundError: Файл удален
+        """
+        path = Path(source)
+        stat = path.stat()
+        entry = self.entries.get(source)
+
+        if entry is not None and entry.size == stat.st_size and entry.mtime == stat.st_mtime:
+            return False
+
+        sha256 = file_sha256(path)
+        if entry is not None and sha256 == entry.sha256:
+            # Файл "потрогали", но содержимое то же — обновляем только stat
+            entry.size = stat.st_size
+            entry.mtime = stat.st_mtime
+            return False
+
+        # stat снят до хеширования: если файл меняется прямо сейчас, mtime в манифесте окажется
+        # старым, и следующая проверка пересчитает хеш
+        self._pending[source] = ManifestEntry(size=stat.st_size, mtime=stat.st_mtime, sha256=sha256)
+        return True
+
+    def commit(self, source: str, doc_id: Optional[str] = None):
+        """
+        Записывает файл в манифест после успешной индексации. Записывается состояние,
+        запомненное в changed() до загрузки файла; без вызова changed() — текущее состояние.
+
+        Args:
+            source: Путь к файлу
+            doc_id: ID документа в хранилище
+        """
+        entry = self._pending.pop(source, None)
+        if entry is None:
+            path = Path(source)
+            stat = path.stat()
+            entry = ManifestEntry(size=stat.st_size, mtime=stat.st_mtime, sha256=file_sha256(path))
+
+        entry.doc_id = doc_id
+        self.entries[source] = entry
+
+    def remove(self, source: str):
+        """Удаляет файл из манифеста."""
+        self.entries.pop(source, None)
+        self._pending.pop(source, None)
+
+    def sources(self) -> set[str]:
+        """Возвращает пути всех файлов в манифесте."""
+        return set(self.entries)
+
+    def clear(self):
+        """Очищает манифест (например, при полной переиндексации)."""
+        self.entries.clear()
+        self._pending.clear()
+        self.save()
+
+    def save(self):
+        """Атомарно сохраняет манифест на диск."""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(self.manifest_path.suffix + ".tmp")
+
+        with tmp_path.open("w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "pipeline": self.pipeline,
+                    "files": {source: asdict(entry) for source, entry in self.entries.items()},
+                },
+                file,
+                ensure_ascii=False,
+            )
+
+        # Замена файла атомарна, поэтому прерванный запуск не оставит поврежденный манифест
+        os.replace(tmp_path, self.manifest_path)
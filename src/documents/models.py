@@ -1,6 +1,7 @@
+from collections.abc import Mapping
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Mapping
+from typing import Iterator, Optional, Union
 
 Content = str
 Metadata = Mapping[str, str | int | float | bool | None]
@@ -9,7 +10,7 @@ ChunkID = str
 ChunkIndex = int
 CreatedAt = datetime
 
-@dataclass # Декоратор, который автоматически добавляет методы __init__, __repr__, __eq__ и др.
+@dataclass(slots=True) # Декоратор, который автоматически добавляет методы __init__, __repr__, __eq__ и др.
 class Document:
     """Базовый класс для представления документа."""
     # Содержимое документа в виде строки
@@ -21,10 +22,135 @@ class Document:
     # Дата и время создания документа, по умолчанию текущее время
     created_at: CreatedAt = datetime.now()
 
-@dataclass
+@dataclass(slots=True)
 class DocumentChunk(Document):
     """Представляет часть документа после разбиения."""
     # Опциональный ID чанка
     chunk_id: ChunkID = ''
     # Порядковый номер чанка в документе, начиная с 0
     chunk_index: ChunkIndex = 0
+
+
+class ChunkParent:
+    """
+    Общие для всех компактных чанков документа данные: текст, метаданные и ID.
+    Хранится в одном экземпляре на документ, чанки ссылаются на него.
+    """
+
+    __slots__ = ("document", "total_chunks", "id_prefix")
+
+    def __init__(self, document: Document, total_chunks: Optional[int], id_prefix: str):
+        """
+        Args:
+            document: Исходный документ
+            total_chunks: Количество чанков документа (None — неизвестно)
+            id_prefix: Общий префикс ID чанков документа
+        """
+        self.document = document
+        self.total_chunks = total_chunks
+        self.id_prefix = id_prefix
+
+
+class ChunkView:
+    """
+    Компактный чанк: смещения в тексте родительского документа вместо собственной строки
+    и общие метаданные документа вместо копии словаря. Текст, метаданные и ID
+    вычисляются при обращении. Поддерживает те же атрибуты, что и DocumentChunk.
+    """
+
+    __slots__ = ("parent", "start", "end", "chunk_index")
+
+    def __init__(self, parent: ChunkParent, start: int, end: int, chunk_index: ChunkIndex):
+        """
+        Args:
+            parent: Общие данные документа
+            start: Начало чанка в тексте документа
+            end: Конец чанка в тексте документа (не включая)
+            chunk_index: Порядковый номер чанка в документе, начиная с 0
+        """
+        self.parent = parent
+        self.start = start
+        self.end = end
+        self.chunk_index = chunk_index
+
+    @property
+    def content(self) -> Content:
+        return self.parent.document.content[self.start:self.end]
+
+    @property
+    def metadata(self) -> "ChunkMetadata":
+        return ChunkMetadata(self)
+
+    @property
+    def chunk_id(self) -> ChunkID:
+        return f"{self.parent.id_prefix}-{self.chunk_index}"
+
+    @property
+    def doc_id(self) -> DocID:
+        return self.parent.document.doc_id
+
+    @property
+    def created_at(self) -> CreatedAt:
+        return self.parent.document.created_at
+
+    def to_chunk(self) -> DocumentChunk:
+        """Материализует чанк в обычный DocumentChunk."""
+        return DocumentChunk(
+            content=self.content,
+            metadata=dict(self.metadata),
+            doc_id=self.doc_id,
+            created_at=self.created_at,
+            chunk_id=self.chunk_id,
+            chunk_index=self.chunk_index,
+        )
+
+    def __repr__(self) -> str:
+        return f"ChunkView(chunk_id={self.chunk_id!r}, start={self.start}, end={self.end})"
+
+
+class ChunkMetadata(Mapping):
+    """Метаданные компактного чанка: метаданные документа и собственные поля чанка."""
+
+    __slots__ = ("_chunk",)
+
+    # Собственные поля чанка, в порядке DocumentChunk.metadata
+    CHUNK_KEYS = ("chunk_index", "total_chunks", "chunk_size", "original_document_id")
+
+    def __init__(self, chunk: ChunkView):
+        self._chunk = chunk
+
+    def _own_keys(self) -> tuple[str, ...]:
+        if self._chunk.parent.total_chunks is None:
+            return ("chunk_index", "chunk_size", "original_document_id")
+        return self.CHUNK_KEYS
+
+    def __getitem__(self, key: str):
+        chunk = self._chunk
+        if key == "chunk_index":
+            return chunk.chunk_index
+        if key == "total_chunks" and chunk.parent.total_chunks is not None:
+            return chunk.parent.total_chunks
+        if key == "chunk_size":
+            return chunk.end - chunk.start
+        if key == "original_document_id":
+            return chunk.parent.document.doc_id
+        return chunk.parent.document.metadata[key]
+
+    def __iter__(self) -> Iterator[str]:
+        own_keys = self._own_keys()
+        for key in self._chunk.parent.document.metadata:
+            if key not in own_keys:
+                yield key
+        yield from own_keys
+
+    def __len__(self) -> int:
+        own_keys = self._own_keys()
+        shared = sum(1 for key in self._chunk.parent.document.metadata if key not in own_keys)
+        return shared + len(own_keys)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+# Любое представление чанка: DocumentChunk или компактный ChunkView
+Chunk = Union[DocumentChunk, ChunkView]
@@ -0,0 +1,83 @@
+import unittest
+
+import numpy as np
+
+from src.documents import ChunkBatch, Document, TextChunker
+from src.embeddings import BaseEmbeddingService
+
+
+class FakeEmbeddingService(BaseEmbeddingService):
+    """Сервис эмбеддингов для тестов: вектор из длины текста и числа пробелов."""
+
+    def create_embedding(self, text: str) -> list[float]:
+        return [float(len(text)), float(text.count(" ")), 1.0]
+
+    def create_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return [self.create_embedding(text) for text in texts]
+
+    @property
+    def dimension(self) -> int | None:
+        return 3
+
+
+class TestChunkBatch(unittest.TestCase):
+
+    def setUp(self):
+        with open('src/documents/tests/test_chunker_split_text.txt', 'r', encoding='utf-8') as f:
+            text = f.read()
+        self.documents = [
+            Document(content=text, metadata={"source": "docs/a.txt"}, doc_id="a"),
+            Document(content=text[:700], metadata={"source": "docs/b.txt"}, doc_id="b"),
+        ]
+        self.chunker = TextChunker(chunk_size=300, chunk_overlap=50)
+
+    def test_create_batch_matches_create_chunks(self):
+        """Тест: колонки пачки совпадают с текстом и метаданными create_chunks."""
+        batch = self.chunker.create_batch(self.documents)
+        chunks = [chunk for document in self.documents for chunk in self.chunker.create_chunks(document)]
+
+        self.assertEqual(len(batch), len(chunks))
+        self.assertEqual(batch.texts, [chunk.content for chunk in chunks])
+        self.assertEqual(batch.metadatas, [chunk.metadata for chunk in chunks])
+        self.assertEqual(len(set(batch.ids)), len(batch))
+        self.assertIsNone(batch.embeddings)
+
+    def test_from_chunks_with_compact_views(self):
+        """Тест сборки пачки из компактных чанков."""
+        views = TextChunker(chunk_size=300, chunk_overlap=50, compact=True).create_chunks(self.documents[0])
+        batch = ChunkBatch.from_chunks(views)
+
+        self.assertEqual(batch.ids, [view.chunk_id for view in views])
+        self.assertEqual(batch.texts, [view.content for view in views])
+        self.assertTrue(all(isinstance(metadata, dict) for metadata in batch.metadatas))
+
+    def test_embed_batch_returns_float32_matrix(self):
+        """Тест: эмбеддинги пачки — непрерывная матрица float32 в порядке чанков."""
+        batch = FakeEmbeddingService().embed_batch(self.chunker.create_batch(self.documents))
+
+        self.assertEqual(batch.embeddings.dtype, np.float32)
+        self.assertEqual(batch.embeddings.shape, (len(batch), 3))
+        self.assertTrue(batch.embeddings.flags["C_CONTIGUOUS"])
+        np.testing.assert_array_equal(batch.embeddings[:, 0], [len(text) for text in batch.texts])
+
+    def test_concat(self):
+        """Тест склеивания пачек вместе с эмбеддингами."""
+        service = FakeEmbeddingService()
+        first = service.embed_batch(self.chunker.create_batch(self.documents[:1]))
+        second = service.embed_batch(self.chunker.create_batch(self.documents[1:]))
+
+        batch = ChunkBatch.concat([first, ChunkBatch(), second])
+
+        self.assertEqual(batch.ids, first.ids + second.ids)
+        np.testing.assert_array_equal(batch.embeddings, np.vstack([first.embeddings, second.embeddings]))
+
+    def test_with_embeddings_checks_shape(self):
+        """Тест проверки размера матрицы эмбеддингов."""
+        batch = self.chunker.create_batch(self.documents)
+
+        with self.assertRaises(ValueError):
+            batch.with_embeddings(np.zeros((len(batch) + 1, 3)))
+
+
+if __name__ == '__main__':
+    unittest.main()
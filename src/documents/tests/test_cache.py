@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.documents.cache import CachedText, ExtractedTextCache
+from src.documents.loader import PDFLoader
+from src.documents.tests.test_loader import write_pdf
+
+
+class TestExtractedTextCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = str(Path(self.tmp_dir.name, "cache"))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_and_put(self):
+        """Тест промаха и попадания в кэш."""
+        cache = ExtractedTextCache(self.cache_dir)
+        key = cache.make_key("hash", "parser==1.0")
+
+        self.assertIsNone(cache.get(key))
+        cache.put(key, CachedText("Текст", {"num_pages": 3}))
+
+        cached = cache.get(key)
+        self.assertEqual(cached.text, "Текст")
+        self.assertEqual(cached.metadata, {"num_pages": 3})
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_parser_version_is_part_of_key(self):
+        """Тест: смена версии парсера дает другой ключ."""
+        self.assertNotEqual(
+            ExtractedTextCache.make_key("hash", "PyPDF2==3.0.1"),
+            ExtractedTextCache.make_key("hash", "PyPDF2==3.0.2"),
+        )
+
+    def test_lru_eviction(self):
+        """Тест вытеснения давно не использованных записей при превышении лимита."""
+        cache = ExtractedTextCache(self.cache_dir, max_size_bytes=2500)
+        keys = [cache.make_key(str(idx), "parser") for idx in range(3)]
+
+        for idx, key in enumerate(keys[:2]):
+            cache.put(key, CachedText("x" * 1000))
+            # Разносим время обращения, чтобы порядок LRU был однозначным
+            os.utime(cache._path(key), (idx, idx))
+
+        # Первая запись использована последней и должна пережить вытеснение
+        cache.get(keys[0])
+        cache.put(keys[2], CachedText("x" * 1000))
+
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[2]))
+
+    def test_overwrite_does_not_grow_size(self):
+        """Тест: при перезаписи ключа размер старой записи вычитается из размера кэша."""
+        cache = ExtractedTextCache(self.cache_dir, max_size_bytes=2500)
+        key = cache.make_key("hash", "parser")
+
+        cache.put(key, CachedText("x" * 1000))
+        cache.put(key, CachedText("x" * 500))
+
+        self.assertEqual(cache._size_bytes, cache._path(key).stat().st_size)
+        self.assertEqual(cache.evictions, 0)
+
+    def test_pdf_loader_cache_hit_skips_parsing(self):
+        """Тест: при попадании в кэш PDF не разбирается."""
+        source = str(Path(self.tmp_dir.name, "doc.pdf"))
+        write_pdf(Path(source), ["Page 1", "Page 2"])
+
+        loader = PDFLoader(text_cache=ExtractedTextCache(self.cache_dir))
+        first = loader.load(source)
+
+        with mock.patch("src.documents.loader._pdf_reader", side_effect=AssertionError("PDF разбирается повторно")):
+            second = loader.load(source)
+
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(second.metadata["num_pages"], 2)
+        self.assertEqual(loader.text_cache.hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
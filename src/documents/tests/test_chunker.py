@@ -1,5 +1,100 @@
+import random
+import re
 import unittest
-from src.documents.chunker import TextChunker
+from src.documents.chunker import TextChunker, TokenTextChunker
+from src.documents.models import ChunkView, Document, DocumentChunk
+
+
+def legacy_split_text(
+    text: str,
+    chunk_size: int = 500,
+    chunk_overlap: int = 50,
+    separators: list[str] = ["\n\n", "\n", ". ", "! ", "? "],
+) -> list[str]:
+    """Прежняя реализация TextChunker.split_text — эталон для тестов и benchmarks.bench_chunker."""
+    if not text:
+        return []
+
+    chunks: list[str] = []
+    start = 0
+    text_len = len(text)
+
+    while start < text_len:
+        end = min(start + chunk_size, text_len)
+
+        if end >= text_len:
+            chunk = text[start:].strip()
+            if chunk:
+                chunks.append(chunk)
+            break
+
+        best_split = end
+
+        for separator in separators:
+            search_start = max(start, end - 100)
+            pos = text.find(separator, search_start, end)
+
+            last_pos = pos
+            while pos != -1 and pos < end:
+                last_pos = pos
+                pos = text.find(separator, pos + 1, end)
+
+            if last_pos != -1 and last_pos > start:
+                best_split = last_pos + len(separator)
+                break
+
+        chunk = text[start:best_split].strip()
+        if chunk:
+            chunks.append(chunk)
+
+        if chunk_overlap > 0 and best_split < text_len:
+            overlap_pos = max(start + 1, best_split - chunk_overlap)
+
+            search_range = min(chunk_size // 2, chunk_overlap + 50)
+            search_end = min(overlap_pos + search_range, best_split)
+
+            found_space = False
+
+            for i in range(overlap_pos, search_end):
+                if i < text_len and text[i].isspace():
+                    start = i + 1
+                    found_space = True
+                    break
+
+            if not found_space:
+                search_start = max(start + 1, overlap_pos - 30)
+                for i in range(overlap_pos - 1, search_start - 1, -1):
+                    if i > start and i < text_len and text[i].isspace():
+                        start = i + 1
+                        found_space = True
+                        break
+
+            if not found_space:
+                start = overlap_pos
+        else:
+            start = best_split
+
+        if start >= best_split:
+            start = best_split
+
+    return chunks
+
+
+class FakeTokenizer:
+    """Токенизатор для тестов: слова режутся на куски до 4 символов, как подслова у WordPiece."""
+
+    is_fast = True
+    pattern = re.compile(r"\w{1,4}|[^\w\s]")
+
+    def __call__(self, texts, add_special_tokens=True, return_offsets_mapping=False, **kwargs):
+        single = isinstance(texts, str)
+        batch = [texts] if single else texts
+        offsets = [[match.span() for match in self.pattern.finditer(text)] for text in batch]
+
+        encoded = {"input_ids": [list(range(len(spans))) for spans in offsets]}
+        if return_offsets_mapping:
+            encoded["offset_mapping"] = offsets
+        return {key: value[0] for key, value in encoded.items()} if single else encoded
 
 
 class TestTextChunker(unittest.TestCase):
@@ -175,5 +270,193 @@ class TestTextChunker(unittest.TestCase):
             self.assertLessEqual(len(chunk), 30)  # С учетом поиска границ слов
 
 
+    def test_split_text_matches_legacy_implementation(self):
+        """Тест: чанки совпадают с прежней реализацией на случайных текстах."""
+        rng = random.Random(42)
+        alphabet = ["а", "б", "x", "y", " ", " ", "\n", "\n\n", ". ", "! ", "? ", "\t", "\u00a0", "\u3000"]
+
+        for _ in range(200):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 3000)))
+            chunk_size = rng.randint(10, 600)
+            chunk_overlap = rng.randint(0, chunk_size)
+            chunker = TextChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+            self.assertEqual(
+                chunker.split_text(text),
+                legacy_split_text(text, chunk_size, chunk_overlap, chunker.separators),
+            )
+
+    def test_iter_split_text_matches_split_text(self):
+        """Тест: потоковое разбиение по блокам совпадает с разбиением склеенного текста."""
+        rng = random.Random(13)
+        alphabet = ["а", "б", "x", " ", " ", "\n", "\n\n", ". ", "! ", "\t"]
+
+        for _ in range(100):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 5000)))
+            chunk_size = rng.randint(10, 300)
+            chunker = TextChunker(chunk_size=chunk_size, chunk_overlap=rng.randint(0, chunk_size))
+
+            # Случайные границы блоков, в том числе пустые и односимвольные блоки
+            cuts = sorted(rng.randint(0, len(text)) for _ in range(rng.randint(0, 40)))
+            blocks = [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+
+            self.assertEqual(list(chunker.iter_split_text(blocks)), chunker.split_text(text))
+
+    def test_iter_chunks_is_lazy(self):
+        """Тест: чанки отдаются до того, как прочитан весь поток блоков."""
+        chunker = TextChunker(chunk_size=100, chunk_overlap=20)
+        document = Document(content="", metadata={"source": "stream.log"}, doc_id="doc")
+        consumed = []
+
+        def blocks():
+            for idx in range(10_000):
+                consumed.append(idx)
+                yield f"Строка лога номер {idx}.\n"
+
+        chunks = chunker.iter_chunks(blocks(), document)
+        first = next(chunks)
+
+        self.assertLess(len(consumed), 100)
+        self.assertEqual(first.chunk_index, 0)
+        self.assertEqual(first.metadata["source"], "stream.log")
+        self.assertNotIn("total_chunks", first.metadata)
+
+        rest = list(chunks)
+        self.assertEqual([chunk.chunk_index for chunk in rest], list(range(1, len(rest) + 1)))
+
+
+class TestCompactChunks(unittest.TestCase):
+
+    def setUp(self):
+        with open('src/documents/tests/test_chunker_split_text.txt', 'r', encoding='utf-8') as f:
+            self.document = Document(
+                content=f.read(),
+                metadata={"source": "docs/text.txt", "filename": "text.txt"},
+                doc_id="doc-1",
+            )
+
+    def test_views_match_document_chunks(self):
+        """Тест: компактные чанки дают тот же текст и метаданные, что и DocumentChunk."""
+        chunks = TextChunker(chunk_size=300, chunk_overlap=50).create_chunks(self.document)
+        views = TextChunker(chunk_size=300, chunk_overlap=50, compact=True).create_chunks(self.document)
+
+        self.assertEqual(len(views), len(chunks))
+        for view, chunk in zip(views, chunks):
+            self.assertIsInstance(view, ChunkView)
+            self.assertEqual(view.content, chunk.content)
+            self.assertEqual(dict(view.metadata), chunk.metadata)
+            # Порядок ключей метаданных тот же
+            self.assertEqual(list(view.metadata), list(chunk.metadata))
+            self.assertEqual((view.doc_id, view.chunk_index), (chunk.doc_id, chunk.chunk_index))
+
+        # Все чанки ссылаются на общие данные документа, ID уникальны
+        self.assertEqual(len({id(view.parent) for view in views}), 1)
+        self.assertEqual(len({view.chunk_id for view in views}), len(views))
+
+    def test_to_chunk(self):
+        """Тест материализации компактного чанка в DocumentChunk."""
+        view = TextChunker(chunk_size=300, chunk_overlap=50, compact=True).create_chunks(self.document)[1]
+        chunk = view.to_chunk()
+
+        self.assertIsInstance(chunk, DocumentChunk)
+        self.assertEqual(
+            (chunk.content, chunk.metadata, chunk.chunk_id, chunk.chunk_index),
+            (view.content, dict(view.metadata), view.chunk_id, 1),
+        )
+
+
+class TestTokenTextChunker(unittest.TestCase):
+
+    def setUp(self):
+        self.tokenizer = FakeTokenizer()
+        with open('src/documents/tests/test_chunker_split_text.txt', 'r', encoding='utf-8') as f:
+            self.text = f.read()
+
+    def test_chunks_fit_token_budget(self):
+        """Тест: каждый чанк помещается в бюджет токенов, слова исходного текста не теряются."""
+        chunker = TokenTextChunker(self.tokenizer, chunk_size=40, chunk_overlap=8)
+        result = chunker.split_text(self.text)
+
+        self.assertGreater(len(result), 1)
+        for count in chunker.count_tokens(result):
+            self.assertLessEqual(count, 40)
+
+        combined_words = set(" ".join(result).split())
+        for word in self.text.split():
+            self.assertIn(word, combined_words)
+
+    def test_deferred_tokenizer(self):
+        """Тест: отложенный чанкер загружает токенизатор при первом разбиении и режет так же."""
+        loads = []
+
+        def load_tokenizer():
+            loads.append("tokenizer")
+            return self.tokenizer
+
+        chunker = TokenTextChunker(chunk_overlap=8, load_tokenizer=load_tokenizer, load_chunk_size=lambda: 40)
+        self.assertEqual(loads, [])
+
+        result = chunker.split_text(self.text)
+        chunker.split_text(self.text)
+
+        self.assertEqual(loads, ["tokenizer"])
+        self.assertEqual(chunker.chunk_size, 40)
+        self.assertEqual(result, TokenTextChunker(self.tokenizer, chunk_size=40, chunk_overlap=8).split_text(self.text))
+
+    def test_slow_tokenizer_rejected(self):
+        """Тест: медленный токенизатор (без offset_mapping) отклоняется сразу или при загрузке."""
+        slow = FakeTokenizer()
+        slow.is_fast = False
+
+        with self.assertRaises(ValueError):
+            TokenTextChunker(slow)
+
+        chunker = TokenTextChunker(load_tokenizer=lambda: slow)
+        with self.assertRaises(ValueError):
+            chunker.split_text(self.text)
+
+        with self.assertRaises(ValueError):
+            TokenTextChunker()
+
+    def test_random_texts_fit_token_budget(self):
+        """Тест бюджета токенов на случайных текстах, в том числе без пробелов."""
+        rng = random.Random(7)
+        alphabet = ["а", "б", "x", "y", " ", "\n", "\n\n", ". ", ",", "\t"]
+
+        for _ in range(100):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 2000)))
+            chunk_size = rng.randint(1, 80)
+            chunker = TokenTextChunker(self.tokenizer, chunk_size=chunk_size, chunk_overlap=rng.randint(0, chunk_size))
+
+            for count in chunker.count_tokens(chunker.split_text(text)):
+                self.assertLessEqual(count, chunk_size)
+
+    def test_iter_split_text_fits_token_budget(self):
+        """Тест потокового разбиения по токенам: бюджет соблюдается, слова не теряются."""
+        chunker = TokenTextChunker(self.tokenizer, chunk_size=40, chunk_overlap=8)
+        blocks = [self.text[idx:idx + 97] for idx in range(0, len(self.text), 97)]
+        result = list(chunker.iter_split_text(blocks))
+
+        for count in chunker.count_tokens(result):
+            self.assertLessEqual(count, 40)
+
+        combined_words = set(" ".join(result).split())
+        for word in self.text.split():
+            self.assertIn(word, combined_words)
+
+    def test_truncation_report(self):
+        """Тест отчета о чанках символьного чанкера, которые не помещаются в бюджет токенов."""
+        chunker = TokenTextChunker(self.tokenizer, chunk_size=40)
+        char_chunker = TextChunker(chunk_size=300, chunk_overlap=50)
+
+        report = chunker.truncation_report([self.text], char_chunker)
+        counts = chunker.count_tokens(char_chunker.split_text(self.text))
+
+        self.assertEqual(report["chunks"], len(counts))
+        self.assertEqual(report["truncated"], sum(count > 40 for count in counts))
+        self.assertGreater(report["truncated"], 0)
+        self.assertEqual(report["lost_tokens"], sum(max(count - 40, 0) for count in counts))
+
+
 if __name__ == '__main__':
     unittest.main()
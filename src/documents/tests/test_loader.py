@@ -0,0 +1,192 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from PyPDF2 import PageObject, PdfWriter
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from src.documents import loader as loader_module
+from src.documents.loader import DirectoryLoader, PDFLoader, TextFileLoader
+
+
+def write_pdf(path: Path, pages: list[str]):
+    """Создает PDF, в котором каждая страница содержит одну строку текста."""
+    writer = PdfWriter()
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+
+    for text in pages:
+        page = PageObject.create_blank_page(width=612, height=792)
+        stream = DecodedStreamObject()
+        stream.set_data(f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1"))
+        page[NameObject("/Contents")] = stream
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})
+        })
+        writer.add_page(page)
+
+    with path.open("wb") as file:
+        writer.write(file)
+
+
+class TestDirectoryLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name)
+
+        # Несколько текстовых файлов с разным содержимым
+        for idx in range(6):
+            (self.directory / f"doc_{idx}.txt").write_text(f"Документ номер {idx}", encoding="utf-8")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_parallel_load_matches_sequential(self):
+        """Тест совпадения результатов параллельной и последовательной загрузки."""
+        sequential = DirectoryLoader().load_from_directory(str(self.directory))
+        parallel = DirectoryLoader(max_workers=2).load_from_directory(str(self.directory))
+
+        self.assertEqual(len(sequential), 6)
+        # Порядок и содержимое документов не зависят от числа процессов
+        self.assertEqual(
+            [(doc.metadata["source"], doc.content) for doc in sequential],
+            [(doc.metadata["source"], doc.content) for doc in parallel],
+        )
+
+    def test_parallel_load_skips_failed_files(self):
+        """Тест пропуска файлов, которые не удалось загрузить."""
+        # Файл в неверной кодировке и файл неподдерживаемого типа
+        (self.directory / "broken.txt").write_bytes(b"\xff\xfe\xfa")
+        (self.directory / "image.png").write_bytes(b"\x89PNG")
+
+        documents = DirectoryLoader(max_workers=2).load_from_directory(str(self.directory))
+
+        filenames = [doc.metadata["filename"] for doc in documents]
+        self.assertEqual(filenames, [f"doc_{idx}.txt" for idx in range(6)])
+
+    def test_iter_from_directory_recursive_with_filters(self):
+        """Тест рекурсивного обхода с фильтрами include/exclude и ограничением размера."""
+        nested = self.directory / "nested" / "deep"
+        nested.mkdir(parents=True)
+        (nested / "inner.txt").write_text("Вложенный документ", encoding="utf-8")
+        (self.directory / "nested" / "skip.txt").write_text("Исключенный документ", encoding="utf-8")
+        (self.directory / "big.txt").write_text("x" * 1000, encoding="utf-8")
+
+        loader = DirectoryLoader()
+        documents = loader.iter_from_directory(
+            str(self.directory),
+            include=["*.txt"],
+            exclude=["nested/skip.txt", "doc_[1-5].txt"],
+            max_file_size=100,
+        )
+
+        # Итератор ленивый — ничего не загружено до первого обращения
+        self.assertFalse(isinstance(documents, list))
+
+        filenames = [doc.metadata["filename"] for doc in documents]
+        self.assertEqual(filenames, ["doc_0.txt", "inner.txt"])
+
+    def test_iter_from_directory_non_recursive(self):
+        """Тест обхода без вложенных директорий."""
+        nested = self.directory / "nested"
+        nested.mkdir()
+        (nested / "inner.txt").write_text("Вложенный документ", encoding="utf-8")
+
+        sequential = list(DirectoryLoader().iter_from_directory(str(self.directory), recursive=False))
+        parallel = list(DirectoryLoader(max_workers=2).iter_from_directory(str(self.directory), recursive=False))
+
+        self.assertEqual([doc.metadata["filename"] for doc in sequential], [f"doc_{idx}.txt" for idx in range(6)])
+        self.assertEqual([doc.content for doc in sequential], [doc.content for doc in parallel])
+
+    def test_text_file_iter_blocks(self):
+        """Тест блочного чтения текстового файла."""
+        source = self.directory / "long.txt"
+        source.write_text("Строка текста.\n" * 1000, encoding="utf-8")
+
+        blocks = list(TextFileLoader().iter_blocks(str(source), block_size=1000))
+
+        self.assertGreater(len(blocks), 1)
+        self.assertTrue(all(len(block) <= 1000 for block in blocks))
+        self.assertEqual("".join(blocks), source.read_text(encoding="utf-8"))
+
+
+class TestPDFLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source = str(Path(self.tmp_dir.name, "manual.pdf"))
+        write_pdf(Path(self.source), [f"Page {idx}" for idx in range(1, 6)])
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_iter_pages(self):
+        """Тест постраничного извлечения текста."""
+        pages = list(PDFLoader().iter_pages(self.source))
+
+        self.assertEqual(len(pages), 5)
+        self.assertEqual([page.strip() for page in pages], [f"Page {idx}" for idx in range(1, 6)])
+
+    def test_page_ranges_match_full_document(self):
+        """Тест: части по диапазонам страниц в сумме дают тот же текст, что и загрузка целиком."""
+        full = PDFLoader().load(self.source)
+        sequential = list(PDFLoader(pages_per_document=2).iter_documents(self.source))
+        parallel = list(PDFLoader(pages_per_document=2, max_workers=2).iter_documents(self.source))
+
+        self.assertEqual(
+            [(doc.metadata["page_start"], doc.metadata["page_end"]) for doc in sequential],
+            [(1, 2), (3, 4), (5, 5)],
+        )
+        self.assertEqual("".join(doc.content for doc in sequential), full.content)
+        self.assertEqual([doc.content for doc in sequential], [doc.content for doc in parallel])
+        # Все части принадлежат одному документу
+        self.assertEqual({doc.doc_id for doc in sequential}, {full.doc_id})
+
+    def test_directory_loader_streams_pdf_parts(self):
+        """Тест постраничной загрузки PDF через DirectoryLoader."""
+        Path(self.tmp_dir.name, "notes.txt").write_text("Заметки", encoding="utf-8")
+
+        loader = DirectoryLoader(max_workers=2, pdf_pages_per_document=3)
+        documents = list(loader.iter_from_directory(self.tmp_dir.name))
+
+        self.assertEqual(
+            [(doc.metadata["filename"], doc.metadata.get("page_start")) for doc in documents],
+            [("manual.pdf", 1), ("manual.pdf", 4), ("notes.txt", None)],
+        )
+
+    def test_failure_after_first_part(self):
+        """Тест: ошибка извлечения после первой части пробрасывается, DirectoryLoader отдает (путь, None)."""
+        extract = loader_module._extract_pdf_pages
+
+        def failing_extract(source: str, page_start: int, page_end: int) -> str:
+            if page_start >= 2:
+                raise ValueError("поврежденная страница")
+            return extract(source, page_start, page_end)
+
+        with patch.object(loader_module, "_extract_pdf_pages", failing_extract):
+            parts = PDFLoader(pages_per_document=2).iter_documents(self.source)
+            self.assertEqual(next(parts).metadata["page_start"], 1)
+            with self.assertRaises(ValueError):
+                next(parts)
+
+            loaded = list(DirectoryLoader(pdf_pages_per_document=2).iter_load([self.source]))
+
+        self.assertEqual([doc is not None for _, doc in loaded], [True, False])
+        self.assertEqual({source for source, _ in loaded}, {self.source})
+
+    def test_failure_before_first_part(self):
+        """Тест: ошибка до первой части не пробрасывается, файл отдается как (путь, None)."""
+        with patch.object(loader_module, "_extract_pdf_pages", side_effect=ValueError("поврежденный файл")):
+            self.assertEqual(list(PDFLoader(pages_per_document=2).iter_documents(self.source)), [])
+            loaded = list(DirectoryLoader(pdf_pages_per_document=2).iter_load([self.source]))
+
+        self.assertEqual(loaded, [(self.source, None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
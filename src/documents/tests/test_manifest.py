@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.documents.manifest import IngestionManifest
+
+
+class TestIngestionManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name)
+        self.manifest_path = str(self.directory / "manifest.json")
+        self.source = str(self.directory / "doc.txt")
+        Path(self.source).write_text("Исходный текст", encoding="utf-8")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_new_file_is_changed(self):
+        """Тест: новый файл требует индексации, после commit — нет."""
+        manifest = IngestionManifest(self.manifest_path)
+
+        self.assertTrue(manifest.changed(self.source))
+        manifest.commit(self.source, "doc-id")
+        self.assertFalse(manifest.changed(self.source))
+
+    def test_manifest_persists_between_runs(self):
+        """Тест сохранения манифеста между запусками."""
+        manifest = IngestionManifest(self.manifest_path)
+        manifest.commit(self.source, "doc-id")
+        manifest.save()
+
+        reloaded = IngestionManifest(self.manifest_path)
+        self.assertEqual(reloaded.sources(), {self.source})
+        self.assertEqual(reloaded.entries[self.source].doc_id, "doc-id")
+        self.assertFalse(reloaded.changed(self.source))
+
+    def test_pipeline_persists(self):
+        """Тест: параметры пайплайна сохраняются вместе с записями файлов."""
+        manifest = IngestionManifest(self.manifest_path)
+        manifest.pipeline = {"embedding_model": "model", "dimension": 384}
+        manifest.commit(self.source)
+        manifest.save()
+
+        reloaded = IngestionManifest(self.manifest_path)
+        self.assertEqual(reloaded.pipeline, {"embedding_model": "model", "dimension": 384})
+        self.assertEqual(reloaded.sources(), {self.source})
+
+    def test_legacy_format(self):
+        """Тест: манифест прежнего формата (только записи файлов) читается без параметров пайплайна."""
+        entry = {"size": 1, "mtime": 1.0, "sha256": "hash", "doc_id": None}
+        Path(self.manifest_path).write_text(json.dumps({self.source: entry}), encoding="utf-8")
+
+        manifest = IngestionManifest(self.manifest_path)
+        self.assertEqual(manifest.sources(), {self.source})
+        self.assertIsNone(manifest.pipeline)
+
+    def test_modified_content_is_changed(self):
+        """Тест: изменение содержимого обнаруживается."""
+        manifest = IngestionManifest(self.manifest_path)
+        manifest.commit(self.source)
+
+        Path(self.source).write_text("Новый текст документа", encoding="utf-8")
+        self.assertTrue(manifest.changed(self.source))
+
+    def test_touched_file_with_same_content_is_unchanged(self):
+        """Тест: изменение mtime без изменения содержимого не требует переиндексации."""
+        manifest = IngestionManifest(self.manifest_path)
+        manifest.commit(self.source)
+
+        stat = os.stat(self.source)
+        os.utime(self.source, (stat.st_atime, stat.st_mtime + 10))
+
+        self.assertFalse(manifest.changed(self.source))
+        # stat обновлен, повторная проверка не пересчитывает хеш
+        self.assertEqual(manifest.entries[self.source].mtime, stat.st_mtime + 10)
+
+    def test_edit_during_indexing_is_detected(self):
+        """Тест: в манифест записывается состояние файла до загрузки, правка во время индексации не теряется."""
+        manifest = IngestionManifest(self.manifest_path)
+        self.assertTrue(manifest.changed(self.source))
+
+        # Файл изменен после проверки, пока шла индексация
+        stat = os.stat(self.source)
+        Path(self.source).write_text("Текст, измененный во время индексации", encoding="utf-8")
+        os.utime(self.source, (stat.st_atime, stat.st_mtime + 10))
+        manifest.commit(self.source, "doc-id")
+
+        self.assertEqual(manifest.entries[self.source].mtime, stat.st_mtime)
+        self.assertTrue(manifest.changed(self.source))
+
+    def test_deleted_file(self):
+        """Тест: проверка удаленного файла сообщает об этом исключением FileNotFoundError."""
+        manifest = IngestionManifest(self.manifest_path)
+        manifest.commit(self.source)
+        os.remove(self.source)
+
+        with self.assertRaises(FileNotFoundError):
+            manifest.changed(self.source)
+
+
+if __name__ == '__main__':
+    unittest.main()
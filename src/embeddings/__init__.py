@@ -1,9 +1,42 @@
+from importlib import import_module
+
+from .cache import EmbeddingCache
 from .service import BaseEmbeddingService
-from .sentence_transformers import (
-    AllMiniLMService
-)
+from .accumulator import EmbeddingAccumulator
+
+# Сервисы с тяжелыми зависимостями (torch, onnxruntime) импортируются при первом обращении
+_LAZY_EXPORTS = {
+    "AllMiniLMService": ".sentence_transformers",
+    "OnnxEmbeddingService": ".onnx",
+    "AllMiniLMOnnxService": ".onnx",
+    "EmbeddingMicroBatcher": ".microbatcher",
+    "ProcessPoolEmbeddingService": ".pool",
+    "PCAReducer": ".reduction",
+    "ReducedEmbeddingService": ".reduction",
+    "recall_at_k": ".reduction",
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "BaseEmbeddingService",
-    "AllMiniLMService"
-]
\ No newline at end of file
+    "EmbeddingCache",
+    "EmbeddingAccumulator",
+    "EmbeddingMicroBatcher",
+    "AllMiniLMService",
+    "OnnxEmbeddingService",
+    "AllMiniLMOnnxService",
+    "ProcessPoolEmbeddingService",
+    "PCAReducer",
+    "ReducedEmbeddingService",
+    "recall_at_k"
+]
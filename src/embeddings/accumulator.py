@@ -0,0 +1,172 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional
+
+from ..documents.batch import ChunkBatch
+from ..logger import LoggerService
+from .service import BaseEmbeddingService
+
+
+class EmbeddingAccumulator(LoggerService):
+    """
+    Накопитель чанков между документами: пачки чанков копятся, пока не наберется batch_size чанков
+    или с момента первого ожидающего чанка не пройдет flush_timeout секунд. Затем все чанки
+    кодируются одним вызовом модели и записываются одной вставкой, а каждому документу
+    возвращается его часть пачки с эмбеддингами.
+    Запись идет в отдельном потоке: пока пишется одна пачка, следующая копится и кодируется.
+    В очереди записи не больше одной пачки, обработчики записи (on_written, after_write)
+    выполняются в вызывающем потоке. Таймаут проверяется при добавлении пачки.
+    """
+
+    def __init__(
+        self,
+        embedding_service: BaseEmbeddingService,
+        write: Callable[[ChunkBatch], None],
+        batch_size: int = 512,
+        flush_timeout: Optional[float] = 5.0,
+    ):
+        """
+        Args:
+            embedding_service: Сервис эмбеддингов
+            write: Запись пачки с эмбеддингами в хранилище (например, ChromaDB.add_batch)
+            batch_size: Сколько чанков копить перед кодированием
+            flush_timeout: Максимальное время ожидания первого чанка в очереди, в секундах (None — без ограничения)
+        """
+        self.embedding_service = embedding_service
+        self.write = write
+        self.batch_size = batch_size
+        self.flush_timeout = flush_timeout
+
+        self._batches: list[ChunkBatch] = []
+        self._callbacks: list[Optional[Callable[[ChunkBatch], None]]] = []
+        # Действия, которые выполняются после записи всех чанков, добавленных до них
+        self._after_write: list[Callable[[], None]] = []
+        self._pending = 0
+        self._first_added_at: Optional[float] = None
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Задачи потока записи (запись пачки и действия, отправленные через submit)
+        # и действия после их окончания
+        self._writing: list[Future] = []
+        self._written: list[Callable[[], None]] = []
+
+        self.flushes = 0
+
+    def __len__(self) -> int:
+        return self._pending
+
+    def add(self, batch: ChunkBatch, on_written: Optional[Callable[[ChunkBatch], None]] = None):
+        """
+        Добавляет пачку чанков документа. При достижении batch_size или flush_timeout накопленные
+        чанки кодируются и отправляются на запись, не дожидаясь ее окончания.
+
+        Args:
+            batch: Пачка чанков без эмбеддингов
+            on_written: Вызывается после записи с частью пачки этого документа (с эмбеддингами)
+        """
+        if len(batch):
+            if self._first_added_at is None:
+                self._first_added_at = time.perf_counter()
+            self._batches.append(batch)
+            self._callbacks.append(on_written)
+            self._pending += len(batch)
+
+        if self._pending >= self.batch_size or self._timed_out():
+            self._submit()
+
+    def after_write(self, callback: Callable[[], None]):
+        """
+        Выполняет действие после записи всех уже добавленных чанков (сразу, если очередь пуста
+        и ничего не пишется). Например, запись файла в манифест только после того,
+        как его чанки оказались в хранилище.
+
+        Args:
+            callback: Действие
+        """
+        if self._pending:
+            self._after_write.append(callback)
+        elif self._writing:
+            self._written.append(callback)
+        else:
+            callback()
+
+    def submit(self, action: Callable[[], None]):
+        """
+        Выполняет действие в потоке записи: после уже отправленной записи и до записи чанков,
+        которые еще копятся. Например, удаление старых чанков измененного файла
+        без ожидания текущей записи. Ошибка действия пробрасывается из wait.
+
+        Args:
+            action: Действие
+        """
+        self._writing.append(self._get_executor().submit(action))
+
+    def flush(self):
+        """Кодирует накопленные чанки одним вызовом, записывает их одной вставкой и дожидается записи."""
+        self._submit()
+        self.wait()
+
+    def wait(self):
+        """
+        Дожидается задач потока записи и выполняет действия после них.
+        Ошибка записи пробрасывается, действия после упавшей записи не выполняются.
+        """
+        writing, written = self._writing, self._written
+        self._writing, self._written = [], []
+
+        for future in writing:
+            future.result()
+        for callback in written:
+            callback()
+
+    def close(self):
+        """Останавливает поток записи, дождавшись текущей записи. Действия после нее не выполняются."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._writing, self._written = [], []
+
+    def _submit(self):
+        """Кодирует накопленные чанки и отправляет их на запись после окончания предыдущей записи."""
+        batches, callbacks, after_write = self._batches, self._callbacks, self._after_write
+        self._batches, self._callbacks, self._after_write = [], [], []
+        self._pending = 0
+        self._first_added_at = None
+
+        if not batches:
+            # Действия после записи копятся только вместе с чанками
+            for callback in after_write:
+                callback()
+            return
+
+        # Кодирование следующей пачки идет одновременно с записью предыдущей
+        batch = self.embedding_service.embed_batch(ChunkBatch.concat(batches))
+        self.wait()
+
+        self._writing.append(self._get_executor().submit(self.write, batch))
+        self.flushes += 1
+
+        # Каждому документу — его часть общей пачки
+        written: list[Callable[[], None]] = [partial(self._log_written, len(batch), len(batches))]
+        offset = 0
+        for part, on_written in zip(batches, callbacks):
+            if on_written is not None:
+                written.append(partial(on_written, batch.slice(offset, offset + len(part))))
+            offset += len(part)
+        self._written = written + after_write
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-accumulator")
+        return self._executor
+
+    def _log_written(self, chunks: int, documents: int):
+        self._logger_info(f"Записано чанков: {chunks} из документов: {documents}")
+
+    def _timed_out(self) -> bool:
+        return (
+            self.flush_timeout is not None
+            and self._first_added_at is not None
+            and time.perf_counter() - self._first_added_at >= self.flush_timeout
+        )
@@ -0,0 +1,84 @@
+from typing import Callable
+
+import numpy as np
+
+
+def plan_batches(lengths: np.ndarray, tokens_per_batch: int, max_batch_size: int) -> list[np.ndarray]:
+    """
+    Разбивает тексты на батчи по длине.
+    Тексты идут от длинных к коротким: самый затратный батч выполняется первым,
+    и нехватка памяти проявляется сразу.
+
+    Args:
+        lengths: Длины текстов в токенах
+        tokens_per_batch: Бюджет батча (число текстов x длина самого длинного из них)
+        max_batch_size: Максимальное число текстов в батче
+
+    Returns:
+        Индексы текстов каждого батча
+    """
+    order = np.argsort(-np.asarray(lengths), kind="stable")
+    batches: list[np.ndarray] = []
+    start = 0
+
+    while start < len(order):
+        # Первый текст батча самый длинный — он определяет паддинг всего батча
+        longest = max(int(lengths[order[start]]), 1)
+        size = min(max(tokens_per_batch // longest, 1), max_batch_size)
+        batches.append(order[start:start + size])
+        start += size
+
+    return batches
+
+
+def token_lengths(tokenizer, texts: list[str], max_length: int) -> np.ndarray:
+    """
+    Длины текстов в токенах модели (с учетом обрезки до max_length) одним вызовом токенизатора.
+
+    Args:
+        tokenizer: Токенизатор Hugging Face модели
+        texts: Список текстов
+        max_length: Максимальная длина входа модели в токенах
+
+    Returns:
+        Длины текстов в токенах
+    """
+    encoded = tokenizer(texts, add_special_tokens=True, truncation=True, max_length=max_length)
+    return np.fromiter((len(ids) for ids in encoded["input_ids"]), dtype=np.int64, count=len(texts))
+
+
+def encode_by_token_budget(
+    texts: list[str],
+    encode_batch: Callable[[list[str]], np.ndarray],
+    tokenizer,
+    max_length: int,
+    dimension: int,
+    tokens_per_batch: int,
+    max_batch_size: int,
+) -> np.ndarray:
+    """
+    Кодирует тексты батчами, сгруппированными по длине в токенах (см. plan_batches).
+    Результат возвращается в исходном порядке текстов.
+
+    Args:
+        texts: Список текстов
+        encode_batch: Кодирование одного батча текстов в матрицу float32
+        tokenizer: Токенизатор модели
+        max_length: Максимальная длина входа модели в токенах
+        dimension: Размерность эмбеддингов
+        tokens_per_batch: Бюджет батча (число текстов x длина самого длинного из них)
+        max_batch_size: Максимальное число текстов в батче
+
+    Returns:
+        Матрица float32 размером len(texts) x dimension (для пустого списка — 0 x dimension)
+    """
+    embeddings = np.empty((len(texts), dimension), dtype=np.float32)
+    if not texts:
+        return embeddings
+
+    lengths = token_lengths(tokenizer, texts, max_length)
+    for batch in plan_batches(lengths, tokens_per_batch, max_batch_size):
+        # Тексты батча близки по длине, поэтому паддинг почти не тратит вычисления
+        embeddings[batch] = encode_batch([texts[idx] for idx in batch])
+
+    return embeddings
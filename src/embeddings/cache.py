@@ -0,0 +1,203 @@
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from ..logger import LoggerService
+
+# Размер ключа записи: SHA-256 текста чанка
+DIGEST_SIZE = 32
+
+
+class EmbeddingCache(LoggerService):
+    """
+    Персистентный кэш эмбеддингов, адресуемый содержимым.
+    Ключ — (модель, флаг нормализации, SHA-256 текста чанка): модель и флаг задают
+    отдельное хранилище, хеш текста — запись в нем.
+    Векторы хранятся на диске в отображаемом в память (memmap) файле float32, перед ним —
+    ограниченный LRU-кэш в памяти.
+    """
+
+    # Начальная емкость файла векторов (в записях), при заполнении удваивается
+    INITIAL_CAPACITY = 1024
+
+    def __init__(
+        self,
+        cache_dir: str,
+        model_name: str,
+        normalize: bool,
+        dimension: int,
+        max_memory_items: int = 100_000,
+    ):
+        """
+        Args:
+            cache_dir: Директория кэша
+            model_name: Название модели эмбеддингов
+            normalize: Нормализуются ли эмбеддинги модели
+            dimension: Размерность эмбеддингов
+            max_memory_items: Максимальное количество векторов в LRU-кэше в памяти
+        """
+        self.model_name = model_name
+        self.normalize = normalize
+        self.dimension = dimension
+        self.max_memory_items = max_memory_items
+
+        store_name = re.sub(r"[^\w.-]", "_", f"{model_name}-{'norm' if normalize else 'raw'}-{dimension}")
+        self.store_dir = Path(cache_dir, store_name)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self._keys_path = self.store_dir / "keys.bin"
+        self._vectors_path = self.store_dir / "vectors.f32"
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._memory: OrderedDict[bytes, np.ndarray] = OrderedDict()
+
+        self._write_meta()
+        self._rows = self._load_keys()
+        self._vectors = self._open_vectors(max(self.INITIAL_CAPACITY, len(self._rows)))
+
+    @staticmethod
+    def digest(text: str) -> bytes:
+        """Хеш текста чанка — ключ записи внутри хранилища модели."""
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get_many(self, texts: list[str]) -> tuple[np.ndarray, list[int]]:
+        """
+        Ищет эмбеддинги текстов в кэше.
+
+        Args:
+            texts: Тексты чанков
+
+        Returns:
+            Матрица len(texts) x dimension (строки промахов не заполнены)
+            и индексы текстов, которых нет в кэше
+        """
+        result = np.empty((len(texts), self.dimension), dtype=np.float32)
+        missing: list[int] = []
+        memory = self._memory
+
+        for idx, text in enumerate(texts):
+            key = self.digest(text)
+
+            vector = memory.get(key)
+            if vector is not None:
+                memory.move_to_end(key)
+                result[idx] = vector
+                self.hits += 1
+                continue
+
+            row = self._rows.get(key)
+            if row is None:
+                missing.append(idx)
+                self.misses += 1
+                continue
+
+            result[idx] = self._vectors[row]
+            self._remember(key, result[idx])
+            self.hits += 1
+
+        return result, missing
+
+    def put_many(self, texts: list[str], vectors: np.ndarray):
+        """
+        Сохраняет эмбеддинги текстов на диск и в LRU-кэш.
+
+        Args:
+            texts: Тексты чанков
+            vectors: Матрица эмбеддингов len(texts) x dimension
+        """
+        new_keys: list[bytes] = []
+        new_rows: list[int] = []
+
+        for idx, text in enumerate(texts):
+            key = self.digest(text)
+            if key not in self._rows:
+                self._rows[key] = len(self._rows)
+                new_keys.append(key)
+                new_rows.append(idx)
+            self._remember(key, vectors[idx])
+
+        if not new_keys:
+            return
+
+        end = len(self._rows)
+        if end > self._vectors.shape[0]:
+            self._vectors = self._open_vectors(max(end, 2 * self._vectors.shape[0]))
+
+        self._vectors[end - len(new_keys):end] = vectors[new_rows]
+        self._vectors.flush()
+        # Ключи дописываются после векторов: запись с ключом на диске всегда полная
+        with self._keys_path.open("ab") as file:
+            file.write(b"".join(new_keys))
+
+    def stats(self) -> dict[str, int]:
+        """Статистика кэша: попадания, промахи, вытеснения из памяти и размеры уровней."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "memory_items": len(self._memory),
+            "disk_items": len(self._rows),
+        }
+
+    def log_stats(self):
+        """Логирует статистику попаданий и промахов."""
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0.0
+        self._logger_info(
+            f"Кэш эмбеддингов {self.model_name}: попаданий {self.hits}, промахов {self.misses} "
+            f"({hit_rate:.1f}% попаданий), вытеснено из памяти {self.evictions}, "
+            f"на диске {len(self._rows)} векторов"
+        )
+
+    def _remember(self, key: bytes, vector: np.ndarray):
+        """Кладет вектор в LRU-кэш в памяти, вытесняя давно не использованные."""
+        if self.max_memory_items <= 0:
+            return
+
+        self._memory[key] = np.array(vector, dtype=np.float32)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _write_meta(self):
+        meta_path = self.store_dir / "meta.json"
+        meta = {"model_name": self.model_name, "normalize": self.normalize, "dimension": self.dimension}
+        if not meta_path.exists():
+            meta_path.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+    def _load_keys(self) -> dict[bytes, int]:
+        """Читает ключи записей. Недописанный хвост (прерванная запись) отбрасывается."""
+        if not self._keys_path.exists():
+            return {}
+
+        raw = self._keys_path.read_bytes()
+        complete = len(raw) - len(raw) % DIGEST_SIZE
+        if complete != len(raw):
+            self._logger_warning(f"Кэш эмбеддингов {str(self.store_dir)}: отброшена недописанная запись")
+            with self._keys_path.open("r+b") as file:
+                file.truncate(complete)
+
+        return {raw[offset:offset + DIGEST_SIZE]: row for row, offset in enumerate(range(0, complete, DIGEST_SIZE))}
+
+    def _open_vectors(self, capacity: int) -> np.memmap:
+        """Открывает файл векторов, при необходимости увеличивая его до capacity записей."""
+        row_bytes = self.dimension * np.dtype(np.float32).itemsize
+        size = self._vectors_path.stat().st_size if self._vectors_path.exists() else 0
+
+        if size < capacity * row_bytes:
+            with self._vectors_path.open("ab") as file:
+                file.truncate(capacity * row_bytes)
+        else:
+            capacity = size // row_bytes
+
+        return np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
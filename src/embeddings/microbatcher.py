@@ -0,0 +1,140 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from ..logger import LoggerService
+from .service import BaseEmbeddingService
+
+
+class EmbeddingMicroBatcher(LoggerService):
+    """
+    Асинхронный микробатчинг запросов к сервису эмбеддингов.
+    Одновременные вызовы embed копятся до max_batch_size текстов или max_wait_ms миллисекунд
+    с первого из них, затем кодируются одним вызовом модели, и каждый вызывающий получает свою строку.
+    Модель работает в отдельном потоке, батчи выполняются по одному: пока идет один,
+    новые запросы копятся в следующий.
+    """
+
+    def __init__(self, embedding_service: BaseEmbeddingService, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        """
+        Args:
+            embedding_service: Сервис эмбеддингов
+            max_batch_size: Максимальное количество текстов в батче
+            max_wait_ms: Сколько миллисекунд первый запрос батча может ждать остальных
+        """
+        self.embedding_service = embedding_service
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._texts: list[str] = []
+        self._futures: list[asyncio.Future] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-microbatcher")
+
+        # Метрики: количество батчей, текстов и самый большой батч
+        self.batches = 0
+        self.items = 0
+        self.max_seen_batch_size = 0
+
+    async def embed(self, text: str) -> np.ndarray:
+        """
+        Создает эмбеддинг текста в составе общего батча.
+
+        Args:
+            text: Текст запроса
+
+        Returns:
+            np.ndarray: эмбеддинг float32
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._texts.append(text)
+        self._futures.append(future)
+
+        if len(self._texts) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    async def embed_many(self, texts: list[str]) -> np.ndarray:
+        """
+        Создает эмбеддинги нескольких текстов, объединяя их с одновременными запросами.
+
+        Args:
+            texts: Тексты запросов
+
+        Returns:
+            np.ndarray: матрица float32 размером len(texts) x dimension
+        """
+        if not texts:
+            return np.empty((0, self.embedding_service.dimension or 0), dtype=np.float32)
+        return np.stack(await asyncio.gather(*(self.embed(text) for text in texts)))
+
+    async def close(self):
+        """Кодирует оставшиеся запросы и останавливает поток модели."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+
+    @property
+    def mean_batch_size(self) -> float:
+        """Средний размер батча."""
+        return self.items / self.batches if self.batches else 0.0
+
+    def stats(self) -> dict[str, float]:
+        """Метрики микробатчинга: количество батчей и текстов, средний и максимальный размер батча."""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.mean_batch_size,
+            "max_batch_size": self.max_seen_batch_size,
+        }
+
+    def log_stats(self):
+        """Логирует метрики микробатчинга."""
+        self._logger_info(
+            f"Микробатчинг эмбеддингов: батчей {self.batches}, запросов {self.items}, "
+            f"средний батч {self.mean_batch_size:.1f}, максимальный {self.max_seen_batch_size}"
+        )
+
+    def _flush(self):
+        """Забирает накопленные запросы и запускает их кодирование одним батчем."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._texts:
+            return
+
+        texts, futures = self._texts, self._futures
+        self._texts, self._futures = [], []
+
+        self.batches += 1
+        self.items += len(texts)
+        self.max_seen_batch_size = max(self.max_seen_batch_size, len(texts))
+
+        task = asyncio.get_running_loop().create_task(self._run(texts, futures))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, texts: list[str], futures: list[asyncio.Future]):
+        """Кодирует батч в потоке модели и передает каждому вызывающему его эмбеддинг."""
+        loop = asyncio.get_running_loop()
+        try:
+            embeddings = await loop.run_in_executor(self._executor, self.embedding_service.encode_array, texts)
+        except Exception as e:
+            self._logger_error(f"Ошибка при создании эмбеддингов батча из {len(texts)} запросов: {e}")
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future, embedding in zip(futures, embeddings):
+            # Вызывающий мог отменить ожидание
+            if not future.done():
+                future.set_result(embedding)
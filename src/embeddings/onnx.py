@@ -0,0 +1,272 @@
+import json
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import onnxruntime as ort
+from transformers import AutoTokenizer
+
+from .batching import encode_by_token_budget
+from .service import BaseEmbeddingService
+from src.config import EmbeddingModelsType
+
+# Имена файлов в директории ONNX-модели
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model_int8.onnx"
+ONNX_META_FILE = "embedding_config.json"
+
+
+def _pooling_mode(pooling) -> str:
+    """Режим пулинга модуля Pooling (формат конфигурации отличается между версиями sentence-transformers)."""
+    config = pooling.get_config_dict()
+    mode = config.get("pooling_mode")
+    if isinstance(mode, str):
+        return mode
+    if config.get("pooling_mode_cls_token"):
+        return "cls"
+    if config.get("pooling_mode_max_tokens"):
+        return "max"
+    return "mean"
+
+
+def export_onnx(model, onnx_dir: Path) -> Path:
+    """
+    Экспортирует трансформер модели Sentence Transformers в ONNX.
+    Пулинг и нормализация выполняются сервисом, их параметры сохраняются рядом с моделью.
+
+    Args:
+        model: Модель SentenceTransformer (Transformer, Pooling и, опционально, Normalize)
+        onnx_dir: Директория для ONNX-модели, токенизатора и параметров
+
+    Returns:
+        Путь к ONNX-модели
+    """
+    # torch нужен только для экспорта, при инференсе он не загружается
+    import torch
+
+    transformer, pooling = model[0], model[1]
+    pooling_mode = _pooling_mode(pooling)
+    if pooling_mode not in ("mean", "cls", "max"):
+        raise ValueError(f"Режим пулинга {pooling_mode} не поддерживается ONNX-сервисом")
+
+    tokenizer = transformer.tokenizer
+    auto_model = transformer.auto_model.eval()
+    dummy = tokenizer(["Пример текста для экспорта"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in dummy]
+
+    class LastHiddenState(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.model = auto_model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs)))[0]
+
+    onnx_dir.mkdir(parents=True, exist_ok=True)
+    onnx_path = onnx_dir / ONNX_MODEL_FILE
+
+    with torch.no_grad():
+        torch.onnx.export(
+            LastHiddenState(),
+            tuple(dummy[name] for name in input_names),
+            str(onnx_path),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={name: {0: "batch", 1: "sequence"} for name in [*input_names, "last_hidden_state"]},
+            opset_version=17,
+            dynamo=False,
+        )
+
+    tokenizer.save_pretrained(str(onnx_dir))
+    with (onnx_dir / ONNX_META_FILE).open("w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "pooling": pooling_mode,
+                "normalize": any(type(module).__name__ == "Normalize" for module in model),
+                "max_seq_length": model.max_seq_length,
+                "dimension": transformer.get_word_embedding_dimension(),
+            },
+            file,
+        )
+
+    return onnx_path
+
+
+def quantize_onnx(onnx_dir: Path) -> Path:
+    """
+    Создает int8-вариант ONNX-модели динамической квантизацией весов.
+
+    Args:
+        onnx_dir: Директория ONNX-модели
+
+    Returns:
+        Путь к квантизованной модели
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    int8_path = onnx_dir / ONNX_INT8_MODEL_FILE
+    quantize_dynamic(str(onnx_dir / ONNX_MODEL_FILE), str(int8_path), weight_type=QuantType.QInt8)
+    return int8_path
+
+
+class OnnxEmbeddingService(BaseEmbeddingService):
+    """
+    Сервис эмбеддингов на ONNX Runtime (CPU).
+    Модель экспортируется из Sentence Transformers в .cache/<модель>/onnx при первом запуске,
+    дальше загружается оттуда без PyTorch. Опционально используется int8-квантизованный вариант.
+    """
+
+    model_name: str
+    # Бюджет батча в токенах с учетом паддинга (число текстов x длина самого длинного из них)
+    TOKENS_PER_BATCH = 16384
+    # Верхняя граница числа текстов в батче
+    MAX_BATCH_SIZE = 512
+    # Скорость последнего кодирования (текстов в секунду)
+    texts_per_second: Optional[float] = None
+
+    def __init__(
+        self,
+        model_name: str,
+        quantize: bool = False,
+        num_threads: Optional[int] = None,
+        cache_folder: Optional[str] = None,
+    ):
+        """
+        Args:
+            model_name: Название модели Sentence Transformers
+            quantize: Использовать int8-квантизованную модель
+            num_threads: Количество потоков ONNX Runtime (None — по числу ядер)
+            cache_folder: Директория кэша моделей (по умолчанию cache_folder сервиса)
+        """
+        self._logger_info(f"Инициализация OnnxEmbeddingService для модели {model_name} (int8: {quantize})")
+
+        self.model_name = model_name
+        self.quantize = quantize
+        if cache_folder is not None:
+            self.cache_folder = cache_folder
+
+        model_dir = Path(self.cache_folder, self.model_name)
+        self.onnx_dir = model_dir / "onnx"
+
+        if not (self.onnx_dir / ONNX_MODEL_FILE).exists():
+            self._logger_info(f"ONNX-модель не найдена, экспорт в {str(self.onnx_dir)}")
+            from sentence_transformers import SentenceTransformer
+            export_onnx(SentenceTransformer(self.model_name, cache_folder=str(model_dir)), self.onnx_dir)
+
+        model_path = self.onnx_dir / ONNX_MODEL_FILE
+        if quantize:
+            model_path = self.onnx_dir / ONNX_INT8_MODEL_FILE
+            if not model_path.exists():
+                self._logger_info("Квантизация ONNX-модели в int8")
+                quantize_onnx(self.onnx_dir)
+
+        with (self.onnx_dir / ONNX_META_FILE).open(encoding="utf-8") as file:
+            meta = json.load(file)
+        self.pooling = meta["pooling"]
+        self.normalize_embeddings = meta["normalize"]
+        self.max_seq_length = meta["max_seq_length"]
+        self._dimension = meta["dimension"]
+
+        self._tokenizer = AutoTokenizer.from_pretrained(str(self.onnx_dir))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self._input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+        self._logger_info(f"ONNX-модель загружена: {str(model_path)}. Размерность эмбеддингов: {self._dimension}")
+
+    def create_embedding(self, text: str) -> list[float]:
+        try:
+            return self.encode_array([text])[0].tolist()
+        except Exception as e:
+            self._logger_error(f"Ошибка при создании эмбеддинга для текста {text}: {e}")
+            raise
+
+    def create_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return self._encode_cached(texts).tolist()
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        started_at = time.perf_counter()
+
+        try:
+            embeddings = encode_by_token_budget(
+                texts,
+                self._encode_batch,
+                self._tokenizer,
+                self.max_seq_length,
+                self._dimension,
+                self.TOKENS_PER_BATCH,
+                self.MAX_BATCH_SIZE,
+            )
+        except Exception as e:
+            slice_texts = str([text[:10] for text in texts])
+            self._logger_error(f"Ошибка при создании эмбеддингов для текстов {slice_texts}: {str(e)}")
+            raise
+
+        elapsed = time.perf_counter() - started_at
+        self.texts_per_second = len(texts) / elapsed if elapsed > 0 else float("inf")
+        self._logger_info(f"Закодировано текстов: {len(texts)} за {elapsed:.2f} с ({self.texts_per_second:.1f} текстов/с)")
+        return embeddings
+
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        """Кодирует один батч: трансформер в ONNX Runtime, пулинг и нормализация в NumPy."""
+        encoded = self._tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np",
+        )
+        inputs = {name: encoded[name].astype(np.int64) for name in self._input_names}
+        hidden = self.session.run(None, inputs)[0]
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+
+        if self.pooling == "cls":
+            embeddings = hidden[:, 0]
+        elif self.pooling == "max":
+            embeddings = np.where(mask > 0, hidden, -np.inf).max(axis=1)
+        else:
+            embeddings = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        if self.normalize_embeddings:
+            embeddings = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings.astype(np.float32, copy=False)
+
+    @property
+    def dimension(self) -> int | None:
+        return self._dimension
+
+    @property
+    def cache_name(self) -> str:
+        # Квантизованная модель дает другие векторы, чем исходная
+        return f"{self.model_name}-int8" if self.quantize else self.model_name
+
+    @property
+    def provides_tokenizer(self) -> bool:
+        return True
+
+    @property
+    def tokenizer(self):
+        return self._tokenizer
+
+    @property
+    def max_tokens(self) -> int | None:
+        return self.max_seq_length - self._tokenizer.num_special_tokens_to_add(pair=False)
+
+
+class AllMiniLMOnnxService(OnnxEmbeddingService):
+    """Сервис эмбеддингов all-MiniLM-L6-v2 на ONNX Runtime."""
+
+    MODEL_NAME: str = EmbeddingModelsType.ALL_MINI_LM_L6_V2.value
+
+    def __init__(self, quantize: bool = False, num_threads: Optional[int] = None):
+        """
+        Args:
+            quantize: Использовать int8-квантизованную модель
+            num_threads: Количество потоков ONNX Runtime (None — по числу ядер)
+        """
+        super().__init__(self.MODEL_NAME, quantize=quantize, num_threads=num_threads)
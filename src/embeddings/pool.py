@@ -0,0 +1,164 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor  # Пул процессов для кодирования на многоядерных машинах
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+
+from .service import BaseEmbeddingService
+
+# Сервис эмбеддингов рабочего процесса: модель загружается один раз на процесс
+_worker_service: Optional[BaseEmbeddingService] = None
+
+
+def _init_worker(service_factory: Callable[[int], BaseEmbeddingService], threads: int):
+    """Инициализирует рабочий процесс: ограничивает потоки torch и загружает модель с тем же числом потоков."""
+    global _worker_service
+
+    # Без ограничения каждый процесс запускает столько потоков, сколько ядер на машине
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    except (ImportError, RuntimeError):
+        # torch не установлен или пул межоперационных потоков уже запущен
+        pass
+
+    # Фабрика получает число потоков: ONNX Runtime ограничивается сам, а не через torch
+    _worker_service = service_factory(threads)
+
+
+def _encode_shard(texts: list[str]) -> np.ndarray:
+    """Кодирует часть текстов в рабочем процессе."""
+    return _worker_service._encode(texts)
+
+
+class ProcessPoolEmbeddingService(BaseEmbeddingService):
+    """
+    Сервис эмбеддингов, распределяющий кодирование по пулу процессов.
+    Каждый процесс один раз загружает свою копию модели и работает с ограниченным числом потоков
+    (torch, OpenMP/MKL и потоки, переданные фабрике сервиса).
+    Входные тексты делятся на части по SHARD_SIZE, результаты возвращаются в исходном порядке.
+    Локальный сервис используется для токенизатора, размерности и коротких запросов (поиск).
+    Пул живет, пока не вызван close().
+    """
+
+    # Количество текстов в одной задаче пула
+    SHARD_SIZE = 512
+    # Скорость последнего кодирования (текстов в секунду)
+    texts_per_second: Optional[float] = None
+
+    def __init__(
+        self,
+        service: BaseEmbeddingService,
+        service_factory: Callable[[int], BaseEmbeddingService],
+        workers: int,
+        threads_per_worker: Optional[int] = None,
+    ):
+        """
+        Args:
+            service: Локальный сервис эмбеддингов
+            service_factory: Функция, создающая сервис в рабочем процессе по числу потоков на процесс
+                (должна сериализоваться pickle; ONNX-сервис передает его в intra_op_num_threads)
+            workers: Количество рабочих процессов
+            threads_per_worker: Потоков модели на процесс (None — ядра поровну между процессами)
+        """
+        self.service = service
+        self.model_name = service.model_name
+        self.normalize_embeddings = service.normalize_embeddings
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+
+        # spawn: fork процесса с уже запущенными потоками torch может зависнуть
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(service_factory, self.threads_per_worker),
+        )
+        self._logger_info(
+            f"Пул эмбеддингов: процессов {workers}, потоков на процесс {self.threads_per_worker}"
+        )
+
+    def create_embedding(self, text: str) -> list[float]:
+        return self.service.create_embedding(text)
+
+    def create_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return self._encode_cached(texts).tolist()
+
+    def iter_encode(self, texts: list[str]) -> Iterator[np.ndarray]:
+        """
+        Кодирует тексты в пуле процессов и по мере готовности возвращает матрицы эмбеддингов
+        частей по SHARD_SIZE текстов в исходном порядке.
+
+        Args:
+            texts: список текстов
+
+        Returns:
+            Итератор матриц float32 размером len(part) x dimension
+        """
+        # В работе не больше двух частей на процесс: готовые части не копятся в памяти
+        window = self.workers * 2
+        pending: deque[Future] = deque()
+
+        for start in range(0, len(texts), self.SHARD_SIZE):
+            pending.append(self._executor.submit(_encode_shard, texts[start:start + self.SHARD_SIZE]))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        # Одна часть быстрее закодировать на месте, чем передавать в пул
+        if len(texts) <= self.SHARD_SIZE:
+            return self.service._encode(texts)
+
+        started_at = time.perf_counter()
+
+        try:
+            embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+            offset = 0
+            for part in self.iter_encode(texts):
+                embeddings[offset:offset + len(part)] = part
+                offset += len(part)
+        except Exception as e:
+            slice_texts = str([text[:10] for text in texts])
+            self._logger_error(f"Ошибка при создании эмбеддингов для текстов {slice_texts}: {str(e)}")
+            raise
+
+        elapsed = time.perf_counter() - started_at
+        self.texts_per_second = len(texts) / elapsed if elapsed > 0 else float("inf")
+        self._logger_info(
+            f"Закодировано текстов: {len(texts)} за {elapsed:.2f} с "
+            f"({self.texts_per_second:.1f} текстов/с, процессов: {self.workers})"
+        )
+        return embeddings
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._logger_info("Пул эмбеддингов остановлен")
+
+    @property
+    def dimension(self) -> int | None:
+        return self.service.dimension
+
+    @property
+    def cache_name(self) -> str:
+        return self.service.cache_name
+
+    @property
+    def provides_tokenizer(self) -> bool:
+        return self.service.provides_tokenizer
+
+    @property
+    def tokenizer(self):
+        return self.service.tokenizer
+
+    @property
+    def max_tokens(self) -> int | None:
+        return self.service.max_tokens
@@ -0,0 +1,186 @@
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+from .service import BaseEmbeddingService
+
+
+class PCAReducer:
+    """
+    Проекция эмбеддингов на главные компоненты выборки корпуса (PCA).
+    Компоненты ищутся без центрирования: сдвиг на средний вектор меняет косинусы между векторами,
+    а проекция должна сохранять соседей поиска по полным векторам.
+    Результат нормализуется: хранилище сравнивает векторы по косинусу.
+    """
+
+    def __init__(self, components: np.ndarray, explained_variance_ratio: np.ndarray):
+        """
+        Args:
+            components: Главные компоненты, матрица исходная размерность x целевая размерность
+            explained_variance_ratio: Доля дисперсии, объясненная каждой компонентой
+        """
+        self.components = np.ascontiguousarray(components, dtype=np.float32)
+        self.explained_variance_ratio = np.asarray(explained_variance_ratio, dtype=np.float32)
+
+    @classmethod
+    def fit(cls, embeddings: np.ndarray, dimension: int) -> "PCAReducer":
+        """
+        Находит главные компоненты выборки эмбеддингов.
+
+        Args:
+            embeddings: Выборка эмбеддингов корпуса, матрица n x исходная размерность
+            dimension: Целевая размерность
+
+        Returns:
+            Обученная проекция
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float64)
+        if not 0 < dimension <= min(embeddings.shape):
+            raise ValueError(
+                f"Целевая размерность {dimension} должна быть от 1 до {min(embeddings.shape)} "
+                f"(выборка {embeddings.shape})"
+            )
+
+        _, singular_values, vt = np.linalg.svd(embeddings, full_matrices=False)
+        variance = singular_values ** 2
+        return cls(vt[:dimension].T, variance[:dimension] / variance.sum())
+
+    @property
+    def input_dimension(self) -> int:
+        return self.components.shape[0]
+
+    @property
+    def dimension(self) -> int:
+        return self.components.shape[1]
+
+    @property
+    def fingerprint(self) -> str:
+        """Хеш параметров проекции: векторы разных проекций не должны смешиваться в кэше."""
+        return hashlib.sha256(self.components.tobytes()).hexdigest()[:12]
+
+    def transform(self, embeddings: np.ndarray) -> np.ndarray:
+        """
+        Проецирует эмбеддинги и нормализует результат.
+
+        Args:
+            embeddings: Матрица n x исходная размерность
+
+        Returns:
+            np.ndarray: матрица float32 n x целевая размерность
+        """
+        reduced = np.asarray(embeddings, dtype=np.float32) @ self.components
+        norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+        return np.ascontiguousarray(reduced / np.clip(norms, 1e-12, None), dtype=np.float32)
+
+    def save(self, path: Path):
+        """Сохраняет проекцию в .npz."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as file:
+            np.savez(
+                file,
+                components=self.components,
+                explained_variance_ratio=self.explained_variance_ratio,
+            )
+
+    @classmethod
+    def load(cls, path: Path) -> "PCAReducer":
+        """Загружает проекцию из .npz."""
+        with np.load(path) as data:
+            return cls(data["components"], data["explained_variance_ratio"])
+
+
+def recall_at_k(
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    reduced_corpus: np.ndarray,
+    reduced_queries: np.ndarray,
+    k: int = 10,
+) -> float:
+    """
+    Recall@k поиска по сокращенным векторам относительно точного поиска по полным:
+    средняя доля k ближайших по косинусу соседей полного поиска, найденных сокращенным.
+
+    Args:
+        corpus: Эмбеддинги корпуса полной размерности
+        queries: Эмбеддинги запросов полной размерности
+        reduced_corpus: Сокращенные эмбеддинги корпуса
+        reduced_queries: Сокращенные эмбеддинги запросов
+        k: Количество соседей
+
+    Returns:
+        Recall@k от 0 до 1
+    """
+    k = min(k, len(corpus))
+    expected = _top_k(corpus, queries, k)
+    actual = _top_k(reduced_corpus, reduced_queries, k)
+    found = sum(len(np.intersect1d(row_expected, row_actual)) for row_expected, row_actual in zip(expected, actual))
+    return found / (k * len(queries))
+
+
+def _top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Индексы k ближайших по косинусу векторов корпуса для каждого запроса (точный поиск)."""
+    corpus = corpus / np.clip(np.linalg.norm(corpus, axis=1, keepdims=True), 1e-12, None)
+    queries = queries / np.clip(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12, None)
+    scores = queries @ corpus.T
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+class ReducedEmbeddingService(BaseEmbeddingService):
+    """
+    Сервис эмбеддингов с понижением размерности: эмбеддинги исходного сервиса проецируются PCAReducer.
+    Проекция применяется и при индексации, и к запросам, поэтому хранилище содержит и сравнивает
+    только сокращенные векторы.
+    """
+
+    # Проекция нормализует результат
+    normalize_embeddings = True
+
+    def __init__(self, service: BaseEmbeddingService, reducer: PCAReducer):
+        """
+        Args:
+            service: Исходный сервис эмбеддингов
+            reducer: Обученная проекция
+        """
+        if service.dimension != reducer.input_dimension:
+            raise ValueError(
+                f"Проекция обучена на размерности {reducer.input_dimension}, "
+                f"а сервис возвращает {service.dimension}"
+            )
+
+        self.service = service
+        self.reducer = reducer
+        self.model_name = service.model_name
+
+    def create_embedding(self, text: str) -> list[float]:
+        return self.encode_array([text])[0].tolist()
+
+    def create_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return self._encode_cached(texts).tolist()
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        return self.reducer.transform(self.service._encode_cached(texts))
+
+    def close(self):
+        self.service.close()
+
+    @property
+    def dimension(self) -> int | None:
+        return self.reducer.dimension
+
+    @property
+    def cache_name(self) -> str:
+        return f"{self.service.cache_name}-pca-{self.reducer.fingerprint}"
+
+    @property
+    def provides_tokenizer(self) -> bool:
+        return self.service.provides_tokenizer
+
+    @property
+    def tokenizer(self):
+        return self.service.tokenizer
+
+    @property
+    def max_tokens(self) -> int | None:
+        return self.service.max_tokens
+
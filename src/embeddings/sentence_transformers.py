@@ -1,44 +1,161 @@
-from sentence_transformers import SentenceTransformer
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+import time
 
+import numpy as np
+
+from .batching import encode_by_token_budget, plan_batches
 from .service import BaseEmbeddingService
 from src.config import EmbeddingModelsType
 
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
 class SentenceTransformersEmbeddingService(BaseEmbeddingService):
-    """Сервис эмбеддингов Sentence Transformers."""
+    """
+    Сервис эмбеддингов Sentence Transformers.
+    Модель (и torch) загружается при первом обращении к ней, а не при создании сервиса.
+    """
 
     model_name: str
+    # Размерность эмбеддингов модели, если известна заранее (None — узнается после загрузки модели)
+    DIMENSION: Optional[int] = None
+    # Бюджет батча в токенах с учетом паддинга (число текстов x длина самого длинного из них).
+    # None — фиксированные батчи по BATCH_SIZE текстов
+    TOKENS_PER_BATCH: Optional[int] = 16384
+    # Размер батча в фиксированном режиме
+    BATCH_SIZE = 32
+    # Верхняя граница числа текстов в батче в режиме бюджета токенов
+    MAX_BATCH_SIZE = 512
+    # Скорость последнего кодирования (текстов в секунду)
+    texts_per_second: Optional[float] = None
+
+    _model: Optional["SentenceTransformer"] = None
+    _dimension: Optional[int] = None
 
     def __init__(self, model_name: str):
         self._logger_info(f"Инициализация SentenceTransformersEmbeddingService для модели {model_name}")  
 
         self.model_name = model_name
 
-        cache_folder = str(Path(self.cache_folder, self.model_name))
-        self.model = SentenceTransformer(self.model_name, cache_folder=cache_folder)
-        self._dimension = self.model.get_sentence_embedding_dimension()
-        self._logger_info(f"Модель инициализирована. Размерность эмбеддингов: {self._dimension}")
+    @property
+    def model(self) -> "SentenceTransformer":
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+
+            self._logger_info(f"Загрузка модели {self.model_name}...")
+            cache_folder = str(Path(self.cache_folder, self.model_name))
+            self._model = SentenceTransformer(self.model_name, cache_folder=cache_folder)
+            self._dimension = self._model.get_sentence_embedding_dimension()
+            self._logger_info(f"Модель инициализирована. Размерность эмбеддингов: {self._dimension}")
+        return self._model
+
+    @model.setter
+    def model(self, model: "SentenceTransformer"):
+        self._model = model
 
     def create_embedding(self, text: str) -> list[float]:
         try:
-            return self.model.encode(text).tolist()
+            return self.encode_array([text])[0].tolist()
         except Exception as e:
             self._logger_error(f"Ошибка при создании эмбеддинга для текста {text}: {e}")
             raise
 
     def create_embeddings(self, texts: list[str]) -> list[list[float]]:
-        return [self.create_embedding(text) for text in texts]
+        return self._encode_cached(texts).tolist()
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        # Пустой вход не доходит до модели: в фиксированном режиме она вернула бы массив без второй оси
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+
+        started_at = time.perf_counter()
+
+        try:
+            if self.TOKENS_PER_BATCH:
+                embeddings = self._encode_bucketed(texts)
+            else:
+                embeddings = self.model.encode(
+                    texts,
+                    batch_size=self.BATCH_SIZE,
+                    show_progress_bar=True,
+                    convert_to_numpy=True,
+                    normalize_embeddings=self.normalize_embeddings,
+                )
+        except Exception as e:
+            slice_texts = str([text[:10] for text in texts])
+            self._logger_error(f"Ошибка при создании эмбеддингов для текстов {slice_texts}: {str(e)}")
+            raise
+
+        elapsed = time.perf_counter() - started_at
+        self.texts_per_second = len(texts) / elapsed if elapsed > 0 else float("inf")
+        self._logger_info(f"Закодировано текстов: {len(texts)} за {elapsed:.2f} с ({self.texts_per_second:.1f} текстов/с)")
+        return embeddings
+
+    def _encode_bucketed(self, texts: list[str]) -> np.ndarray:
+        """
+        Кодирует тексты батчами, сгруппированными по длине в токенах: тексты сортируются
+        по длине, батч набирается, пока не исчерпан бюджет TOKENS_PER_BATCH с учетом паддинга.
+        Результат возвращается в исходном порядке текстов.
+
+        Args:
+            texts: список текстов
+
+        Returns:
+            np.ndarray: матрица float32 размером len(texts) x dimension
+        """
+        return encode_by_token_budget(
+            texts,
+            self._encode_batch,
+            self.model.tokenizer,
+            self.model.max_seq_length,
+            self.dimension,
+            self.TOKENS_PER_BATCH,
+            self.MAX_BATCH_SIZE,
+        )
+
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        """Кодирует один батч текстов близкой длины."""
+        return self.model.encode(
+            texts,
+            batch_size=len(texts),
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=self.normalize_embeddings,
+        )
+
+    # Разбиение на батчи по бюджету токенов (общее с другими сервисами)
+    plan_batches = staticmethod(plan_batches)
 
     @property
     def dimension(self) -> int | None:
+        if self._dimension is None:
+            if self.DIMENSION is not None:
+                return self.DIMENSION
+            self.model  # Размерность известна только после загрузки модели
         return self._dimension
+
+    @property
+    def provides_tokenizer(self) -> bool:
+        return True
+
+    @property
+    def tokenizer(self):
+        return self.model.tokenizer
+
+    @property
+    def max_tokens(self) -> int | None:
+        # Окно модели включает служебные токены ([CLS], [SEP]), которые добавляются при кодировании
+        return self.model.max_seq_length - self.model.tokenizer.num_special_tokens_to_add(pair=False)
     
 
 class AllMiniLMService(SentenceTransformersEmbeddingService):
     """Сервис эмбеддингов для модели All-MiniLM-L6-v2."""
 
     MODEL_NAME: str = EmbeddingModelsType.ALL_MINI_LM_L6_V2.value
-    BATCH_SIZE = 64
+    DIMENSION = 384
+    BATCH_SIZE = 64  # Увеличенный batch_size для этой легкой модели (фиксированный режим)
+    normalize_embeddings = True  # Нормализация для лучшего сравнения
 
     def __init__(self):
         """Инициализация с предопределенной моделью."""
@@ -55,18 +172,7 @@ class AllMiniLMService(SentenceTransformersEmbeddingService):
         Returns:
             list[list[float]]: список векторных представлений
         """
-        try:
-            return self.model.encode(
-                texts,                       # Тексты для эмбеддинга
-                batch_size=self.BATCH_SIZE,  # Увеличенный batch_size для этой легкой модели
-                show_progress_bar=True,      # Показывает прогресс бар
-                convert_to_tensor=True,      # Ускоряет обработку
-                normalize_embeddings=True    # Нормализация для лучшего сравнения
-            ).tolist()
-        except Exception as e:
-            slice_texts = str([text[:10] for text in texts])
-            self._logger_error(f"Ошибка при создании эмбеддингов для текстов {slice_texts}: {str(e)}")
-            raise
+        return self._encode_cached(texts).tolist()
 
 
 
@@ -4,6 +4,10 @@ from abc import (
 )
 from typing import Optional
 
+import numpy as np
+
+from .cache import EmbeddingCache
+from ..documents.batch import ChunkBatch
 from ..logger import LoggerService
 
 class BaseEmbeddingService(ABC, LoggerService):
@@ -11,6 +15,10 @@ class BaseEmbeddingService(ABC, LoggerService):
 
     cache_folder: str = "./.cache"
     model_name: Optional[str] = None
+    # Нормализует ли сервис эмбеддинги (часть ключа кэша эмбеддингов)
+    normalize_embeddings: bool = False
+    # Кэш эмбеддингов (None — отключен)
+    embedding_cache: Optional[EmbeddingCache] = None
 
     @abstractmethod
     def create_embedding(self, text: str) -> list[float]:
@@ -39,8 +47,122 @@ class BaseEmbeddingService(ABC, LoggerService):
         """
         pass
 
+    def embed_batch(self, batch: ChunkBatch) -> ChunkBatch:
+        """
+        Создает эмбеддинги для пачки чанков одной матрицей float32, без построчных списков.
+
+        Args:
+            batch: Пачка чанков
+
+        Returns:
+            Пачка с эмбеддингами
+        """
+        return batch.with_embeddings(self.encode_array(batch.texts))
+
+    def encode_array(self, texts: list[str]) -> np.ndarray:
+        """
+        Создает эмбеддинги для списка текстов в виде одной матрицы, без списков Python float.
+
+        Args:
+            texts: список текстов
+
+        Returns:
+            np.ndarray: непрерывная матрица float32 размером len(texts) x dimension
+        """
+        if not texts:
+            return np.empty((0, self.dimension or 0), dtype=np.float32)
+        return np.ascontiguousarray(self._encode_cached(texts), dtype=np.float32)
+
+    def enable_cache(self, cache_dir: str, max_memory_items: int = 100_000) -> EmbeddingCache:
+        """
+        Включает кэш эмбеддингов: повторно встреченные тексты не отправляются в модель.
+
+        Args:
+            cache_dir: Директория кэша
+            max_memory_items: Максимальное количество векторов в LRU-кэше в памяти
+
+        Returns:
+            Кэш эмбеддингов
+        """
+        self.embedding_cache = EmbeddingCache(
+            cache_dir,
+            model_name=self.cache_name,
+            normalize=self.normalize_embeddings,
+            dimension=self.dimension,
+            max_memory_items=max_memory_items,
+        )
+        self._logger_info(
+            f"Кэш эмбеддингов: {str(self.embedding_cache.store_dir)}, "
+            f"векторов на диске: {len(self.embedding_cache)}"
+        )
+        return self.embedding_cache
+
+    def close(self):
+        """Освобождает ресурсы сервиса (процессы, сессии). По умолчанию ничего не делает."""
+        pass
+
+    @property
+    def cache_name(self) -> str:
+        """Имя модели в ключе кэша эмбеддингов: сервисы с разными векторами не должны его делить."""
+        return self.model_name or self.__class__.__name__
+
+    def _encode_cached(self, texts: list[str]) -> np.ndarray:
+        """
+        Кодирует тексты с учетом кэша: в модель одним вызовом уходят только промахи,
+        одинаковые тексты кодируются один раз.
+
+        Args:
+            texts: список текстов
+
+        Returns:
+            np.ndarray: матрица float32 размером len(texts) x dimension
+        """
+        cache = self.embedding_cache
+        if cache is None:
+            return self._encode(texts)
+
+        embeddings, missing = cache.get_many(texts)
+        if missing:
+            # Уникальные тексты промахов в порядке первого появления
+            unique = list(dict.fromkeys(texts[idx] for idx in missing))
+            encoded = self._encode(unique)
+            cache.put_many(unique, encoded)
+
+            rows = {text: row for row, text in enumerate(unique)}
+            embeddings[missing] = encoded[[rows[texts[idx]] for idx in missing]]
+
+        return embeddings
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        """
+        Кодирует тексты в матрицу эмбеддингов. По умолчанию — через create_embeddings,
+        сервисы, которые умеют возвращать массив, переопределяют метод.
+
+        Args:
+            texts: список текстов
+
+        Returns:
+            np.ndarray: матрица float32 размером len(texts) x dimension
+        """
+        return np.asarray(self.create_embeddings(texts), dtype=np.float32)
+
     @property
     @abstractmethod
     def dimension(self) -> int | None:
         """Возвращает размерность эмбеддингов."""
         pass
+
+    @property
+    def provides_tokenizer(self) -> bool:
+        """Предоставляет ли модель токенизатор. В отличие от tokenizer, не загружает модель."""
+        return False
+
+    @property
+    def tokenizer(self):
+        """Возвращает быстрый токенизатор модели (None, если модель его не предоставляет)."""
+        return None
+
+    @property
+    def max_tokens(self) -> int | None:
+        """Возвращает максимальную длину текста в токенах (без служебных), которую модель не обрезает."""
+        return None
@@ -0,0 +1,158 @@
+import threading
+import unittest
+
+import numpy as np
+
+from src.documents import ChunkBatch
+from src.embeddings import BaseEmbeddingService, EmbeddingAccumulator
+
+
+class CountingEmbeddingService(BaseEmbeddingService):
+    """Сервис эмбеддингов для тестов, который считает вызовы модели."""
+
+    def __init__(self):
+        self.calls: list[int] = []
+
+    def create_embedding(self, text: str) -> list[float]:
+        return [float(len(text)), 1.0]
+
+    def create_embeddings(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(len(texts))
+        return [self.create_embedding(text) for text in texts]
+
+    @property
+    def dimension(self) -> int | None:
+        return 2
+
+
+def make_batch(name: str, size: int) -> ChunkBatch:
+    return ChunkBatch(
+        ids=[f"{name}-{idx}" for idx in range(size)],
+        texts=[f"{name} {'x' * idx}" for idx in range(size)],
+        metadatas=[{"source": name, "chunk_index": idx} for idx in range(size)],
+    )
+
+
+class TestEmbeddingAccumulator(unittest.TestCase):
+
+    def setUp(self):
+        self.service = CountingEmbeddingService()
+        self.written: list[ChunkBatch] = []
+        self.accumulator = EmbeddingAccumulator(self.service, self.written.append, batch_size=10, flush_timeout=None)
+
+    def test_accumulates_across_documents(self):
+        """Тест: чанки нескольких документов кодируются одним вызовом и записываются одной вставкой."""
+        parts: dict[str, ChunkBatch] = {}
+        for name, size in [("a", 3), ("b", 4), ("c", 5)]:
+            self.accumulator.add(make_batch(name, size), on_written=lambda part, name=name: parts.__setitem__(name, part))
+        self.accumulator.wait()
+
+        self.assertEqual(self.service.calls, [12])
+        self.assertEqual(len(self.written), 1)
+        self.assertEqual(len(self.accumulator), 0)
+
+        # Каждый документ получает свою часть с эмбеддингами
+        for name, size in [("a", 3), ("b", 4), ("c", 5)]:
+            self.assertEqual(parts[name].ids, make_batch(name, size).ids)
+            np.testing.assert_array_equal(parts[name].embeddings[:, 0], [len(text) for text in parts[name].texts])
+
+    def test_after_write_waits_for_pending_chunks(self):
+        """Тест: действие после записи выполняется только после записи добавленных ранее чанков."""
+        done: list[str] = []
+
+        self.accumulator.add(make_batch("a", 3))
+        self.accumulator.after_write(lambda: done.append("a"))
+        self.assertEqual(done, [])
+
+        self.accumulator.flush()
+        self.assertEqual(done, ["a"])
+        self.assertEqual(self.written[0].ids, make_batch("a", 3).ids)
+
+        # Очередь пуста — действие выполняется сразу
+        self.accumulator.after_write(lambda: done.append("b"))
+        self.assertEqual(done, ["a", "b"])
+
+    def test_flush_timeout(self):
+        """Тест: по истечении flush_timeout чанки записываются, не дожидаясь batch_size."""
+        self.accumulator.flush_timeout = 0.0
+
+        self.accumulator.add(make_batch("a", 2))
+
+        self.assertEqual(self.service.calls, [2])
+        self.assertEqual(self.accumulator.flushes, 1)
+
+    def test_encodes_next_batch_while_writing(self):
+        """Тест: следующая пачка кодируется, пока пишется предыдущая; действия после записи ждут ее окончания."""
+        release = threading.Event()
+        written: list[ChunkBatch] = []
+        # Сколько пачек было записано к моменту каждого вызова модели
+        written_at_encode: list[int] = []
+
+        def slow_write(batch: ChunkBatch):
+            self.assertTrue(release.wait(timeout=5))
+            written.append(batch)
+
+        def encode(texts: list[str]) -> list[list[float]]:
+            written_at_encode.append(len(written))
+            if len(written_at_encode) == 2:
+                # Запись первой пачки ждет, пока закодируется вторая
+                release.set()
+            return [self.service.create_embedding(text) for text in texts]
+
+        self.service.create_embeddings = encode
+        accumulator = EmbeddingAccumulator(self.service, slow_write, batch_size=3, flush_timeout=None)
+        done: list[str] = []
+        try:
+            accumulator.add(make_batch("a", 3))
+            accumulator.after_write(lambda: done.append("a"))
+            self.assertEqual(done, [])
+
+            accumulator.add(make_batch("b", 1))
+            accumulator.add(make_batch("c", 2), on_written=lambda part: done.append("c"))
+            accumulator.flush()
+        finally:
+            release.set()
+            accumulator.close()
+
+        self.assertEqual(written_at_encode, [0, 0])
+        self.assertEqual(
+            [batch.ids for batch in written],
+            [make_batch("a", 3).ids, make_batch("b", 1).ids + make_batch("c", 2).ids],
+        )
+        self.assertEqual(done, ["a", "c"])
+
+    def test_submit_runs_between_writes(self):
+        """Тест: действие из submit выполняется в потоке записи после отправленной записи и до следующей."""
+        events: list[str] = []
+        accumulator = EmbeddingAccumulator(
+            self.service, lambda batch: events.append(batch.ids[0]), batch_size=2, flush_timeout=None
+        )
+        try:
+            accumulator.add(make_batch("a", 2))
+            accumulator.submit(lambda: events.append("delete"))
+            accumulator.add(make_batch("b", 2))
+            accumulator.flush()
+        finally:
+            accumulator.close()
+
+        self.assertEqual(events, ["a-0", "delete", "b-0"])
+
+    def test_failed_write(self):
+        """Тест: ошибка записи пробрасывается, действия после упавшей записи не выполняются."""
+        def failing_write(batch: ChunkBatch):
+            raise RuntimeError("хранилище недоступно")
+
+        accumulator = EmbeddingAccumulator(self.service, failing_write, batch_size=2, flush_timeout=None)
+        done: list[str] = []
+        try:
+            accumulator.add(make_batch("a", 2), on_written=lambda part: done.append("a"))
+            with self.assertRaises(RuntimeError):
+                accumulator.flush()
+        finally:
+            accumulator.close()
+
+        self.assertEqual(done, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.embeddings import BaseEmbeddingService, EmbeddingCache
+
+
+class CountingEmbeddingService(BaseEmbeddingService):
+    """Сервис эмбеддингов для тестов: запоминает тексты, отправленные в модель."""
+
+    model_name = "counting-model"
+
+    def __init__(self):
+        self.encoded: list[list[str]] = []
+
+    def create_embedding(self, text: str) -> list[float]:
+        return [float(len(text)), float(text.count(" ")), float(sum(map(ord, text)) % 97)]
+
+    def create_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return self._encode_cached(texts).tolist()
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        self.encoded.append(list(texts))
+        return np.array([self.create_embedding(text) for text in texts], dtype=np.float32)
+
+    @property
+    def dimension(self) -> int | None:
+        return 3
+
+
+class TestEmbeddingCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_only_misses_are_encoded(self):
+        """Тест: в модель одним вызовом уходят только тексты, которых нет в кэше."""
+        service = CountingEmbeddingService()
+        service.enable_cache(self.tmp_dir.name)
+
+        first = service.create_embeddings(["альфа", "бета"])
+        second = service.create_embeddings(["бета", "гамма", "альфа", "гамма"])
+
+        self.assertEqual(service.encoded, [["альфа", "бета"], ["гамма"]])
+        self.assertEqual(second, [first[1], service.create_embedding("гамма"), first[0], service.create_embedding("гамма")])
+        stats = service.embedding_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 4))
+
+    def test_persists_between_runs(self):
+        """Тест: векторы читаются с диска новым экземпляром кэша, ключ учитывает модель и нормализацию."""
+        texts = [f"Чанк номер {idx}" for idx in range(3000)]
+        service = CountingEmbeddingService()
+        service.enable_cache(self.tmp_dir.name)
+        expected = service.create_embeddings(texts)
+
+        restarted = CountingEmbeddingService()
+        restarted.enable_cache(self.tmp_dir.name, max_memory_items=10)
+        self.assertEqual(restarted.create_embeddings(texts), expected)
+        self.assertEqual(restarted.encoded, [])
+        self.assertEqual(restarted.embedding_cache.stats()["evictions"], len(texts) - 10)
+
+        normalized = CountingEmbeddingService()
+        normalized.normalize_embeddings = True
+        normalized.enable_cache(self.tmp_dir.name)
+        normalized.create_embeddings(texts[:5])
+        self.assertEqual(normalized.encoded, [texts[:5]])
+
+    def test_truncated_key_file_is_recovered(self):
+        """Тест: недописанный ключ (прерванная запись) отбрасывается при открытии кэша."""
+        cache = EmbeddingCache(self.tmp_dir.name, "model", False, 3)
+        cache.put_many(["a", "b"], np.eye(3, dtype=np.float32)[:2])
+        with cache._keys_path.open("ab") as file:
+            file.write(b"\x00" * 5)
+
+        reopened = EmbeddingCache(self.tmp_dir.name, "model", False, 3)
+        vectors, missing = reopened.get_many(["b", "c"])
+
+        self.assertEqual(len(reopened), 2)
+        self.assertEqual(missing, [1])
+        np.testing.assert_array_equal(vectors[0], [0, 1, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import asyncio
+import unittest
+
+import numpy as np
+
+from src.embeddings import BaseEmbeddingService, EmbeddingMicroBatcher
+
+
+class RecordingEmbeddingService(BaseEmbeddingService):
+    """Сервис эмбеддингов для тестов, который запоминает размеры батчей."""
+
+    def __init__(self):
+        self.calls: list[int] = []
+
+    def create_embedding(self, text: str) -> list[float]:
+        if text == "ошибка":
+            raise ValueError(text)
+        return [float(len(text)), 2.0]
+
+    def create_embeddings(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(len(texts))
+        return [self.create_embedding(text) for text in texts]
+
+    @property
+    def dimension(self) -> int | None:
+        return 2
+
+
+class TestEmbeddingMicroBatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.service = RecordingEmbeddingService()
+
+    def run_queries(self, batcher: EmbeddingMicroBatcher, texts: list[str]) -> list:
+        async def main():
+            try:
+                return await asyncio.gather(*(batcher.embed(text) for text in texts), return_exceptions=True)
+            finally:
+                await batcher.close()
+        return asyncio.run(main())
+
+    def test_concurrent_queries_share_batches(self):
+        """Тест: одновременные запросы кодируются батчами не больше max_batch_size."""
+        batcher = EmbeddingMicroBatcher(self.service, max_batch_size=8, max_wait_ms=50)
+        texts = ["а" * idx for idx in range(1, 21)]
+
+        results = self.run_queries(batcher, texts)
+
+        self.assertEqual(self.service.calls, [8, 8, 4])
+        np.testing.assert_array_equal([result[0] for result in results], [len(text) for text in texts])
+        self.assertEqual(batcher.stats(), {"batches": 3, "items": 20, "mean_batch_size": 20 / 3, "max_batch_size": 8})
+
+    def test_partial_batch_flushed_by_timeout(self):
+        """Тест: неполный батч кодируется по истечении max_wait_ms."""
+        batcher = EmbeddingMicroBatcher(self.service, max_batch_size=64, max_wait_ms=1)
+
+        async def main():
+            first = await batcher.embed("один")
+            second = await batcher.embed_many(["два", "три"])
+            await batcher.close()
+            return first, second
+
+        first, second = asyncio.run(main())
+
+        self.assertEqual(self.service.calls, [1, 2])
+        self.assertEqual(first[0], 4.0)
+        self.assertEqual(second.shape, (2, 2))
+
+    def test_error_resolves_all_callers(self):
+        """Тест: ошибка модели передается каждому запросу батча."""
+        batcher = EmbeddingMicroBatcher(self.service, max_batch_size=3, max_wait_ms=50)
+
+        results = self.run_queries(batcher, ["ок", "ошибка", "еще"])
+
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
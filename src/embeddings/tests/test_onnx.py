@@ -0,0 +1,86 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from sentence_transformers import SentenceTransformer, models
+from tokenizers import BertWordPieceTokenizer
+from transformers import BertConfig, BertModel, BertTokenizerFast
+
+from src.embeddings.onnx import OnnxEmbeddingService, export_onnx
+
+
+def build_tiny_model(directory: Path) -> SentenceTransformer:
+    """Создает маленькую случайную BERT-модель Sentence Transformers без загрузки из сети."""
+    with open('src/documents/tests/test_chunker_split_text.txt', 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    word_piece = BertWordPieceTokenizer()
+    word_piece.train_from_iterator([text], vocab_size=500)
+    word_piece.save_model(str(directory))
+    tokenizer = BertTokenizerFast(vocab_file=str(directory / "vocab.txt"))
+    tokenizer.save_pretrained(str(directory))
+
+    config = BertConfig(
+        vocab_size=tokenizer.vocab_size,
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=128,
+    )
+    BertModel(config).save_pretrained(str(directory))
+
+    transformer = models.Transformer(str(directory), max_seq_length=64)
+    pooling = models.Pooling(transformer.get_word_embedding_dimension(), "mean")
+    return SentenceTransformer(modules=[transformer, pooling, models.Normalize()], device="cpu")
+
+
+class TestOnnxEmbeddingService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        root = Path(cls.tmp_dir.name)
+        (root / "hf").mkdir()
+        cls.model = build_tiny_model(root / "hf")
+        export_onnx(cls.model, root / "tiny" / "onnx")
+
+        with open('src/documents/tests/test_chunker_split_text.txt', 'r', encoding='utf-8') as f:
+            cls.texts = [line for line in f.read().splitlines() if line.strip()][:40]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def cosine_with_torch(self, service: OnnxEmbeddingService) -> np.ndarray:
+        expected = self.model.encode(self.texts, convert_to_numpy=True, normalize_embeddings=True)
+        actual = service.encode_array(self.texts)
+        return (expected * actual).sum(axis=1) / np.linalg.norm(actual, axis=1)
+
+    def test_parity_with_torch(self):
+        """Тест: эмбеддинги ONNX совпадают с эмбеддингами PyTorch."""
+        service = OnnxEmbeddingService("tiny", cache_folder=self.tmp_dir.name)
+
+        self.assertEqual(service.dimension, 32)
+        self.assertGreater(self.cosine_with_torch(service).min(), 0.9999)
+        self.assertGreater(service.texts_per_second, 0)
+
+    def test_empty_input(self):
+        """Тест: пустой список текстов без кэша эмбеддингов дает пустую матрицу."""
+        service = OnnxEmbeddingService("tiny", cache_folder=self.tmp_dir.name)
+
+        self.assertEqual(service.create_embeddings([]), [])
+        self.assertEqual(service._encode([]).shape, (0, 32))
+
+    def test_int8_parity_with_torch(self):
+        """Тест: квантизованная модель создается при первом запуске и близка к исходной."""
+        service = OnnxEmbeddingService("tiny", quantize=True, num_threads=1, cache_folder=self.tmp_dir.name)
+
+        self.assertTrue((service.onnx_dir / "model_int8.onnx").exists())
+        self.assertGreater(self.cosine_with_torch(service).mean(), 0.95)
+        self.assertEqual(service.cache_name, "tiny-int8")
+
+
+if __name__ == '__main__':
+    unittest.main()
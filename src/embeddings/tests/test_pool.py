@@ -0,0 +1,73 @@
+import os
+import unittest
+
+import numpy as np
+
+from src.embeddings import BaseEmbeddingService, ProcessPoolEmbeddingService
+
+
+class PidEmbeddingService(BaseEmbeddingService):
+    """
+    Сервис эмбеддингов для тестов: третья координата — PID процесса, который кодировал текст,
+    последняя — число потоков, с которым сервис создан (0 — не задано).
+    """
+
+    def __init__(self, num_threads: int = 0):
+        self.num_threads = num_threads
+
+    def create_embedding(self, text: str) -> list[float]:
+        return [float(len(text)), float(text.count("а")), float(os.getpid()), float(self.num_threads)]
+
+    def create_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return [self.create_embedding(text) for text in texts]
+
+    @property
+    def dimension(self) -> int | None:
+        return 4
+
+
+class TestProcessPoolEmbeddingService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.service = ProcessPoolEmbeddingService(
+            PidEmbeddingService(),
+            PidEmbeddingService,
+            workers=2,
+            threads_per_worker=3,
+        )
+        cls.service.SHARD_SIZE = 16
+        cls.texts = [f"текст {'а' * (idx % 7)} номер {idx}" for idx in range(200)]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.close()
+
+    def test_results_in_input_order(self):
+        """Тест: эмбеддинги из рабочих процессов возвращаются в порядке текстов."""
+        embeddings = self.service.encode_array(self.texts)
+        expected = np.asarray(PidEmbeddingService().create_embeddings(self.texts), dtype=np.float32)
+
+        self.assertEqual(embeddings.shape, (200, 4))
+        np.testing.assert_array_equal(embeddings[:, :2], expected[:, :2])
+        self.assertNotIn(float(os.getpid()), set(embeddings[:, 2]))
+        # Сервис рабочего процесса создан с threads_per_worker потоков
+        self.assertEqual(set(embeddings[:, 3]), {3.0})
+
+    def test_workers_are_reused(self):
+        """Тест: повторные вызовы используют те же процессы, их не больше workers."""
+        first = set(self.service.encode_array(self.texts)[:, 2])
+        second = set(self.service.encode_array(self.texts[::-1])[:, 2])
+
+        self.assertLessEqual(len(first | second), 2)
+
+    def test_small_input_encoded_locally(self):
+        """Тест: одна часть текстов кодируется в основном процессе."""
+        embeddings = self.service.encode_array(self.texts[:3])
+
+        self.assertEqual(set(embeddings[:, 2]), {float(os.getpid())})
+        self.assertEqual(self.service.dimension, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
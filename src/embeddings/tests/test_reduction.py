@@ -0,0 +1,88 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.embeddings import BaseEmbeddingService, PCAReducer, ReducedEmbeddingService, recall_at_k
+
+
+def make_embeddings(n: int, seed: int = 0) -> np.ndarray:
+    """Нормализованные эмбеддинги размерности 32, почти вся дисперсия которых лежит в 6 направлениях."""
+    rng = np.random.default_rng(seed)
+    basis = np.linalg.qr(rng.normal(size=(32, 32)))[0][:, :6]
+    embeddings = rng.normal(size=(n, 6)) @ basis.T + 0.01 * rng.normal(size=(n, 32))
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+class ArrayEmbeddingService(BaseEmbeddingService):
+    """Сервис эмбеддингов для тестов: эмбеддинг текста — строка заранее заданной матрицы."""
+
+    def __init__(self, embeddings: np.ndarray):
+        self.embeddings = embeddings
+        self.model_name = "array"
+
+    def create_embedding(self, text: str) -> list[float]:
+        return self.embeddings[int(text)].tolist()
+
+    def create_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return [self.create_embedding(text) for text in texts]
+
+    @property
+    def dimension(self) -> int | None:
+        return self.embeddings.shape[1]
+
+
+class TestPCAReducer(unittest.TestCase):
+
+    def setUp(self):
+        self.corpus = make_embeddings(300)
+        self.queries = make_embeddings(20, seed=1)
+
+    def test_recall_of_reduced_vectors(self):
+        """Тест: проекция на размерность данных сохраняет соседей, слишком малая — теряет."""
+        reducer = PCAReducer.fit(self.corpus, 8)
+        low = PCAReducer.fit(self.corpus, 2)
+
+        full_recall = recall_at_k(self.corpus, self.queries, self.corpus, self.queries, k=10)
+        recall = recall_at_k(self.corpus, self.queries, reducer.transform(self.corpus), reducer.transform(self.queries), k=10)
+        low_recall = recall_at_k(self.corpus, self.queries, low.transform(self.corpus), low.transform(self.queries), k=10)
+
+        self.assertEqual(full_recall, 1.0)
+        self.assertGreater(recall, 0.9)
+        self.assertLess(low_recall, recall)
+        self.assertGreater(float(reducer.explained_variance_ratio.sum()), 0.99)
+
+    def test_save_and_load(self):
+        """Тест: сохраненная проекция дает те же векторы."""
+        reducer = PCAReducer.fit(self.corpus, 8)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir, "pca.npz")
+            reducer.save(path)
+            loaded = PCAReducer.load(path)
+
+        np.testing.assert_array_equal(loaded.transform(self.queries), reducer.transform(self.queries))
+        self.assertEqual(loaded.fingerprint, reducer.fingerprint)
+
+    def test_reduced_service(self):
+        """Тест: сервис с проекцией сокращает эмбеддинги и чанков, и запросов."""
+        service = ArrayEmbeddingService(self.corpus)
+        reducer = PCAReducer.fit(self.corpus, 8)
+        reduced = ReducedEmbeddingService(service, reducer)
+
+        embeddings = reduced.encode_array(["0", "1", "2"])
+        query = reduced.create_embedding("1")
+
+        self.assertEqual(reduced.dimension, 8)
+        self.assertEqual(embeddings.shape, (3, 8))
+        np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1.0, rtol=1e-5)
+        np.testing.assert_allclose(query, embeddings[1], rtol=1e-5)
+        self.assertTrue(reduced.cache_name.startswith("array-pca-"))
+
+        with self.assertRaises(ValueError):
+            ReducedEmbeddingService(service, PCAReducer.fit(self.corpus[:, :16], 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
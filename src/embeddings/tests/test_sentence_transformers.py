@@ -0,0 +1,83 @@
+import random
+import unittest
+
+import numpy as np
+
+from src.embeddings.batching import token_lengths
+from src.embeddings.sentence_transformers import SentenceTransformersEmbeddingService
+
+
+class FakeModel:
+    """Модель для тестов: токен — слово, эмбеддинг — длина текста в символах и в токенах."""
+
+    max_seq_length = 32
+
+    def __init__(self):
+        self.batches: list[list[str]] = []
+
+    def tokenizer(self, texts, add_special_tokens=True, truncation=False, max_length=None):
+        lengths = [len(text.split()) + (2 if add_special_tokens else 0) for text in texts]
+        if truncation:
+            lengths = [min(length, max_length) for length in lengths]
+        return {"input_ids": [[0] * length for length in lengths]}
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        self.batches.append(list(texts))
+        return np.array([[len(text), len(text.split())] for text in texts], dtype=np.float32)
+
+
+class TestBucketedEncoding(unittest.TestCase):
+
+    def setUp(self):
+        # Сервис без загрузки модели
+        self.service = SentenceTransformersEmbeddingService.__new__(SentenceTransformersEmbeddingService)
+        self.service.model_name = "fake"
+        self.service.model = FakeModel()
+        self.service._dimension = 2
+
+        rng = random.Random(3)
+        self.texts = [" ".join("слово" for _ in range(rng.randint(1, 60))) + f" {idx}" for idx in range(300)]
+
+    def test_bucketed_encoding_restores_order(self):
+        """Тест: эмбеддинги возвращаются в исходном порядке текстов."""
+        self.service.TOKENS_PER_BATCH = 256
+        embeddings = self.service.encode_array(self.texts)
+
+        np.testing.assert_array_equal(embeddings[:, 0], [len(text) for text in self.texts])
+        self.assertGreater(self.service.texts_per_second, 0)
+
+    def test_batches_respect_token_budget(self):
+        """Тест: батчи собраны из текстов близкой длины и не превышают бюджет токенов с паддингом."""
+        self.service.TOKENS_PER_BATCH = 256
+        self.service.encode_array(self.texts)
+
+        batches = self.service.model.batches
+        self.assertEqual(sorted(text for batch in batches for text in batch), sorted(self.texts))
+        for batch in batches:
+            lengths = token_lengths(self.service.model.tokenizer, batch, FakeModel.max_seq_length)
+            self.assertLessEqual(len(batch) * lengths.max(), 256)
+
+        # От длинных к коротким
+        tokenizer = self.service.model.tokenizer
+        longest = [token_lengths(tokenizer, batch, FakeModel.max_seq_length).max() for batch in batches]
+        self.assertEqual(longest, sorted(longest, reverse=True))
+
+    def test_empty_input(self):
+        """Тест: пустой список текстов без кэша эмбеддингов дает пустую матрицу, модель не вызывается."""
+        for tokens_per_batch in (256, None):
+            self.service.TOKENS_PER_BATCH = tokens_per_batch
+
+            self.assertEqual(self.service.create_embeddings([]), [])
+            self.assertEqual(self.service._encode([]).shape, (0, 2))
+
+        self.assertEqual(self.service.model.batches, [])
+
+    def test_plan_batches_limits(self):
+        """Тест ограничения числа текстов в батче и батча из одного слишком длинного текста."""
+        batches = SentenceTransformersEmbeddingService.plan_batches(np.array([1000, 2, 2, 2, 2, 2]), 100, 3)
+
+        self.assertEqual([batch.tolist() for batch in batches], [[0], [1, 2, 3], [4, 5]])
+
+
+if __name__ == '__main__':
+    unittest.main()
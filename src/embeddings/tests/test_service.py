@@ -0,0 +1,61 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.embeddings import BaseEmbeddingService
+from src.documents import DocumentChunk
+from src.utils import save_embeddings_results
+
+
+class ListEmbeddingService(BaseEmbeddingService):
+    """Сервис эмбеддингов для тестов, который умеет возвращать только списки."""
+
+    def create_embedding(self, text: str) -> list[float]:
+        return [float(len(text)), -1.0, 0.5, float(text.count("а"))]
+
+    def create_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return [self.create_embedding(text) for text in texts]
+
+    @property
+    def dimension(self) -> int | None:
+        return 4
+
+
+class TestEncodeArray(unittest.TestCase):
+
+    def test_encode_array_is_contiguous_float32(self):
+        """Тест: encode_array возвращает непрерывную матрицу float32 в порядке текстов."""
+        service = ListEmbeddingService()
+        texts = ["мама", "рама", "а"]
+
+        embeddings = service.encode_array(texts)
+
+        self.assertEqual(embeddings.dtype, np.float32)
+        self.assertTrue(embeddings.flags["C_CONTIGUOUS"])
+        np.testing.assert_array_equal(embeddings, service.create_embeddings(texts))
+        self.assertEqual(service.encode_array([]).shape, (0, 4))
+
+    def test_save_embeddings_results_accepts_array(self):
+        """Тест: отчет по матрице совпадает с отчетом по спискам."""
+        service = ListEmbeddingService()
+        texts = ["первый чанк", "второй чанк подлиннее"]
+        chunks = [
+            DocumentChunk(content=text, metadata={"filename": "a.txt"}, doc_id="a", chunk_id=f"a-{idx}", chunk_index=idx)
+            for idx, text in enumerate(texts)
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            from_array = save_embeddings_results(chunks, service.encode_array(texts), str(Path(tmp_dir, "array.txt")))
+            from_lists = save_embeddings_results(chunks, service.create_embeddings(texts), str(Path(tmp_dir, "lists.txt")))
+
+            array_report = Path(from_array).read_text(encoding="utf-8").replace("array.txt", "")
+            lists_report = Path(from_lists).read_text(encoding="utf-8").replace("lists.txt", "")
+
+        self.assertEqual(array_report, lists_report)
+        self.assertIn(f"L2 норма: {np.linalg.norm(service.create_embedding(texts[1])):.6f}", array_report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,318 @@
+import time
+from functools import partial
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .db import ChromaDB
+from .documents import Document, DirectoryLoader, TextChunker, IngestionManifest
+from .documents.batch import ChunkBatch
+from .embeddings import BaseEmbeddingService, EmbeddingAccumulator
+from .logger import LoggerService
+from .utils import save_embeddings_results, save_text_chunker_results
+
+
+class Indexer(LoggerService):
+    """
+    Инкрементальная индексация директории: обрабатывает только новые и измененные файлы,
+    удаляет из хранилища чанки измененных и удаленных файлов.
+    """
+
+    # Как часто (в документах) сбрасывать манифест на диск во время индексации
+    MANIFEST_SAVE_EVERY = 100
+
+    def __init__(
+        self,
+        db: ChromaDB,
+        embedding_service: BaseEmbeddingService,
+        dir_loader: DirectoryLoader,
+        text_chunker: TextChunker,
+        manifest: IngestionManifest,
+        results_dir: Optional[str] = None,
+        batch_size: int = 512,
+        flush_timeout: Optional[float] = 5.0,
+    ):
+        """
+        Args:
+            db: Векторное хранилище
+            embedding_service: Сервис эмбеддингов
+            dir_loader: Загрузчик документов
+            text_chunker: Чанкер
+            manifest: Манифест индексации
+            results_dir: Директория для отладочных результатов (None — не сохранять)
+            batch_size: Сколько чанков разных документов копить перед кодированием и записью
+            flush_timeout: Сколько секунд чанки могут ждать в очереди (None — без ограничения)
+        """
+        self.db = db
+        self.embedding_service = embedding_service
+        self.dir_loader = dir_loader
+        self.text_chunker = text_chunker
+        self.manifest = manifest
+        self.results_dir = results_dir
+        self.batch_size = batch_size
+        self.flush_timeout = flush_timeout
+
+    def pipeline(self) -> dict:
+        """
+        Параметры пайплайна, от которых зависят чанки и векторы в хранилище: разбиение на чанки,
+        модель эмбеддингов (cache_name учитывает квантизацию и PCA-проекцию) и размерность векторов.
+        """
+        return {
+            "chunker": self.text_chunker.params,
+            "embedding_model": self.embedding_service.cache_name,
+            "dimension": self.embedding_service.dimension,
+        }
+
+    def check_pipeline(self) -> bool:
+        """
+        Сверяет параметры пайплайна с сохраненными в коллекции и в манифесте. Если они отличаются
+        (или неизвестны — коллекция и манифест созданы до их появления), коллекция и манифест
+        очищаются: чанки и векторы другого пайплайна нельзя смешивать с новыми,
+        а неизмененные файлы иначе не были бы переиндексированы.
+
+        Returns:
+            True, если коллекция и манифест очищены и все файлы будут проиндексированы заново
+        """
+        pipeline = self.pipeline()
+        stored = self.db.get_pipeline()
+        if stored == pipeline and self.manifest.pipeline == pipeline:
+            return False
+
+        self._logger_warning(
+            f"Параметры пайплайна изменились (коллекция: {stored}, манифест: {self.manifest.pipeline}, "
+            f"текущие: {pipeline}), полная переиндексация"
+        )
+        self.db.reset_collection()
+        self.db.set_pipeline(pipeline)
+        self.manifest.pipeline = pipeline
+        self.manifest.clear()
+        return True
+
+    def index_document(self, document: Document) -> int:
+        """
+        Разбивает документ на чанки, создает эмбеддинги и записывает их в хранилище.
+
+        Args:
+            document: Документ
+
+        Returns:
+            Количество записанных чанков
+        """
+        batch = self._chunk_document(document)
+        if not len(batch):
+            return 0
+
+        batch = self.embedding_service.embed_batch(batch)
+        self._save_embeddings_results(document, batch)
+
+        self.db.add_batch(batch)
+        return len(batch)
+
+    def _chunk_document(self, document: Document) -> ChunkBatch:
+        """Разбивает документ на чанки и в режиме отладки сохраняет результаты TextChunker."""
+        batch = self.text_chunker.create_batch([document])
+
+        filename = document.metadata.get('filename', 'unknown')
+        if self.results_dir and len(batch): save_text_chunker_results(
+            batch.to_chunks(),
+            str(Path(self.results_dir, f"TextChunker_results_{filename}.txt"))
+        )
+        return batch
+
+    def _save_embeddings_results(self, document: Document, batch: ChunkBatch):
+        """Сохраняет результаты эмбеддингов документа в режиме отладки."""
+        filename = document.metadata.get('filename', 'unknown')
+        if self.results_dir: save_embeddings_results(
+            batch.to_chunks(),
+            batch.embeddings,
+            output_file=str(Path(self.results_dir, f"{self.embedding_service.__class__.__name__}_results_{filename}.txt"))
+        )
+
+    def remove_source(self, source: str):
+        """
+        Удаляет чанки файла из хранилища и запись о нем из манифеста.
+
+        Args:
+            source: Путь к файлу
+        """
+        self.db.delete_by_source(source)
+        self.manifest.remove(source)
+
+    def update(self, sources: Iterable[str], removed: Iterable[str] = ()) -> dict[str, int]:
+        """
+        Переиндексирует пачку измененных файлов за один проход: чанки всех файлов кодируются
+        и записываются частями по max_batch_size хранилища, запись части идет параллельно с кодированием следующей.
+        Файлы, содержимое которых не изменилось, пропускаются.
+
+        Args:
+            sources: Пути к новым или измененным файлам
+            removed: Пути к удаленным файлам
+
+        Returns:
+            Статистика: количество новых/измененных, неизмененных, удаленных, упавших файлов и чанков
+        """
+        started_at = time.perf_counter()
+        stats = {"changed": 0, "unchanged": 0, "removed": 0, "failed": 0, "chunks": 0}
+
+        try:
+            for source in removed:
+                if source in self.manifest.entries:
+                    self.remove_source(source)
+                    stats["removed"] += 1
+
+            to_index: list[str] = []
+            for source in sources:
+                if not Path(source).is_file():
+                    # Событие удаления могло быть пропущено или объединено с другими
+                    if source in self.manifest.entries:
+                        self.remove_source(source)
+                        stats["removed"] += 1
+                    continue
+                try:
+                    changed = self.manifest.changed(source)
+                except FileNotFoundError:
+                    # Файл удален после проверки
+                    if source in self.manifest.entries:
+                        self.remove_source(source)
+                        stats["removed"] += 1
+                    continue
+                if changed:
+                    to_index.append(source)
+                else:
+                    stats["unchanged"] += 1
+
+            documents: list[Document] = []
+            for source, document in self.dir_loader.iter_load(to_index):
+                if document is None:
+                    stats["failed"] += 1
+                    # Файл мог упасть после части документов — такие части не записываются
+                    documents = [doc for doc in documents if doc.metadata["source"] != source]
+                    continue
+                documents.append(document)
+
+            # Последняя часть каждого файла — по ней файл записывается в манифест
+            last_parts = {document.metadata["source"]: document for document in documents}
+
+            # Старые чанки измененных файлов больше не актуальны (в том числе у файлов без записи в манифесте)
+            for source in last_parts:
+                self.db.delete_by_source(source)
+
+            # Части по max_batch_size чанков: пока записывается одна, кодируется следующая
+            batch = self.text_chunker.create_batch(documents)
+            if len(batch):
+                self.db.bulk_upsert(
+                    self.embedding_service.embed_batch(part) for part in batch.split(self.db.max_batch_size)
+                )
+                stats["chunks"] = len(batch)
+
+            for document in last_parts.values():
+                self._commit(document, stats)
+        finally:
+            self.manifest.save()
+
+        elapsed = time.perf_counter() - started_at
+        self._logger_info(
+            f"Обновление завершено за {elapsed:.2f} с: "
+            f"новых/измененных {stats['changed']}, без изменений {stats['unchanged']}, "
+            f"удалено {stats['removed']}, ошибок {stats['failed']}, чанков {stats['chunks']}"
+        )
+        if self.embedding_service.embedding_cache is not None:
+            self.embedding_service.embedding_cache.log_stats()
+        return stats
+
+    def _commit(self, document: Document, stats: dict[str, int]):
+        """Записывает проиндексированный файл в манифест и периодически сохраняет манифест."""
+        self.manifest.commit(document.metadata["source"], document.doc_id)
+        stats["changed"] += 1
+
+        if stats["changed"] % self.MANIFEST_SAVE_EVERY == 0:
+            self.manifest.save()
+
+    def sync(self, directory: str, glob_pattern: str = "*.*", **filters) -> dict[str, int]:
+        """
+        Синхронизирует хранилище с содержимым директории.
+
+        Args:
+            directory: Путь к директории
+            glob_pattern: Паттерн для имени файла
+            **filters: Параметры обхода DirectoryLoader.iter_paths (recursive, include, exclude, max_file_size)
+
+        Returns:
+            Статистика: количество новых/измененных, неизмененных, удаленных, упавших файлов и чанков
+        """
+        started_at = time.perf_counter()
+        stats = {"changed": 0, "unchanged": 0, "removed": 0, "failed": 0, "chunks": 0}
+
+        # Сканирование дешевое: только stat, хеш считается лишь для файлов с изменившимся stat
+        present: set[str] = set()
+        changed: list[str] = []
+        for source in self.dir_loader.iter_paths(directory, glob_pattern, **filters):
+            try:
+                if self.manifest.changed(source):
+                    changed.append(source)
+            except FileNotFoundError:
+                # Файл удален во время сканирования — его чанки удаляются ниже как у пропавшего
+                continue
+            present.add(source)
+
+        stats["unchanged"] = len(present) - len(changed)
+
+        # Чанки небольших файлов копятся и кодируются вместе, а не отдельным вызовом модели на файл
+        accumulator = EmbeddingAccumulator(
+            self.embedding_service,
+            self.db.add_batch,
+            batch_size=self.batch_size,
+            flush_timeout=self.flush_timeout,
+        )
+
+        try:
+            # Файлы, пропавшие из директории
+            for source in sorted(self.manifest.sources() - present):
+                self.remove_source(source)
+                stats["removed"] += 1
+
+            # Файл может прийти несколькими частями подряд (постраничный PDF),
+            # поэтому в манифест он записывается только после последней части
+            # и только когда все его чанки записаны в хранилище
+            current: Optional[Document] = None
+            for source, document in self.dir_loader.iter_load(changed):
+                if document is None:
+                    stats["failed"] += 1
+                    if current is not None and current.metadata["source"] == source:
+                        # Файл упал после части документов: в манифест он не попадает,
+                        # а уже накопленные чанки удаляются после записи — файл будет обработан повторно
+                        accumulator.after_write(partial(self.remove_source, source))
+                        current = None
+                    continue
+
+                if current is None or current.metadata["source"] != source:
+                    if current is not None:
+                        accumulator.after_write(partial(self._commit, current, stats))
+
+                    # Старые чанки файла больше не актуальны. Удаляются и у файлов без записи
+                    # в манифесте: манифест мог потеряться, а чанки прежней индексации — остаться.
+                    # Удаление идет в потоке записи, после записи предыдущей пачки
+                    accumulator.submit(partial(self.db.delete_by_source, source))
+
+                current = document
+                batch = self._chunk_document(document)
+                accumulator.add(batch, on_written=partial(self._save_embeddings_results, document))
+                stats["chunks"] += len(batch)
+
+            if current is not None:
+                accumulator.after_write(partial(self._commit, current, stats))
+            accumulator.flush()
+        finally:
+            accumulator.close()
+            # Сохраняем прогресс даже при ошибке — уже записанные файлы не будут обработаны повторно
+            self.manifest.save()
+
+        elapsed = time.perf_counter() - started_at
+        self._logger_info(
+            f"Синхронизация {directory} завершена за {elapsed:.2f} с: "
+            f"новых/измененных {stats['changed']}, без изменений {stats['unchanged']}, "
+            f"удалено {stats['removed']}, ошибок {stats['failed']}, чанков {stats['chunks']}, "
+            f"вызовов модели {accumulator.flushes}"
+        )
+        if self.embedding_service.embedding_cache is not None:
+            self.embedding_service.embedding_cache.log_stats()
+        return stats
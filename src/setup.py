@@ -1,9 +1,14 @@
-from .db import ChromaDB
-from .embeddings import AllMiniLMService
-from src.documents import DirectoryLoader, TextChunker
+from typing import Optional
+
+from .db import ChromaDB, LanceDB
+# Сервисы эмбеддингов импортируются лениво (через атрибуты пакета): torch и onnxruntime
+# загружаются, только когда выбранный сервис действительно создается
+from . import embeddings
+from src.documents import DirectoryLoader, TextChunker, TokenTextChunker, ExtractedTextCache
 from .logger import LoggerService
 from src.config import (
     VectorDBType,
+    EmbeddingBackendType,
     EmbeddingModelsType,
     LLMModelsType,
     config,
@@ -20,24 +25,92 @@ class Setup(LoggerService):
         if db_type == VectorDBType.CHROMA.value:
             return ChromaDB()
         elif db_type == VectorDBType.LANCE.value:
-            # TODO: Добавить поддержку LanceDB
-            raise NotImplementedError("LanceDB пока не поддерживается")
+            return LanceDB(
+                index_min_rows=config.LANCE_INDEX_MIN_ROWS,
+                nprobes=config.LANCE_NPROBES,
+                refine_factor=config.LANCE_REFINE_FACTOR,
+            )
         else:
             raise ValueError(f"Неизвестный тип базы данных: {db_type}")
 
     @staticmethod
-    def get_embedding_service():
-        """Создает сервис эмбеддингов согласно конфигурации"""
+    def get_embedding_service(num_threads: Optional[int] = None):
+        """
+        Создает сервис эмбеддингов согласно конфигурации
+
+        Args:
+            num_threads: Потоков ONNX Runtime (None — ONNX_THREADS). Пул эмбеддингов передает
+                число потоков на рабочий процесс, чтобы процессы не делили между собой все ядра
+        """
         model_name = config.EMBEDDING_MODEL.value
         
+        backend = config.EMBEDDING_BACKEND
+
         if model_name == EmbeddingModelsType.ALL_MINI_LM_L6_V2.value:
-            return AllMiniLMService()
+            if backend == EmbeddingBackendType.TORCH:
+                return embeddings.AllMiniLMService()
+            return embeddings.AllMiniLMOnnxService(
+                quantize=backend == EmbeddingBackendType.ONNX_INT8,
+                num_threads=num_threads or config.ONNX_THREADS,
+            )
         elif model_name == EmbeddingModelsType.QWEN3_EMBEDDING_4B.value:
             # TODO: Добавить поддержку Qwen3 эмбеддингов
             raise NotImplementedError("Qwen3 эмбеддинги пока не поддерживаются")
         else:
             raise ValueError(f"Неизвестная модель эмбеддингов: {model_name}")
 
+    def get_reduced_embedding_service(self, embedding_service):
+        """Оборачивает сервис эмбеддингов PCA-проекцией, если она включена в конфигурации и обучена"""
+        dimension = config.EMBEDDING_REDUCED_DIMENSION
+        if dimension is None:
+            return embedding_service
+
+        path = config.EMBEDDING_REDUCER_PATH
+        if not path.exists():
+            self._logger_warning(
+                f"Проекция {str(path)} не найдена, эмбеддинги не сокращаются. Обучить проекцию: make report-recall"
+            )
+            return embedding_service
+
+        reducer = embeddings.PCAReducer.load(path)
+        if reducer.dimension != dimension:
+            self._logger_warning(
+                f"Размерность проекции {str(path)} ({reducer.dimension}) не совпадает с "
+                f"EMBEDDING_REDUCED_DIMENSION ({dimension}), эмбеддинги не сокращаются"
+            )
+            return embedding_service
+
+        self._logger_info(
+            f"PCA-проекция {str(path)}: {reducer.input_dimension} → {reducer.dimension}, "
+            f"объясненная дисперсия {float(reducer.explained_variance_ratio.sum()):.3f}"
+        )
+        return embeddings.ReducedEmbeddingService(embedding_service, reducer)
+
+    def get_text_chunker(self, embedding_service):
+        """Создает чанкер согласно конфигурации: по символам или по токенам модели эмбеддингов"""
+        if config.CHUNK_BY_TOKENS and embedding_service.provides_tokenizer:
+            # Токенизатор (а с ним и модель) загружается при первом разбиении
+            text_chunker = TokenTextChunker(
+                chunk_overlap=config.CHUNK_OVERLAP_TOKENS,
+                compact=config.COMPACT_CHUNKS,
+                load_tokenizer=lambda: embedding_service.tokenizer,
+                load_chunk_size=lambda: config.CHUNK_SIZE_TOKENS or embedding_service.max_tokens,
+            )
+            chunk_size = config.CHUNK_SIZE_TOKENS or "окно модели"
+            self._logger_info(f"TokenTextChunker инициализирован: {chunk_size} токенов, {config.CHUNK_OVERLAP_TOKENS}")
+            return text_chunker
+
+        if config.CHUNK_BY_TOKENS:
+            self._logger_warning("Модель эмбеддингов не предоставляет токенизатор, разбиение по символам")
+
+        text_chunker = TextChunker(
+            chunk_size=config.CHUNK_SIZE,
+            chunk_overlap=config.CHUNK_OVERLAP,
+            compact=config.COMPACT_CHUNKS
+        )
+        self._logger_info(f"TextChunker инициализирован: {config.CHUNK_SIZE}, {config.CHUNK_OVERLAP}")
+        return text_chunker
+
     def create_pipeline(self):
         """Создает полный пайплайн обработки"""
         self._logger_info(f"Инициализация пайплайна с конфигурацией: {config.__class__.__name__}")
@@ -49,18 +122,33 @@ class Setup(LoggerService):
             
             # Создаем сервис эмбеддингов
             embedding_service = self.get_embedding_service()
+            if config.EMBEDDING_WORKERS > 1:
+                # Пул живет до embedding_service.close(): модели в процессах загружаются один раз
+                embedding_service = embeddings.ProcessPoolEmbeddingService(
+                    embedding_service,
+                    Setup.get_embedding_service,
+                    workers=config.EMBEDDING_WORKERS,
+                    threads_per_worker=config.EMBEDDING_THREADS_PER_WORKER,
+                )
+            embedding_service = self.get_reduced_embedding_service(embedding_service)
+            if config.EMBEDDING_CACHE_DIR:
+                embedding_service.enable_cache(str(config.EMBEDDING_CACHE_DIR), config.EMBEDDING_CACHE_MEMORY_ITEMS)
             self._logger_info(f"Сервис эмбеддингов инициализирован: {config.EMBEDDING_MODEL}")
 
             # Создаем DirectoryLoader
-            dir_loader = DirectoryLoader()
-            self._logger_info(f"DirectoryLoader инициализирован: {config.DOCS_DIR}")
+            text_cache = (
+                ExtractedTextCache(str(config.TEXT_CACHE_DIR), config.TEXT_CACHE_MAX_BYTES)
+                if config.TEXT_CACHE_DIR else None
+            )
+            dir_loader = DirectoryLoader(
+                max_workers=config.LOADER_WORKERS,
+                pdf_pages_per_document=config.PDF_PAGES_PER_DOCUMENT,
+                text_cache=text_cache,
+            )
+            self._logger_info(f"DirectoryLoader инициализирован: {config.DOCS_DIR}, процессов: {config.LOADER_WORKERS}")
 
             # Создаем TextChunker
-            text_chunker = TextChunker(
-                chunk_size=config.CHUNK_SIZE,
-                chunk_overlap=config.CHUNK_OVERLAP
-            )
-            self._logger_info(f"TextChunker инициализирован: {config.CHUNK_SIZE}, {config.CHUNK_OVERLAP}")
+            text_chunker = self.get_text_chunker(embedding_service)
             
             return db, embedding_service, dir_loader, text_chunker  
             
@@ -0,0 +1,303 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from PyPDF2 import PdfWriter
+
+from src.db import ChromaDB
+from src.documents import DirectoryLoader, IngestionManifest, TextChunker
+from src.documents import loader as loader_module
+from src.embeddings import BaseEmbeddingService
+from src.indexer import Indexer
+
+
+class LengthEmbeddingService(BaseEmbeddingService):
+    """Сервис эмбеддингов для тестов: вектор из длины текста, считает вызовы модели."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def create_embedding(self, text: str) -> list[float]:
+        return [float(len(text)), 1.0]
+
+    def create_embeddings(self, texts: list[str]) -> list[list[float]]:
+        self.calls += 1
+        return [self.create_embedding(text) for text in texts]
+
+    @property
+    def dimension(self) -> int | None:
+        return 2
+
+
+class PaddedEmbeddingService(LengthEmbeddingService):
+    """Другая модель эмбеддингов для тестов: векторы длиннее на одну координату."""
+
+    model_name = "padded"
+
+    def create_embedding(self, text: str) -> list[float]:
+        return [*super().create_embedding(text), 0.0]
+
+    @property
+    def dimension(self) -> int | None:
+        return 3
+
+
+class IndexerTestCase(unittest.TestCase):
+    """Индексатор с ChromaDB и манифестом во временной директории."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name, "docs")
+        self.directory.mkdir()
+        self.db = ChromaDB(collection_name="test", persist_directory=str(Path(self.tmp_dir.name, "db")))
+        self.manifest = IngestionManifest(str(Path(self.tmp_dir.name, "manifest.json")))
+        self.indexer = Indexer(
+            self.db,
+            LengthEmbeddingService(),
+            DirectoryLoader(pdf_pages_per_document=2),
+            TextChunker(chunk_size=100, chunk_overlap=10),
+            self.manifest,
+            flush_timeout=None,
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, name: str, text: str) -> str:
+        path = self.directory / name
+        path.write_text(text, encoding="utf-8")
+        return str(path)
+
+    def stored_texts(self, source: str) -> list[str]:
+        return self.db.collection.get(where={"source": source})["documents"]
+
+
+class TestIndexerUpdate(IndexerTestCase):
+
+    def test_update_indexes_changed_and_skips_unchanged(self):
+        """Тест: новые файлы индексируются, повторное обновление без изменений их пропускает."""
+        first = self.write("a.txt", "Первый файл. " * 20)
+        second = self.write("b.txt", "Второй файл.")
+
+        stats = self.indexer.update([first, second])
+
+        self.assertEqual(stats["changed"], 2)
+        self.assertEqual(self.manifest.sources(), {first, second})
+        self.assertEqual(self.stored_texts(second), ["Второй файл."])
+
+        stats = self.indexer.update([first, second])
+        self.assertEqual((stats["changed"], stats["unchanged"]), (0, 2))
+
+    def test_update_replaces_old_chunks(self):
+        """Тест: старые чанки измененного файла удаляются перед записью новых."""
+        source = self.write("a.txt", "Старый текст. " * 20)
+        self.indexer.update([source])
+
+        self.write("a.txt", "Новый текст.")
+        self.indexer.update([source])
+
+        self.assertEqual(self.stored_texts(source), ["Новый текст."])
+
+    def test_update_removes_deleted_files(self):
+        """Тест: удаленные файлы и пропавшие файлы из sources удаляются из хранилища и манифеста."""
+        first = self.write("a.txt", "Первый файл.")
+        second = self.write("b.txt", "Второй файл.")
+        self.indexer.update([first, second])
+
+        Path(first).unlink()
+        Path(second).unlink()
+        # Для второго файла событие удаления пропущено, он пришел как измененный
+        stats = self.indexer.update([second], removed=[first])
+
+        self.assertEqual(stats["removed"], 2)
+        self.assertEqual(self.manifest.sources(), set())
+        self.assertEqual(self.db.collection.count(), 0)
+
+
+class TestIndexerSync(IndexerTestCase):
+
+    def test_sync_skips_unchanged_files(self):
+        """Тест: повторная синхронизация без изменений не кодирует и не записывает чанки."""
+        first = self.write("a.txt", "Первый файл. " * 20)
+        second = self.write("b.txt", "Второй файл.")
+
+        stats = self.indexer.sync(str(self.directory))
+        self.assertEqual((stats["changed"], stats["unchanged"]), (2, 0))
+        self.assertEqual(self.manifest.sources(), {first, second})
+        count, calls = self.db.collection.count(), self.indexer.embedding_service.calls
+
+        stats = self.indexer.sync(str(self.directory))
+
+        self.assertEqual((stats["changed"], stats["unchanged"], stats["chunks"]), (0, 2, 0))
+        self.assertEqual(self.indexer.embedding_service.calls, calls)
+        self.assertEqual(self.db.collection.count(), count)
+
+    def test_sync_replaces_chunks_of_modified_file(self):
+        """Тест: старые чанки измененного файла удаляются перед записью новых."""
+        source = self.write("a.txt", "Старый текст. " * 20)
+        other = self.write("b.txt", "Другой файл.")
+        self.indexer.sync(str(self.directory))
+
+        self.write("a.txt", "Новый текст.")
+        stats = self.indexer.sync(str(self.directory))
+
+        self.assertEqual((stats["changed"], stats["unchanged"]), (1, 1))
+        self.assertEqual(self.stored_texts(source), ["Новый текст."])
+        self.assertEqual(self.stored_texts(other), ["Другой файл."])
+
+    def test_sync_removes_deleted_files(self):
+        """Тест: чанки и записи манифеста удаленных файлов удаляются."""
+        source = self.write("a.txt", "Удаляемый файл.")
+        other = self.write("b.txt", "Оставшийся файл.")
+        self.indexer.sync(str(self.directory))
+
+        Path(source).unlink()
+        stats = self.indexer.sync(str(self.directory))
+
+        self.assertEqual(stats["removed"], 1)
+        self.assertEqual(self.manifest.sources(), {other})
+        self.assertEqual(self.stored_texts(source), [])
+        self.assertEqual(self.db.collection.count(), 1)
+
+    def test_sync_without_manifest_replaces_existing_chunks(self):
+        """Тест: без манифеста (первый запуск или потерянный файл) чанки прежней индексации не дублируются."""
+        source = self.write("a.txt", "Текст файла. " * 20)
+        self.indexer.sync(str(self.directory))
+        count = self.db.collection.count()
+
+        self.manifest.clear()
+        stats = self.indexer.sync(str(self.directory))
+
+        self.assertEqual(stats["changed"], 1)
+        self.assertEqual(self.db.collection.count(), count)
+        self.assertEqual(self.manifest.sources(), {source})
+
+    def test_sync_skips_file_deleted_during_scan(self):
+        """Тест: файл, удаленный между обходом директории и проверкой, удаляется как пропавший."""
+        source = self.write("a.txt", "Удаляемый файл.")
+        other = self.write("b.txt", "Оставшийся файл.")
+        self.indexer.sync(str(self.directory))
+        self.write("a.txt", "Измененный файл.")
+
+        changed = self.manifest.changed
+
+        def changed_after_delete(path: str) -> bool:
+            if path == source:
+                Path(source).unlink()
+            return changed(path)
+
+        with patch.object(self.manifest, "changed", changed_after_delete):
+            stats = self.indexer.sync(str(self.directory))
+
+        self.assertEqual((stats["removed"], stats["unchanged"]), (1, 1))
+        self.assertEqual(self.manifest.sources(), {other})
+        self.assertEqual(self.stored_texts(source), [])
+
+    def test_sync_saves_manifest_after_error(self):
+        """Тест: при ошибке посреди синхронизации уже записанные файлы сохраняются в манифесте на диске."""
+        first = self.write("a.txt", "Первый файл.")
+        self.write("b.txt", "Второй файл.")
+        # Каждый файл кодируется и записывается отдельно
+        self.indexer.batch_size = 1
+
+        add_batch = self.db.add_batch
+        writes = []
+
+        def failing_add_batch(batch):
+            writes.append(batch)
+            if len(writes) > 1:
+                raise RuntimeError("хранилище недоступно")
+            return add_batch(batch)
+
+        with patch.object(self.db, "add_batch", failing_add_batch):
+            with self.assertRaises(RuntimeError):
+                self.indexer.sync(str(self.directory))
+
+        saved = IngestionManifest(str(self.manifest.manifest_path))
+        self.assertEqual(saved.sources(), {first})
+
+    def test_pdf_failed_mid_stream_not_committed(self):
+        """Тест: PDF, упавший после первой части, не попадает в манифест, его чанки удаляются."""
+        source = str(self.directory / "manual.pdf")
+        writer = PdfWriter()
+        for _ in range(4):
+            writer.add_blank_page(width=612, height=792)
+        with open(source, "wb") as file:
+            writer.write(file)
+        notes = self.write("notes.txt", "Заметки.")
+
+        def failing_extract(source: str, page_start: int, page_end: int) -> str:
+            if page_start >= 2:
+                raise ValueError("поврежденная страница")
+            return "Текст первых страниц."
+
+        with patch.object(loader_module, "_extract_pdf_pages", failing_extract):
+            stats = self.indexer.sync(str(self.directory))
+
+        self.assertEqual((stats["changed"], stats["failed"]), (1, 1))
+        self.assertEqual(self.manifest.sources(), {notes})
+        self.assertEqual(self.stored_texts(source), [])
+
+        # При следующем запуске файл обрабатывается повторно
+        with patch.object(loader_module, "_extract_pdf_pages", return_value="Текст страниц."):
+            stats = self.indexer.sync(str(self.directory))
+
+        self.assertEqual((stats["changed"], stats["unchanged"]), (1, 1))
+        self.assertEqual(self.manifest.sources(), {notes, source})
+        self.assertEqual(self.stored_texts(source), ["Текст страниц.", "Текст страниц."])
+
+
+class TestIndexerPipeline(IndexerTestCase):
+
+    def test_check_pipeline_stores_parameters(self):
+        """Тест: параметры пайплайна сохраняются в коллекции и манифесте, повторная проверка ничего не очищает."""
+        self.assertTrue(self.indexer.check_pipeline())
+        source = self.write("a.txt", "Текст файла.")
+        self.indexer.sync(str(self.directory))
+
+        self.assertFalse(self.indexer.check_pipeline())
+        self.assertEqual(self.db.get_pipeline(), self.indexer.pipeline())
+        self.assertEqual(IngestionManifest(str(self.manifest.manifest_path)).pipeline, self.indexer.pipeline())
+        self.assertEqual(self.stored_texts(source), ["Текст файла."])
+
+    def test_changed_chunker_forces_reindex(self):
+        """Тест: после смены параметров разбиения неизмененные файлы индексируются заново."""
+        self.indexer.check_pipeline()
+        source = self.write("a.txt", "Первое предложение. Второе предложение.")
+        self.indexer.sync(str(self.directory))
+
+        self.indexer.text_chunker = TextChunker(chunk_size=25, chunk_overlap=0)
+        self.assertTrue(self.indexer.check_pipeline())
+        stats = self.indexer.sync(str(self.directory))
+
+        self.assertEqual((stats["changed"], stats["unchanged"]), (1, 0))
+        self.assertEqual(self.stored_texts(source), ["Первое предложение.", "Второе предложение."])
+
+    def test_changed_embedding_dimension_forces_reindex(self):
+        """Тест: другая модель (размерность векторов) пересоздает коллекцию, запись и поиск работают."""
+        self.indexer.check_pipeline()
+        self.write("a.txt", "Текст файла.")
+        self.indexer.sync(str(self.directory))
+
+        self.indexer.embedding_service = PaddedEmbeddingService()
+        self.assertTrue(self.indexer.check_pipeline())
+        stats = self.indexer.sync(str(self.directory))
+
+        self.assertEqual(stats["changed"], 1)
+        self.assertEqual(len(self.db.search([12.0, 1.0, 0.0], n_results=1)), 1)
+
+    def test_lost_manifest_forces_reindex(self):
+        """Тест: без сохраненных параметров в манифесте (файл потерян) коллекция очищается."""
+        self.indexer.check_pipeline()
+        self.write("a.txt", "Текст файла.")
+        self.indexer.sync(str(self.directory))
+
+        self.indexer.manifest = self.manifest = IngestionManifest(str(Path(self.tmp_dir.name, "lost.json")))
+        self.assertTrue(self.indexer.check_pipeline())
+        self.assertEqual(self.db.collection.count(), 0)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from watchfiles import Change
+
+from src.documents import DirectoryLoader, IngestionManifest
+from src.watcher import DirectoryWatcher
+
+
+class RecordingIndexer:
+    """Индексатор для тестов, который записывает вызовы update."""
+
+    def __init__(self, manifest: IngestionManifest):
+        self.manifest = manifest
+        self.dir_loader = DirectoryLoader()
+        self.calls: list[tuple[list[str], list[str]]] = []
+
+    def update(self, sources, removed=()):
+        self.calls.append((list(sources), list(removed)))
+
+
+class TestDirectoryWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name, "docs")
+        self.directory.mkdir()
+        self.manifest = IngestionManifest(str(Path(self.tmp_dir.name, "manifest.json")))
+        self.indexer = RecordingIndexer(self.manifest)
+        self.watcher = DirectoryWatcher(self.indexer, str(self.directory), glob_pattern="*.*")
+
+        self.path = self.directory / "a.txt"
+        self.path.write_text("Текст", encoding="utf-8")
+        self.source = str(self.path)
+        self.manifest.commit(self.source)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_atomic_save_reindexes_file(self):
+        """Тест: deleted и added для существующего файла в одной пачке — переиндексация, а не удаление."""
+        for events in (
+            [(Change.added, self.source), (Change.deleted, self.source)],
+            [(Change.deleted, self.source), (Change.modified, self.source)],
+        ):
+            self.indexer.calls.clear()
+            self.watcher.handle_changes(set(events))
+            self.assertEqual(self.indexer.calls, [([self.source], [])])
+
+    def test_deleted_file_removed(self):
+        """Тест: файл, которого нет на диске после пачки событий, удаляется из индекса."""
+        self.path.unlink()
+
+        self.watcher.handle_changes({(Change.modified, self.source), (Change.deleted, self.source)})
+
+        self.assertEqual(self.indexer.calls, [([], [self.source])])
+
+    def test_deleted_directory_removes_nested_files(self):
+        """Тест: удаление директории удаляет только ее файлы, которых больше нет."""
+        nested = self.directory / "sub"
+        nested.mkdir()
+        kept, gone = nested / "kept.txt", nested / "gone.txt"
+        for path in (kept, gone):
+            path.write_text("Текст", encoding="utf-8")
+            self.manifest.commit(str(path))
+        gone.unlink()
+
+        self.watcher.handle_changes({(Change.deleted, str(nested))})
+
+        self.assertEqual(self.indexer.calls, [([], [str(gone)])])
+
+    def test_added_directory_scanned(self):
+        """Тест: новая директория сканируется целиком, неподдерживаемые файлы пропускаются."""
+        nested = self.directory / "new"
+        nested.mkdir()
+        (nested / "b.txt").write_text("Текст", encoding="utf-8")
+        (nested / "image.png").write_bytes(b"\x89PNG")
+
+        self.watcher.handle_changes({(Change.added, str(nested))})
+
+        self.assertEqual(self.indexer.calls, [([str(nested / "b.txt")], [])])
+
+    def test_unsupported_file_ignored(self):
+        """Тест: события для неподдерживаемых файлов не вызывают обновление."""
+        other = self.directory / "image.png"
+        other.write_bytes(b"\x89PNG")
+
+        self.watcher.handle_changes({(Change.added, str(other))})
+
+        self.assertEqual(self.indexer.calls, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
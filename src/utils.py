@@ -1,10 +1,13 @@
 import os
 from .logger import logger
 from typing import List
-from .documents.models import DocumentChunk
+
+import numpy as np
+
+from .documents.models import Chunk
 
 def save_text_chunker_results(
-    chunks: list[DocumentChunk], 
+    chunks: list[Chunk], 
     output_file: str = ".results/TextChunker_results.txt"
 ) -> None:
     """
@@ -86,13 +89,14 @@ def save_text_chunker_results(
         raise
 
 
-def save_embeddings_results(chunks: List[DocumentChunk], embeddings: List[List[float]], output_file: str) -> str:
+def save_embeddings_results(chunks: List[Chunk], embeddings: np.ndarray | List[List[float]], output_file: str) -> str:
     """
     Сохраняет результаты создания эмбеддингов в файл.
+    Статистика эмбеддингов считается векторизованно по всей матрице.
     
     Args:
         chunks: Список чанков документа
-        embeddings: Список эмбеддингов для каждого чанка
+        embeddings: Матрица эмбеддингов (или список эмбеддингов) для каждого чанка
         output_file: Путь к файлу для сохранения результатов
         
     Returns:
@@ -102,14 +106,25 @@ def save_embeddings_results(chunks: List[DocumentChunk], embeddings: List[List[f
     output_dir = os.path.dirname(output_file)
     if output_dir:
         os.makedirs(output_dir, exist_ok=True)
+
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if embeddings.size == 0:
+        embeddings = embeddings.reshape(0, 0)
+
+    # Статистика по строкам матрицы одним проходом вместо циклов по значениям
+    if len(embeddings):
+        minimums = embeddings.min(axis=1)
+        maximums = embeddings.max(axis=1)
+        means = embeddings.mean(axis=1)
+        norms = np.linalg.norm(embeddings, axis=1)
     
     with open(output_file, 'w', encoding='utf-8') as f:
         # Общая статистика
         f.write("ОБЩАЯ СТАТИСТИКА:\n")
         f.write(f"Всего чанков: {len(chunks)}\n")
         f.write(f"Всего эмбеддингов: {len(embeddings)}\n")
-        if embeddings:
-            f.write(f"Размерность эмбеддингов: {len(embeddings[0])}\n")
+        if len(embeddings):
+            f.write(f"Размерность эмбеддингов: {embeddings.shape[1]}\n")
         
         # Получаем имя файла из метаданных первого чанка
         document_filename = "unknown"
@@ -156,13 +171,12 @@ def save_embeddings_results(chunks: List[DocumentChunk], embeddings: List[List[f
             
             # Статистика эмбеддинга
             f.write(f"\nСТАТИСТИКА ЭМБЕДДИНГА:\n")
-            f.write(f"Минимальное значение: {min(embedding):.6f}\n")
-            f.write(f"Максимальное значение: {max(embedding):.6f}\n")
-            f.write(f"Среднее значение: {sum(embedding) / len(embedding):.6f}\n")
+            f.write(f"Минимальное значение: {minimums[idx]:.6f}\n")
+            f.write(f"Максимальное значение: {maximums[idx]:.6f}\n")
+            f.write(f"Среднее значение: {means[idx]:.6f}\n")
             
             # Норма вектора (L2)
-            norm = sum(val ** 2 for val in embedding) ** 0.5
-            f.write(f"L2 норма: {norm:.6f}\n")
+            f.write(f"L2 норма: {norms[idx]:.6f}\n")
             
             f.write("\n" + "~" * 30 + "\n\n")
         
@@ -191,6 +205,16 @@ def save_search_results(query_list, chroma_db, embedding_service, output_file=".
     if output_dir:
         os.makedirs(output_dir, exist_ok=True)
     
+    # Эмбеддинги всех запросов создаются одним вызовом модели, поиск выполняется одним запросом к базе
+    try:
+        query_embeddings = embedding_service.encode_array(query_list)
+        search_results = chroma_db.search_many(query_embeddings, n_results=3)
+        search_error = None
+    except Exception as e:
+        search_results = [[] for _ in query_list]
+        search_error = e
+        logger.error(f"Ошибка поиска: {e}")
+
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write("=" * 80 + "\n")
         f.write("РЕЗУЛЬТАТЫ ПОИСКА В БАЗЕ ДАННЫХ\n")
@@ -207,7 +231,7 @@ def save_search_results(query_list, chroma_db, embedding_service, output_file=".
         f.write("=" * 80 + "\n\n")
         
         # Обрабатываем каждый запрос
-        for idx, query in enumerate(query_list, 1):
+        for idx, (query, results) in enumerate(zip(query_list, search_results), 1):
             logger.info(f"Обработка запроса {idx}/{len(query_list)}")
             
             f.write(f"ЗАПРОС {idx}/{len(query_list)}\n")
@@ -215,14 +239,8 @@ def save_search_results(query_list, chroma_db, embedding_service, output_file=".
             f.write(f"Текст запроса:\n{query}\n\n")
             
             try:
-                # Создаем эмбеддинг для запроса
-                query_embedding = embedding_service.create_embedding(query)
-                
-                # Выполняем поиск
-                results = chroma_db.search(
-                    query_embedding=query_embedding,
-                    n_results=3
-                )
+                if search_error is not None:
+                    raise search_error
                 
                 f.write(f"НАЙДЕНО РЕЗУЛЬТАТОВ: {len(results)}\n\n")
                 
@@ -0,0 +1,149 @@
+import threading
+from pathlib import Path
+from typing import Optional
+
+from watchfiles import Change, watch
+
+from .indexer import Indexer
+from .logger import LoggerService
+
+
+class DirectoryWatcher(LoggerService):
+    """
+    Режим наблюдения: следит за директорией и переиндексирует только затронутые файлы.
+    События файловой системы копятся debounce_ms миллисекунд и обрабатываются одной пачкой —
+    одним вызовом эмбеддинга и одной вставкой в хранилище.
+    """
+
+    def __init__(
+        self,
+        indexer: Indexer,
+        directory: str,
+        glob_pattern: str = "*.*",
+        debounce_ms: int = 1600,
+        step_ms: int = 50,
+        **filters,
+    ):
+        """
+        Args:
+            indexer: Индексатор, которым обрабатываются изменения
+            directory: Директория для наблюдения
+            glob_pattern: Паттерн для имени файла
+            debounce_ms: Сколько миллисекунд копить события перед обработкой пачки
+            step_ms: Как часто (в миллисекундах) проверять новые события внутри окна debounce
+            **filters: Параметры обхода DirectoryLoader (recursive, include, exclude, max_file_size)
+        """
+        self.indexer = indexer
+        self.directory = directory
+        self.glob_pattern = glob_pattern
+        self.debounce_ms = debounce_ms
+        self.step_ms = step_ms
+        self.filters = filters
+        self._root = Path(directory).resolve()
+
+    def run(self, stop_event: Optional[threading.Event] = None):
+        """
+        Синхронизирует директорию и затем обрабатывает изменения, пока не будет установлен stop_event
+        (или до KeyboardInterrupt).
+
+        Args:
+            stop_event: Событие для остановки наблюдения
+        """
+        # Изменения, сделанные пока наблюдение не было запущено
+        self.indexer.sync(self.directory, self.glob_pattern, **self.filters)
+
+        self._logger_info(f"Наблюдение за директорией {self.directory} (debounce {self.debounce_ms} мс)")
+
+        try:
+            for changes in watch(
+                self.directory,
+                watch_filter=self._watch_filter,
+                debounce=self.debounce_ms,
+                step=self.step_ms,
+                stop_event=stop_event,
+                recursive=self.filters.get("recursive", True),
+            ):
+                self.handle_changes(changes)
+        except KeyboardInterrupt:
+            pass
+
+        self._logger_info("Наблюдение остановлено")
+
+    def handle_changes(self, changes: set[tuple[Change, str]]):
+        """
+        Обрабатывает пачку событий файловой системы.
+        События группируются по пути, решение принимается по состоянию файла после всех событий:
+        атомарное сохранение редактора (deleted и added для одного пути в одной пачке) переиндексирует
+        файл, а не удаляет его.
+
+        Args:
+            changes: События watchfiles: (тип изменения, абсолютный путь)
+        """
+        events: dict[str, set[Change]] = {}
+        for change, raw_path in changes:
+            events.setdefault(self._to_source(raw_path), set()).add(change)
+
+        updated: set[str] = set()
+        removed: set[str] = set()
+
+        for source, kinds in events.items():
+            path = Path(source)
+
+            if path.is_dir():
+                if Change.added in kinds:
+                    # Файлы, созданные сразу после директории, могут прийти без собственных событий —
+                    # сканируем новую директорию целиком
+                    updated.update(
+                        nested for nested in self.indexer.dir_loader.iter_paths(source, glob_pattern="*")
+                        if self._accepts(nested)
+                    )
+            elif path.exists():
+                if self._accepts(source):
+                    updated.add(source)
+
+            if Change.deleted in kinds or not path.exists():
+                # Удаленный путь может быть директорией — удаляем все ее файлы, которых больше нет на диске
+                removed.update(
+                    known for known in self.indexer.manifest.sources()
+                    if (known == source or known.startswith(source + "/")) and not Path(known).exists()
+                )
+
+        if not updated and not removed:
+            return
+
+        self._logger_info(f"Изменений в пачке: {len(updated)}, удалений: {len(removed)}")
+        self.indexer.update(sorted(updated), sorted(removed))
+
+    def _watch_filter(self, change: Change, raw_path: str) -> bool:
+        """Отбрасывает события для файлов, которые не попадают в индекс."""
+        if change == Change.deleted or Path(raw_path).is_dir():
+            return True
+        return self._accepts(self._to_source(raw_path))
+
+    def _accepts(self, source: str) -> bool:
+        """Проверяет тип файла и фильтры обхода."""
+        path = Path(source)
+        dir_loader = self.indexer.dir_loader
+
+        if path.suffix.lower() not in dir_loader.loaders or not path.is_file():
+            return False
+
+        return dir_loader.accepts(
+            self.directory,
+            path,
+            self.glob_pattern,
+            self.filters.get("include"),
+            self.filters.get("exclude"),
+            self.filters.get("max_file_size"),
+        )
+
+    def _to_source(self, raw_path: str) -> str:
+        """
+        Приводит абсолютный путь из события к виду, в котором путь хранится в манифесте
+        и метаданных чанков (относительно переданной директории).
+        """
+        try:
+            relative = Path(raw_path).resolve().relative_to(self._root)
+        except ValueError:
+            return raw_path
+        return str(Path(self.directory, relative))